@@ -0,0 +1,152 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+# Measure the time from spawning an evaluating interpreter until it is ready
+# to evaluate setup.py files in a generated overlay environment, with and
+# without the fast startup, e.g.:
+#   python benchmark/measure_startup.py --path-entries 500 --pth-files 300
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from colcon_python_setup_py import fast_startup
+from colcon_python_setup_py import worker_pool
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _run_setup_py
+
+# a setup.py file exposing the state of the interpreter in its information
+SETUP_PY = """\
+import sys
+from setuptools import setup
+setup(
+    name='pkg-name',
+    version='1.0.0',
+    description=repr((
+        sys.path, sys.prefix, sys.exec_prefix,
+        getattr(sys, 'overlay_pth_count', None),
+        sorted(name for name in sys.modules if name.startswith('_distutils')),
+        callable(exit))),
+)
+"""
+
+
+def generate_overlay(path, path_entries, pth_files):
+    """
+    Generate an overlay environment.
+
+    :param Path path: The directory of the overlay
+    :param int path_entries: The number of `PYTHONPATH` entries
+    :param int pth_files: The number of `.pth` files in the user
+      site-packages directory, every tenth containing an executable line
+    :returns: The environment variables
+    :rtype: dict
+    """
+    entries = []
+    for i in range(path_entries):
+        entry = path / 'pythonpath' / f'entry_{i}'
+        (entry / f'overlay_module_{i}').mkdir(parents=True)
+        (entry / f'overlay_module_{i}' / '__init__.py').write_text('')
+        entries.append(str(entry))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        entries + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    env['PYTHONUSERBASE'] = str(path / 'userbase')
+    code = 'import site; print(site.getusersitepackages())'
+    user_site = subprocess.check_output(
+        [sys.executable, '-c', code], env=env).decode().strip()
+    os.makedirs(user_site)
+    for i in range(pth_files):
+        content = str(path / 'pth' / f'entry_{i}') + '\n'
+        if i % 10 == 0:
+            content += (
+                'import sys; sys.overlay_pth_count = '
+                "getattr(sys, 'overlay_pth_count', 0) + 1\n")
+        (path / 'pth' / f'entry_{i}').mkdir(parents=True)
+        Path(user_site, f'overlay_{i:04}.pth').write_text(content)
+    return env
+
+
+def measure_spawn_to_ready(env, repeat):
+    """
+    Measure the time until an interpreter imported the needed modules.
+
+    :param dict env: The environment variables
+    :param int repeat: The number of measured interpreters
+    :returns: The median duration in seconds
+    :rtype: float
+    """
+    # a worker handling no requests exits after importing the modules
+    cmd = worker_pool.get_evaluation_command('--serve', '0', env=env)
+    durations = []
+    for _ in range(repeat):
+        start = time.monotonic()
+        subprocess.run(cmd, stdin=subprocess.DEVNULL, env=env, check=True)
+        durations.append(time.monotonic() - start)
+    return statistics.median(durations)
+
+
+def main(argv=None):
+    """
+    Run the measurement.
+
+    :param list argv: The command line arguments
+    :returns: The return code, 1 if the results of the launch modes differ
+    """
+    parser = argparse.ArgumentParser(
+        description='Measure the spawn-to-ready time of the interpreters '
+                    'evaluating setup.py files in an overlay environment')
+    parser.add_argument(
+        '--path-entries', type=int, default=300,
+        help='The number of PYTHONPATH entries (default: 300)')
+    parser.add_argument(
+        '--pth-files', type=int, default=200,
+        help='The number of .pth files (default: 200)')
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='The number of interpreters per launch mode (default: 5)')
+    parser.add_argument(
+        '--output', type=Path, help='Write the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = {}
+    data = {}
+    name = fast_startup.FAST_STARTUP_ENVIRONMENT_VARIABLE.name
+    previous_value = os.environ.get(name)
+    with TemporaryDirectory(prefix='colcon_startup_benchmark_') as basepath:
+        env = generate_overlay(
+            Path(basepath), args.path_entries, args.pth_files)
+        setup_py = Path(basepath) / 'pkg' / 'setup.py'
+        setup_py.parent.mkdir()
+        setup_py.write_text(SETUP_PY)
+        try:
+            for mode, value in (('normal', '0'), ('fast', '1')):
+                os.environ[name] = value
+                data[mode] = _run_setup_py(setup_py, env=env)
+                results[mode] = measure_spawn_to_ready(env, args.repeat)
+                print(
+                    f'{mode:<8} spawn-to-ready '
+                    f'{results[mode] * 1000:>8.1f} ms')
+        finally:
+            if previous_value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = previous_value
+    results['identical'] = data['normal'] == data['fast']
+    print(f"speedup  {results['normal'] / results['fast']:.2f}x")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+    if not results['identical']:
+        print('The results of the launch modes differ', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
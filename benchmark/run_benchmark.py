@@ -0,0 +1,300 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+# Measure the throughput of identifying and augmenting packages in
+# generated workspaces, e.g.:
+#   python benchmark/run_benchmark.py --sizes 10,100 --save-baseline b.json
+#   python benchmark/run_benchmark.py --sizes 10,100 --baseline b.json
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+
+from colcon_core.package_descriptor import PackageDescriptor
+from colcon_python_setup_py.package_augmentation.python_setup_py \
+    import PythonPackageAugmentation
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import invalidate_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import PythonPackageIdentification
+
+
+def _literal(name):
+    return {
+        'setup.py':
+            'from setuptools import setup\n'
+            'setup(\n'
+            f"    name='{name}',\n"
+            "    version='1.0.0',\n"
+            f"    packages=['{name}'],\n"
+            f"    data_files=[('share/{name}', ['package.xml'])],\n"
+            "    install_requires=['setuptools'],\n"
+            "    tests_require=['pytest'],\n"
+            ')\n',
+    }
+
+
+def _setup_cfg_shim(name):
+    return {
+        'setup.py':
+            'from setuptools import setup\n'
+            'setup()\n',
+        'setup.cfg':
+            '[metadata]\n'
+            f'name = {name}\n'
+            'version = 1.0.0\n'
+            '[options]\n'
+            f'packages = {name}\n'
+            'install_requires =\n'
+            '    setuptools\n',
+    }
+
+
+def _version_from_module(name):
+    return {
+        'setup.py':
+            'import os\n'
+            'import re\n'
+            'from setuptools import setup\n'
+            'here = os.path.dirname(os.path.abspath(__file__))\n'
+            f"with open(os.path.join(here, '{name}', '__init__.py')) as f:\n"
+            "    version = re.search(r\"__version__ = '(.*)'\", "
+            'f.read()).group(1)\n'
+            f"setup(name='{name}', version=version, packages=['{name}'])\n",
+        f'{name}/__init__.py': "__version__ = '1.2.3'\n",
+    }
+
+
+def _heavy_imports(name):
+    return {
+        'setup.py':
+            'import decimal\n'
+            'import email.mime.multipart\n'
+            'import http.client\n'
+            'import unittest\n'
+            'import xml.dom.minidom\n'
+            'from setuptools import setup\n'
+            f"setup(name='{name}', version='1.0.0')\n",
+    }
+
+
+def _environment_dependent(name):
+    return {
+        'setup.py':
+            'import os\n'
+            'from setuptools import setup\n'
+            f"setup(name='{name}' + os.environ.get('BENCHMARK_SUFFIX', ''), "
+            "version='1.0.0')\n",
+    }
+
+
+# requirements shared by the packages, like common dependencies are
+REQUIREMENTS = [
+    f'dependency_{i}>=1.{i}; python_version >= "3.6"' for i in range(200)]
+
+
+def _many_requirements(name):
+    return {
+        'setup.py':
+            'from setuptools import setup\n'
+            'setup(\n'
+            f"    name='{name}',\n"
+            "    version='1.0.0',\n"
+            f'    install_requires={REQUIREMENTS[:150]!r},\n'
+            f"    extras_require={{'test': {REQUIREMENTS[150:]!r}}},\n"
+            ')\n',
+    }
+
+
+STYLES = {
+    'literal': _literal,
+    'setup_cfg_shim': _setup_cfg_shim,
+    'version_from_module': _version_from_module,
+    'heavy_imports': _heavy_imports,
+    'environment_dependent': _environment_dependent,
+    'many_requirements': _many_requirements,
+}
+
+
+def generate_workspace(path, count, styles):
+    """
+    Generate a workspace with packages using the given setup.py styles.
+
+    :param Path path: The directory of the workspace
+    :param int count: The number of packages
+    :param list styles: The names of the styles used in turn
+    :returns: The paths of the packages
+    :rtype: list
+    """
+    package_paths = []
+    for i in range(count):
+        style = styles[i % len(styles)]
+        name = f'pkg_{style}_{i}'
+        package_path = Path(path) / name
+        for filename, content in STYLES[style](name).items():
+            file_path = package_path / filename
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content)
+        package_paths.append(package_path)
+    return package_paths
+
+
+def _percentile(sorted_values, percentile):
+    index = round(percentile / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def measure(function, package_paths):
+    """
+    Invoke a function for each package and measure the latency.
+
+    :param function: The function taking a package descriptor
+    :param list package_paths: The paths of the packages
+    :returns: The statistics of the invocations
+    :rtype: dict
+    """
+    latencies = []
+    tracemalloc.start()
+    start = time.monotonic()
+    for package_path in package_paths:
+        desc = PackageDescriptor(package_path)
+        invocation_start = time.monotonic()
+        function(desc)
+        latencies.append(time.monotonic() - invocation_start)
+    total = time.monotonic() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'total': total,
+        'throughput': len(latencies) / total if total else None,
+        'p50': _percentile(latencies, 50),
+        'p99': _percentile(latencies, 99),
+        'peak_memory': peak_memory,
+    }
+
+
+def run_benchmark(sizes, styles):
+    """
+    Run the benchmark for workspaces of different sizes.
+
+    Each workspace is processed cold, with an empty in-memory cache, and
+    warm afterwards.
+
+    :param list sizes: The numbers of packages
+    :param list styles: The names of the setup.py styles
+    :returns: The statistics keyed by `<size>/<phase>/<operation>`
+    :rtype: dict
+    """
+    identification = PythonPackageIdentification()
+    augmentation = PythonPackageAugmentation()
+
+    def augment(desc):
+        desc.type = 'python'
+        augmentation.augment_package(desc)
+
+    results = {}
+    for size in sizes:
+        with TemporaryDirectory(prefix='colcon_benchmark_') as basepath:
+            package_paths = generate_workspace(basepath, size, styles)
+            invalidate_setup_information()
+            for phase in ('cold', 'warm'):
+                for operation, function in (
+                    ('identify', identification.identify),
+                    ('augment', augment),
+                ):
+                    if phase == 'cold' and operation == 'augment':
+                        invalidate_setup_information()
+                    key = f'{size}/{phase}/{operation}'
+                    results[key] = measure(function, package_paths)
+                    _print_result(key, results[key])
+    return results
+
+
+def _print_result(key, result):
+    print(
+        f"{key:<24} {result['throughput']:>10.1f} pkg/s "
+        f"p50 {result['p50'] * 1000:>8.2f} ms "
+        f"p99 {result['p99'] * 1000:>8.2f} ms "
+        f"peak {result['peak_memory'] // 1024:>8} KiB")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the throughput with a baseline.
+
+    :param dict results: The results of :func:`run_benchmark`
+    :param dict baseline: Previously saved results
+    :param float tolerance: The relative decrease in throughput which is
+      still acceptable
+    :returns: The keys of the regressed results
+    :rtype: list
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline or not baseline[key]['throughput']:
+            continue
+        ratio = result['throughput'] / baseline[key]['throughput']
+        if ratio < 1 - tolerance:
+            print(
+                f'Regression in {key}: {ratio:.0%} of the baseline '
+                'throughput', file=sys.stderr)
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    """
+    Run the benchmark.
+
+    :param list argv: The command line arguments
+    :returns: The return code, 1 if a regression has been detected
+    """
+    parser = argparse.ArgumentParser(
+        description='Measure the throughput of identifying and augmenting '
+                    'Python packages with setup.py files')
+    parser.add_argument(
+        '--sizes', default='10,100',
+        help='Comma separated numbers of packages (default: 10,100)')
+    parser.add_argument(
+        '--styles', default=','.join(STYLES.keys()),
+        help='Comma separated setup.py styles (default: all of '
+             f"{', '.join(STYLES.keys())})")
+    parser.add_argument(
+        '--output', type=Path, help='Write the results as JSON')
+    parser.add_argument(
+        '--save-baseline', type=Path,
+        help='Save the results as a baseline for future comparisons')
+    parser.add_argument(
+        '--baseline', type=Path,
+        help='Compare the throughput with a previously saved baseline')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='The acceptable relative decrease in throughput (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    styles = args.styles.split(',')
+    unknown_styles = set(styles) - set(STYLES.keys())
+    if unknown_styles:
+        parser.error(f"Unknown styles: {', '.join(sorted(unknown_styles))}")
+
+    results = run_benchmark(sizes, styles)
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(results, indent=2) + '\n')
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
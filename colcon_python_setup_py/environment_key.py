@@ -0,0 +1,64 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+# environment variables which affect the startup of the interpreter
+_STARTUP_ENVIRONMENT_PREFIXES = ('PYTHON', 'SETUPTOOLS_')
+# the home directory determines the user site-packages directory
+_STARTUP_ENVIRONMENT_NAMES = ('APPDATA', 'HOME', 'USERPROFILE')
+
+
+def get_startup_environment(env):
+    """
+    Get the environment variables affecting the startup of an interpreter.
+
+    Those variables determine which setuptools version is being used and
+    which modules are importable.
+
+    :param env: The environment variables
+    :returns: The sorted names and values of the relevant variables
+    :rtype: tuple
+    """
+    return tuple(sorted(
+        (k, v) for k, v in env.items()
+        if k.startswith(_STARTUP_ENVIRONMENT_PREFIXES) or
+        k in _STARTUP_ENVIRONMENT_NAMES))
+
+
+def get_environment_key(env, names, *, startup_environment=None):
+    """
+    Get the key identifying the environment relevant for an evaluation.
+
+    The key consists of the variables affecting the startup of the
+    interpreter as well as the values of the variables which have been read
+    while evaluating a setup.py file.
+
+    :param env: The environment variables
+    :param names: The tuple of variable names which have been read, or None
+      if the whole environment is relevant
+    :param startup_environment: The result of
+      :func:`get_startup_environment` if it has already been computed for
+      this environment
+    :returns: A hashable key which is equal for environments which don't
+      differ in any relevant variable
+    :rtype: tuple
+    """
+    if startup_environment is None:
+        startup_environment = get_startup_environment(env)
+    if names is None:
+        return (startup_environment, None, tuple(sorted(env.items())))
+    return (startup_environment, names, tuple(env.get(n) for n in names))
+
+
+def matches_environment_key(key, env, *, startup_environment=None):
+    """
+    Check if an environment matches a key.
+
+    :param tuple key: The key returned by :func:`get_environment_key`
+    :param env: The environment variables
+    :param startup_environment: The result of
+      :func:`get_startup_environment` if it has already been computed for
+      this environment
+    :rtype: bool
+    """
+    return key == get_environment_key(
+        env, key[1], startup_environment=startup_environment)
@@ -0,0 +1,725 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+# This file is being executed as a script by a separate Python interpreter
+# which might not be able to import colcon or this package.
+# Therefore it must only use the standard library and setuptools.
+
+import json
+import os
+import sys
+import time
+import traceback
+import warnings
+
+
+def preimport():
+    """Import the modules needed to evaluate setup.py files."""
+    # setuptools needs to be imported before distutils
+    # to avoid warning introduced in setuptools 49.2.0
+    try:
+        from setuptools.extern.packaging.specifiers \
+            import SpecifierSet  # noqa: F401
+    except ImportError:
+        pass
+    # newer versions expose 'packaging' directly
+    # on Arch 'extern' isn't part of the package
+    try:
+        from packaging.specifiers import SpecifierSet  # noqa: F401,F811
+    except ImportError:
+        pass
+    import distutils.core  # noqa: F401
+
+
+def get_setup_data():
+    """
+    Dry run the setup.py file in the current working directory.
+
+    :returns: The data describing the package
+    :rtype: dict
+    """
+    import distutils.core
+    from distutils.core import run_setup
+
+    # a reused interpreter still references the distribution of the
+    # previously evaluated file which would be returned if the setup.py file
+    # doesn't call setup()
+    distutils.core._setup_distribution = None
+    dist = run_setup(
+        'setup.py', script_args=('--dry-run',), stop_after='config')
+
+    skip_keys = ('cmdclass', 'distclass', 'ext_modules', 'metadata')
+    data = {
+        key: value for key, value in dist.__dict__.items()
+        if (
+            # skip private properties
+            not key.startswith('_') and
+            # skip methods
+            not callable(value) and
+            # skip objects whose representation can't be evaluated
+            key not in skip_keys and
+            # skip display options since they have no value,
+            # using metadata instead
+            key not in dist.display_option_names
+        )
+    }
+    data['metadata'] = {
+        k: v for k, v in dist.metadata.__dict__.items()
+        # skip values with custom type OrderedSet
+        if k not in ('license_files', 'provides_extras')}
+    return data
+
+
+def get_profiled_setup_data(profile):
+    """
+    Dry run the setup.py file in the current working directory.
+
+    :param dict profile: A dictionary with the keys `path` and `threshold`
+      to profile the evaluation and write the profile to the path if it
+      took longer than the threshold in seconds, or None
+    :returns: The data describing the package and the path of the written
+      profile or None
+    :rtype: tuple
+    """
+    if profile is None:
+        return get_setup_data(), None
+    import cProfile
+
+    profiler = cProfile.Profile()
+    start = time.monotonic()
+    profiler.enable()
+    try:
+        data = get_setup_data()
+    finally:
+        profiler.disable()
+    if time.monotonic() - start < profile['threshold']:
+        return data, None
+    try:
+        profiler.dump_stats(profile['path'])
+    except OSError:
+        traceback.print_exc()
+        return data, None
+    return data, profile['path']
+
+
+# The messages exchanged with the evaluating interpreter are JSON documents
+# prefixed with their length as a 4 byte big-endian integer.
+# Values which JSON can't represent are encoded as objects with a single key
+# starting with a dollar sign:
+#   {"$tuple": [...]}, {"$set": [...]}, {"$frozenset": [...]},
+#   {"$bytes": "<latin-1 decoded>"} and {"$dict": [[key, value], ...]}
+# where the latter is used for dictionaries with keys which aren't strings
+# or which start with a dollar sign.
+
+
+def to_json(value):
+    """
+    Convert a value into a structure which can be serialized as JSON.
+
+    :param value: The value consisting of `None`, `bool`, `int`, `float`,
+      `str`, `bytes`, `list`, `tuple`, `set`, `frozenset` and `dict`
+    :returns: The converted value
+    :raises TypeError: if the value contains an unsupported type
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [to_json(v) for v in value]
+    if isinstance(value, tuple):
+        return {'$tuple': [to_json(v) for v in value]}
+    if isinstance(value, frozenset):
+        return {'$frozenset': [to_json(v) for v in value]}
+    if isinstance(value, set):
+        return {'$set': [to_json(v) for v in value]}
+    if isinstance(value, dict):
+        if all(
+            isinstance(k, str) and not k.startswith('$') for k in value
+        ):
+            return {k: to_json(v) for k, v in value.items()}
+        return {
+            '$dict': [[to_json(k), to_json(v)] for k, v in value.items()]}
+    if isinstance(value, bytes):
+        return {'$bytes': value.decode('latin-1')}
+    raise TypeError(f"unsupported type '{type(value).__name__}'")
+
+
+_TAGGED_TYPES = {
+    '$tuple': tuple,
+    '$set': set,
+    '$frozenset': frozenset,
+    '$bytes': lambda value: value.encode('latin-1'),
+    '$dict': dict,
+}
+
+
+def _object_hook(obj):
+    if len(obj) == 1:
+        (key, value), = obj.items()
+        if key in _TAGGED_TYPES:
+            return _TAGGED_TYPES[key](value)
+    return obj
+
+
+def project_setup_data(data, fields):
+    """
+    Select a subset of the data describing a package.
+
+    :param dict data: The data returned by :func:`get_setup_data`
+    :param fields: The names of the keys to select, the keys of the
+      metadata are prefixed with `metadata.`
+    :returns: The selected data, always containing the key `metadata`
+    :rtype: dict
+    """
+    projection = {}
+    metadata = data.get('metadata') or {}
+    projected_metadata = {}
+    for field in fields:
+        if field.startswith('metadata.'):
+            name = field[len('metadata.'):]
+            if name in metadata:
+                projected_metadata[name] = metadata[name]
+        elif field != 'metadata' and field in data:
+            projection[field] = data[field]
+    projection['metadata'] = projected_metadata
+    return projection
+
+
+def setup_data_to_json(data):
+    """
+    Convert the data describing a package for serialization.
+
+    Values which can't be represented are skipped.
+
+    :param dict data: The data returned by :func:`get_setup_data`
+    :returns: The converted data and the list of skipped keys
+    :rtype: tuple
+    """
+    skipped = []
+
+    def convert(mapping, prefix):
+        converted = {}
+        for key, value in mapping.items():
+            if key == 'metadata' and not prefix:
+                converted[key] = convert(value, 'metadata.')
+                continue
+            try:
+                converted[key] = to_json(value)
+            except TypeError:
+                skipped.append(prefix + key)
+        return converted
+
+    return convert(data, ''), skipped
+
+
+def write_message(stream, message):
+    """
+    Write a message to a binary stream.
+
+    :param stream: The stream
+    :param message: The result of :func:`to_json`
+    """
+    payload = encode_payload(message)
+    stream.write(len(payload).to_bytes(4, 'big') + payload)
+    stream.flush()
+
+
+def encode_payload(message):
+    """
+    Encode the payload of a message.
+
+    :param message: The result of :func:`to_json`
+    :returns: The payload
+    :rtype: bytes
+    """
+    return json.dumps(message, separators=(',', ':')).encode('ascii')
+
+
+def read_message(stream):
+    """
+    Read a message from a binary stream.
+
+    :param stream: The stream
+    :returns: The decoded message, or None if the stream ended
+    :raises EOFError: if the stream ended in the middle of a message
+    """
+    payload = read_payload(stream)
+    if payload is None:
+        return None
+    return decode_payload(payload)
+
+
+def read_payload(stream):
+    """
+    Read the encoded payload of a message from a binary stream.
+
+    :param stream: The stream
+    :returns: The payload, or None if the stream ended
+    :rtype: bytes
+    :raises EOFError: if the stream ended in the middle of a message
+    """
+    header = stream.read(4)
+    if not header:
+        return None
+    if len(header) < 4:
+        raise EOFError('truncated message header')
+    length = int.from_bytes(header, 'big')
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise EOFError('truncated message')
+    return payload
+
+
+def decode_payload(payload):
+    """
+    Decode the payload of a message.
+
+    :param bytes payload: The payload returned by :func:`read_payload`
+    :returns: The decoded message
+    """
+    return json.loads(payload.decode('ascii'), object_hook=_object_hook)
+
+
+def _get_max_rss():
+    # the peak resident set size of the interpreter in KiB
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # reported in bytes instead of KiB
+        max_rss //= 1024
+    return max_rss
+
+
+def _redirect_stdout():
+    # use a private file descriptor for the results
+    # and redirect any output of the setup.py files to stderr
+    results = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return results
+
+
+class _RecordingEnviron(type(os.environ)):
+    """
+    The environment variables recording which variables are being read.
+
+    The instance shares the underlying data with `os.environ`.
+    """
+
+    def __init__(self, environ):
+        self.__dict__.update(environ.__dict__)
+        self.recording = False
+        self.names = set()
+        self.all_names = False
+
+    def start(self):
+        self.names = set()
+        self.all_names = False
+        self.recording = True
+
+    def stop(self):
+        """
+        Stop recording.
+
+        :returns: The sorted names of the read environment variables, or
+          None if the whole environment might affect the result
+        :rtype: list
+        """
+        self.recording = False
+        # without audit hooks spawned processes can't be detected
+        if self.all_names or not hasattr(sys, 'addaudithook'):
+            return None
+        return sorted(self.names)
+
+    def __getitem__(self, key):
+        if self.recording:
+            self.names.add(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if self.recording:
+            self.names.add(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self.recording:
+            self.names.add(key)
+        super().__delitem__(key)
+
+    def __iter__(self):
+        if self.recording:
+            self.all_names = True
+        return super().__iter__()
+
+    def __len__(self):
+        if self.recording:
+            self.all_names = True
+        return super().__len__()
+
+
+# audit events of functions passing the whole environment to another process
+_PROCESS_AUDIT_EVENTS = (
+    'os.exec', 'os.posix_spawn', 'os.spawn', 'os.startfile', 'os.system',
+    'subprocess.Popen')
+
+
+def _record_environ():
+    environ = _RecordingEnviron(os.environ)
+    os.environ = environ
+
+    def audit_hook(event, args):
+        if environ.recording and event in _PROCESS_AUDIT_EVENTS:
+            environ.all_names = True
+
+    if hasattr(sys, 'addaudithook'):
+        sys.addaudithook(audit_hook)
+    return environ
+
+
+class _InputRecorder:
+    """Record the files and directories read within a directory."""
+
+    def __init__(self):
+        self.recording = False
+        self.base_path = None
+        self.files = set()
+        self.directories = set()
+        self.modules = None
+        self.incomplete = False
+
+    def start(self, base_path):
+        self.base_path = os.path.join(os.path.abspath(base_path), '')
+        self.files = set()
+        self.directories = set()
+        self.modules = set(sys.modules.keys())
+        self.incomplete = False
+        self.recording = True
+
+    def stop(self):
+        """
+        Stop recording.
+
+        The files of modules imported from within the directory are
+        considered to be read as well.
+
+        :returns: A dictionary with the sorted absolute paths of the read
+          `files` and listed `directories`, or None if the reads can't be
+          detected
+        :rtype: dict
+        """
+        self.recording = False
+        if self.incomplete or not hasattr(sys, 'addaudithook'):
+            return None
+        for name, module in list(sys.modules.items()):
+            if name not in self.modules:
+                path = getattr(module, '__file__', None)
+                if isinstance(path, str):
+                    self._add(self.files, path)
+        return {
+            'files': sorted(self.files),
+            'directories': sorted(self.directories),
+        }
+
+    def audit_hook(self, event, args):
+        if not self.recording:
+            return
+        try:
+            self._handle_event(event, args)
+        except Exception:  # noqa: B902
+            # never interfere with the audited operation
+            self.incomplete = True
+
+    def _handle_event(self, event, args):
+        if event == 'open':
+            path, mode, flags = args
+            if mode is not None:
+                writing = any(c in mode for c in 'wax+')
+            else:
+                writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+            # the source files of bytecode are recorded as modules
+            if not writing:
+                self._add(self.files, path, skip_bytecode=True)
+        elif event in ('os.listdir', 'os.scandir'):
+            path = args[0]
+            self._add(self.directories, '.' if path is None else path)
+
+    def _add(self, paths, path, *, skip_bytecode=False):
+        if isinstance(path, int):
+            # file descriptors of already opened files
+            return
+        try:
+            path = os.fsdecode(os.fspath(path))
+        except TypeError:
+            return
+        path = os.path.abspath(path)
+        if not os.path.join(path, '').startswith(self.base_path):
+            return
+        if skip_bytecode and '__pycache__' in path.split(os.sep):
+            return
+        paths.add(path)
+
+
+def _record_inputs():
+    recorder = _InputRecorder()
+    if hasattr(sys, 'addaudithook'):
+        sys.addaudithook(recorder.audit_hook)
+    return recorder
+
+
+def evaluate(fields=None, profile=None):
+    """
+    Evaluate the setup.py file and write the result to stdout.
+
+    :param list fields: The fields to return as described by
+      :func:`project_setup_data`, or None for all fields
+    :param dict profile: The profiling parameters as described by
+      :func:`get_profiled_setup_data`, or None
+
+    The result is a single message containing a dictionary with the keys
+    `data`, `skipped`, `environment_names`, `inputs`, `timings`,
+    `max_rss` and `profile`.
+    If the setup.py file fails the message contains the keys `error`,
+    `environment_names` and `inputs` instead and the exception is raised
+    again.
+    Any output of the setup.py file is redirected to stderr.
+    """
+    results = _redirect_stdout()
+    environ = _record_environ()
+    inputs = _record_inputs()
+    environ.start()
+    start = time.monotonic()
+    preimport()
+    import_time = time.monotonic() - start
+    inputs.start(os.getcwd())
+    try:
+        data, profile_path = get_profiled_setup_data(profile)
+    except BaseException:  # noqa: B902
+        # the inputs allow the caller to cache the failure until they change
+        write_message(results, {
+            'error': traceback.format_exc(),
+            'environment_names': environ.stop(),
+            'inputs': inputs.stop(),
+        })
+        raise
+    input_paths = inputs.stop()
+    run_setup_time = time.monotonic() - start - import_time
+    if fields is not None:
+        data = project_setup_data(data, fields)
+    data, skipped = setup_data_to_json(data)
+    write_message(results, {
+        'data': data,
+        'skipped': skipped,
+        'environment_names': environ.stop(),
+        'inputs': input_paths,
+        'timings': {'import': import_time, 'run_setup': run_setup_time},
+        'max_rss': _get_max_rss(),
+        'profile': profile_path,
+    })
+
+
+class _ModuleState:
+    """Snapshot of the interpreter state a setup.py file might modify."""
+
+    # modules whose attributes must not be modified by a setup.py file
+    # for the interpreter to be reusable
+    watched_modules = (
+        'distutils.core', 'distutils.dist', 'setuptools', 'setuptools.dist')
+
+    def __init__(self):
+        self.cwd = os.getcwd()
+        self.environ = dict(os.environ)
+        self.modules = dict(sys.modules)
+        self.path = list(sys.path)
+        self.argv = list(sys.argv)
+        self.warnings_filters = list(warnings.filters)
+        self.attributes = self._get_attributes()
+
+    def _get_attributes(self):
+        attributes = {}
+        for name in self.watched_modules:
+            module = sys.modules.get(name)
+            if module is not None:
+                # private attributes like the last distribution of
+                # distutils.core are expected to change
+                attributes[name] = {
+                    k: id(v) for k, v in vars(module).items()
+                    if not k.startswith('_')}
+        return attributes
+
+    def restore(self):
+        """
+        Restore the snapshot.
+
+        :returns: True if the state couldn't be restored completely
+        :rtype: bool
+        """
+        dirty = False
+        for name in list(sys.modules.keys()):
+            if name not in self.modules:
+                del sys.modules[name]
+        for name, module in self.modules.items():
+            if sys.modules.get(name) is not module:
+                dirty = True
+        if self._get_attributes() != self.attributes:
+            dirty = True
+        sys.path[:] = self.path
+        sys.argv[:] = self.argv
+        warnings.filters[:] = self.warnings_filters
+        _set_environ(self.environ)
+        os.chdir(self.cwd)
+        return dirty
+
+
+def _set_environ(environ):
+    for name in list(os.environ.keys()):
+        if name not in environ:
+            del os.environ[name]
+    for name, value in environ.items():
+        if os.environ.get(name) != value:
+            os.environ[name] = value
+
+
+class _OutputCapture:
+    """Capture the output written to the file descriptors 1 and 2."""
+
+    def __init__(self):
+        import tempfile
+
+        self.file = tempfile.TemporaryFile()
+        self.saved = None
+
+    def start(self):
+        self.file.seek(0)
+        self.file.truncate()
+        _flush_std_streams()
+        self.saved = (os.dup(1), os.dup(2))
+        os.dup2(self.file.fileno(), 1)
+        os.dup2(self.file.fileno(), 2)
+
+    def stop(self):
+        """
+        Stop capturing.
+
+        :returns: The captured output
+        :rtype: str
+        """
+        _flush_std_streams()
+        for fd, saved in zip((1, 2), self.saved):
+            os.dup2(saved, fd)
+            os.close(saved)
+        self.saved = None
+        self.file.seek(0)
+        return self.file.read().decode(errors='replace')
+
+
+def _flush_std_streams():
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:  # noqa: B902
+            # a setup.py file might have replaced or closed the stream
+            pass
+
+
+def serve(max_jobs):
+    """
+    Evaluate setup.py files requested on stdin.
+
+    Each request is a message containing a dictionary with the keys `cwd`,
+    `env` and optionally `fields` and `profile`.
+    Each response is a message containing a dictionary with either the keys
+    `data`, `skipped` and `profile` or the key `error` as well as the keys
+    `environment_names`, `inputs`, `output`, `timings`, `max_rss` and
+    `recycle`.
+    The output contains anything the setup.py file wrote to stdout and
+    stderr.
+    The import time is only reported in the first response.
+    The interpreter exits after `max_jobs` requests or when a setup.py file
+    modified the state of the interpreter in a way which can't be reverted.
+
+    :param int max_jobs: The maximum number of requests to handle
+    """
+    # use private file descriptors for the requests and responses,
+    # the setup.py files read from an empty stdin
+    # and any output of them is captured for each request
+    requests = os.fdopen(os.dup(sys.stdin.fileno()), 'rb')
+    with open(os.devnull, 'rb') as devnull:
+        os.dup2(devnull.fileno(), sys.stdin.fileno())
+    responses = _redirect_stdout()
+
+    start = time.monotonic()
+    preimport()
+    import_time = time.monotonic() - start
+    environ = _record_environ()
+    inputs = _record_inputs()
+    output = _OutputCapture()
+
+    for job in range(max_jobs):
+        request = read_message(requests)
+        if request is None:
+            break
+
+        state = _ModuleState()
+        response = {}
+        start = time.monotonic()
+        output.start()
+        try:
+            _set_environ(request['env'])
+            os.chdir(request['cwd'])
+            environ.start()
+            inputs.start(request['cwd'])
+            data, response['profile'] = get_profiled_setup_data(
+                request.get('profile'))
+            response['inputs'] = inputs.stop()
+            response['environment_names'] = environ.stop()
+            if request.get('fields') is not None:
+                data = project_setup_data(data, request['fields'])
+            response['data'], response['skipped'] = setup_data_to_json(data)
+        except BaseException:  # noqa: B902
+            response['inputs'] = inputs.stop()
+            response['environment_names'] = environ.stop()
+            response['error'] = traceback.format_exc()
+        response['output'] = output.stop()
+        response['timings'] = {
+            'import': import_time, 'run_setup': time.monotonic() - start}
+        response['max_rss'] = _get_max_rss()
+        import_time = 0.0
+        dirty = state.restore()
+        response['recycle'] = dirty or job + 1 >= max_jobs
+
+        write_message(responses, response)
+        if response['recycle']:
+            break
+
+
+def main(argv):
+    """
+    Evaluate one or multiple setup.py files.
+
+    :param list argv: Either `--serve` followed by the maximum number of
+      requests to handle or options to evaluate the setup.py file in the
+      current working directory: `--fields` followed by the comma separated
+      fields to return and `--profile` followed by the path of the profile
+      and the threshold in seconds
+    """
+    if argv and argv[0] == '--serve':
+        serve(int(argv[1]))
+        return
+    fields = None
+    profile = None
+    while argv:
+        if argv[0] == '--fields':
+            fields = argv[1].split(',') if argv[1] else []
+            argv = argv[2:]
+        elif argv[0] == '--profile':
+            profile = {'path': argv[1], 'threshold': float(argv[2])}
+            argv = argv[3:]
+        else:
+            raise ValueError(f"unknown argument '{argv[0]}'")
+    evaluate(fields, profile)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
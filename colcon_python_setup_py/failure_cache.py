@@ -0,0 +1,170 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+import subprocess
+from threading import Lock
+
+from colcon_python_setup_py.environment_key import get_environment_key
+from colcon_python_setup_py.environment_key import matches_environment_key
+from colcon_python_setup_py.input_files import are_inputs_unchanged
+from colcon_python_setup_py.input_files import get_input_fingerprints
+
+# the number of trailing lines of the output included in the message
+_OUTPUT_TAIL_LINES = 30
+
+
+class SetupPyError(subprocess.CalledProcessError):
+    """
+    The evaluation of a setup.py file failed.
+
+    The message names the setup.py file and contains the end of its output.
+    """
+
+    def __init__(
+        self, setup_py, returncode, cmd, stderr=None, *,
+        environment_names=None, inputs=None, cached=False,
+    ):
+        """
+        Construct an error.
+
+        :param Path setup_py: The path of the setup.py file
+        :param int returncode: The exit code of the evaluation
+        :param cmd: The command which evaluated the setup.py file
+        :param str stderr: The output of the setup.py file
+        :param environment_names: The tuple of environment variable names
+          which have been read, or None if they are unknown
+        :param dict inputs: The files and directories which have been read,
+          or None if they are unknown
+        :param bool cached: The flag if the error is a repetition of a
+          previous failure
+        """
+        super().__init__(returncode, cmd, stderr=stderr)
+        self.setup_py = setup_py
+        self.environment_names = environment_names
+        self.inputs = inputs
+        self.cached = cached
+
+    def __str__(self):  # noqa: D105
+        message = (
+            f"Failed to evaluate '{self.setup_py}' "
+            f'(exit code {self.returncode})')
+        if self.cached:
+            message += (
+                ' previously, it is not evaluated again until the file or '
+                'its inputs change')
+        lines = (self.stderr or '').rstrip().splitlines()
+        if lines:
+            message += ':\n' + '\n'.join(lines[-_OUTPUT_TAIL_LINES:])
+        return message
+
+
+class FailureCache:
+    """
+    The failed evaluations of setup.py files.
+
+    A failure is keyed by the relevant environment like a successful result
+    and is dropped as soon as the setup.py file or any of the files and
+    directories it read change.
+    If the read files are unknown only the setup.py file and the implicit
+    inputs are considered.
+
+    The cache is thread-safe.
+    """
+
+    def __init__(self):  # noqa: D107
+        self._lock = Lock()
+        self._entries = {}
+        self.hits = 0
+
+    def __len__(self):  # noqa: D105
+        with self._lock:
+            return sum(len(v) for v in self._entries.values())
+
+    def get(self, setup_py, env, *, startup_environment=None):
+        """
+        Get the error of a previous evaluation.
+
+        :param Path setup_py: The path of the setup.py file
+        :param env: The environment variables
+        :param tuple startup_environment: The result of
+          :func:`get_startup_environment` for the environment
+        :returns: The error to raise, or None if there is no failure for the
+          environment or the inputs changed since
+        :rtype: SetupPyError
+        """
+        path = Path(str(setup_py))
+        with self._lock:
+            entries = list(self._entries.get(path, ()))
+        for entry in entries:
+            environment_key, fingerprints, error = entry
+            if not matches_environment_key(
+                environment_key, env, startup_environment=startup_environment
+            ):
+                continue
+            if not are_inputs_unchanged(fingerprints):
+                self._remove(path, entry)
+                continue
+            with self._lock:
+                self.hits += 1
+            return SetupPyError(
+                error.setup_py, error.returncode, error.cmd, error.stderr,
+                environment_names=error.environment_names,
+                inputs=error.inputs, cached=True)
+        return None
+
+    def put(self, setup_py, env, error, *, startup_environment=None):
+        """
+        Add the error of an evaluation.
+
+        :param Path setup_py: The path of the setup.py file
+        :param env: The environment variables of the evaluation
+        :param SetupPyError error: The error
+        :param tuple startup_environment: The result of
+          :func:`get_startup_environment` if it has already been computed for
+          the environment
+        """
+        path = Path(str(setup_py))
+        environment_names = error.environment_names
+        if environment_names is not None:
+            environment_names = tuple(environment_names)
+        environment_key = get_environment_key(
+            env, environment_names, startup_environment=startup_environment)
+        inputs = error.inputs or {'files': [], 'directories': []}
+        # the setup.py file itself might not have been read successfully
+        inputs = {
+            'files': list(inputs['files']) + [os.path.abspath(str(path))],
+            'directories': inputs['directories'],
+        }
+        fingerprints = get_input_fingerprints(path.parent, inputs)
+        with self._lock:
+            entries = [
+                e for e in self._entries.get(path, ())
+                if e[0] != environment_key]
+            entries.append((environment_key, fingerprints, error))
+            self._entries[path] = entries
+
+    def invalidate(self, setup_py=None):
+        """
+        Remove failures.
+
+        :param Path setup_py: The path of the setup.py file, or None to
+          remove the failures of all files
+        :returns: The number of removed failures
+        :rtype: int
+        """
+        with self._lock:
+            if setup_py is None:
+                count = sum(len(v) for v in self._entries.values())
+                self._entries.clear()
+                return count
+            return len(self._entries.pop(Path(str(setup_py)), ()))
+
+    def _remove(self, path, entry):
+        with self._lock:
+            entries = self._entries.get(path)
+            if entries is not None and entry in entries:
+                entries.remove(entry)
+                if not entries:
+                    del self._entries[path]
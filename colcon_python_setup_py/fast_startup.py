@@ -0,0 +1,114 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import atexit
+import os
+from pathlib import Path
+import subprocess
+import sys
+from threading import Lock
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py.environment_key import get_startup_environment
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to start interpreters with a cached module path"""
+FAST_STARTUP_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_FAST_STARTUP',
+    'Set to 1 to start the interpreters evaluating setup.py files with a '
+    'module search path computed once per environment instead of '
+    'processing the site-packages and .pth files every time')
+
+# the seconds after which creating a snapshot is abandoned
+_SNAPSHOT_TIMEOUT = 60
+
+# the paths of the snapshots for each startup environment, None if the
+# snapshot couldn't be created
+_snapshots = {}
+_snapshots_lock = Lock()
+_snapshot_directory = None
+
+
+def is_fast_startup_enabled():
+    """
+    Check if interpreters should be started with a snapshot.
+
+    :rtype: bool
+    """
+    return os.environ.get(FAST_STARTUP_ENVIRONMENT_VARIABLE.name) in (
+        '1', 'true')
+
+
+def get_startup_snapshot(env):
+    """
+    Get the startup snapshot for interpreters using an environment.
+
+    The snapshot is created once per process for each combination of the
+    environment variables affecting the startup of the interpreter by
+    starting an interpreter normally, see
+    :func:`colcon_python_setup_py.startup_snapshot.create_snapshot`.
+
+    :param env: The environment variables of the interpreter
+    :returns: The path of the snapshot, or None if it couldn't be created
+    :rtype: str
+    """
+    startup_environment = get_startup_environment(env)
+    with _snapshots_lock:
+        if startup_environment not in _snapshots:
+            _snapshots[startup_environment] = _create_snapshot(
+                env, len(_snapshots))
+        return _snapshots[startup_environment]
+
+
+def get_startup_code(snapshot):
+    """
+    Get the code applying a snapshot before executing a script.
+
+    :param str snapshot: The path of the snapshot
+    :returns: The code to pass to an interpreter started with `-S`
+    :rtype: str
+    """
+    script = str(Path(__file__).parent / 'startup_snapshot.py')
+    return (
+        f'path = {script!r}\n'
+        "with open(path, 'rb') as f:\n"
+        "    code = compile(f.read(), path, 'exec')\n"
+        "startup = {'__name__': 'startup_snapshot', '__file__': path}\n"
+        'exec(code, startup)\n'
+        f"startup['apply_snapshot']({snapshot!r})\n"
+        'del startup\n')
+
+
+def _create_snapshot(env, index):
+    global _snapshot_directory
+
+    from colcon_python_setup_py.worker_pool import get_script_code
+
+    if _snapshot_directory is None:
+        import shutil
+        import tempfile
+
+        _snapshot_directory = tempfile.mkdtemp(prefix='colcon_startup_')
+        atexit.register(shutil.rmtree, _snapshot_directory, True)
+    snapshot = os.path.join(_snapshot_directory, f'{index}.marshal')
+    package_path = Path(__file__).parent
+    cmd = [
+        sys.executable, '-c',
+        get_script_code(str(package_path / 'startup_snapshot.py')),
+        snapshot, str(package_path / 'evaluate_setup_py.py')]
+    try:
+        # the working directory is empty to not find any modules in it
+        subprocess.run(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, cwd=_snapshot_directory, env=env,
+            check=True, timeout=_SNAPSHOT_TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as e:
+        stderr = getattr(e, 'stderr', None) or b''
+        logger.warning(
+            'Failed to create the startup snapshot, starting interpreters '
+            f"normally: {e}\n{stderr.decode(errors='replace')}".rstrip())
+        return None
+    logger.debug(f"Created the startup snapshot '{snapshot}'")
+    return snapshot
@@ -0,0 +1,208 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from collections import deque
+import os
+from threading import Condition
+from threading import Lock
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to set the timeout of evaluating a setup.py file"""
+TIMEOUT_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_TIMEOUT',
+    'Set the number of seconds after which the evaluation of a setup.py '
+    'file is aborted (default: no timeout)')
+
+"""Environment variable to limit the number of concurrent evaluations"""
+MAX_EVALUATIONS_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_MAX_EVALUATIONS',
+    'Set the maximum number of setup.py files being evaluated concurrently '
+    '(default: based on the number of CPU cores and the available memory)')
+
+# the approximate memory needed by an interpreter evaluating a setup.py file
+_MEMORY_PER_EVALUATION = 100 * 1024 * 1024
+
+
+def _get_float_value(environment_variable):
+    value = os.environ.get(environment_variable.name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(
+            f"Ignoring invalid value '{value}' of environment variable "
+            f"'{environment_variable.name}'")
+        return None
+
+
+def get_evaluation_timeout():
+    """
+    Get the timeout of evaluating a setup.py file.
+
+    :returns: The number of seconds, or None if there is no timeout
+    :rtype: float
+    """
+    timeout = _get_float_value(TIMEOUT_ENVIRONMENT_VARIABLE)
+    if not timeout or timeout <= 0:
+        return None
+    return timeout
+
+
+def get_max_evaluations():
+    """
+    Get the maximum number of concurrent evaluations.
+
+    Unless configured explicitly the number is limited by the CPU cores as
+    well as by the currently available memory.
+
+    :rtype: int
+    """
+    value = _get_float_value(MAX_EVALUATIONS_ENVIRONMENT_VARIABLE)
+    if value is not None:
+        return max(1, int(value))
+    max_evaluations = os.cpu_count() or 1
+    available_memory = _get_available_memory()
+    if available_memory is not None:
+        max_evaluations = min(
+            max_evaluations, available_memory // _MEMORY_PER_EVALUATION)
+    return max(1, max_evaluations)
+
+
+def _get_available_memory(meminfo_path='/proc/meminfo'):
+    # the free memory excludes the page cache which can be reclaimed,
+    # the estimate of the available memory is only provided by Linux
+    try:
+        with open(meminfo_path, encoding='ascii') as h:
+            for line in h:
+                name, _, value = line.partition(':')
+                if name == 'MemAvailable':
+                    number, unit = value.split()
+                    if unit != 'kB':
+                        return None
+                    return int(number) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class EvaluationSemaphore:
+    """
+    A bounded semaphore which can be acquired by threads and coroutines.
+
+    Coroutines await a future instead of blocking a thread while waiting,
+    so threads of an executor are never occupied by waiting for the
+    semaphore.
+    """
+
+    def __init__(self, value):
+        """
+        Create a semaphore.
+
+        :param int value: The number of concurrent holders
+        """
+        self._initial_value = value
+        self._value = value
+        self._condition = Condition(Lock())
+        # the event loops and futures of waiting coroutines
+        self._waiters = deque()
+
+    def acquire(self, blocking=True):
+        """
+        Acquire the semaphore in the current thread.
+
+        :param bool blocking: Whether to wait until the semaphore is
+          available
+        :returns: True if the semaphore has been acquired
+        :rtype: bool
+        """
+        with self._condition:
+            while not self._value:
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self._value -= 1
+        return True
+
+    async def acquire_async(self):
+        """Acquire the semaphore without blocking the event loop."""
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._condition:
+                if self._value:
+                    self._value -= 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            except BaseException:  # noqa: B902
+                with self._condition:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        # the release already woke this coroutine, pass the
+                        # wakeup on to the next one
+                        self._wake_coroutine()
+                raise
+
+    def release(self):
+        """
+        Release the semaphore.
+
+        :raises ValueError: if the semaphore is released more often than
+          it has been acquired
+        """
+        with self._condition:
+            if self._value >= self._initial_value:
+                raise ValueError('Semaphore released too many times')
+            self._value += 1
+            # the woken thread and coroutine compete for the semaphore,
+            # the other one continues waiting
+            self._condition.notify()
+            self._wake_coroutine()
+
+    def _wake_coroutine(self):
+        # the lock must be held by the caller
+        while self._waiters:
+            loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_future_result, future)
+            except RuntimeError:
+                # the event loop has been closed
+                continue
+            return
+
+
+def _set_future_result(future):
+    if not future.done():
+        future.set_result(None)
+
+
+_evaluation_semaphore = None
+_evaluation_semaphore_lock = Lock()
+
+
+def get_evaluation_semaphore():
+    """
+    Get the semaphore limiting the number of concurrent evaluations.
+
+    The semaphore is shared by all evaluations within the process.
+
+    :rtype: EvaluationSemaphore
+    """
+    global _evaluation_semaphore
+    with _evaluation_semaphore_lock:
+        if _evaluation_semaphore is None:
+            max_evaluations = get_max_evaluations()
+            logger.debug(
+                f'Evaluating up to {max_evaluations} setup.py files '
+                'concurrently')
+            _evaluation_semaphore = EvaluationSemaphore(max_evaluations)
+    return _evaluation_semaphore
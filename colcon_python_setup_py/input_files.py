@@ -0,0 +1,141 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import hashlib
+import os
+
+# files which setuptools considers without the setup.py file reading them
+IMPLICIT_INPUT_FILES = ('setup.cfg', 'pyproject.toml')
+
+
+def get_input_fingerprints(package_path, inputs):
+    """
+    Get the fingerprints of the files and directories read by a setup.py.
+
+    The implicit inputs are always included, even if they don't exist,
+    since creating them changes the result.
+
+    :param package_path: The directory containing the setup.py file
+    :param dict inputs: A dictionary with the lists of absolute paths of
+      the read `files` and listed `directories`
+    :returns: The list of fingerprints, each a dictionary with the keys
+      `path`, `type` and depending on the type `mtime_ns`, `size` and
+      `sha256`
+    :rtype: list
+    """
+    files = set(inputs['files'])
+    files.update(
+        os.path.join(os.path.abspath(str(package_path)), name)
+        for name in IMPLICIT_INPUT_FILES)
+    fingerprints = []
+    for path in sorted(files):
+        fingerprints.append(_get_file_fingerprint(path))
+    for path in sorted(set(inputs['directories'])):
+        fingerprints.append(_get_directory_fingerprint(path))
+    return fingerprints
+
+
+def are_inputs_unchanged(fingerprints):
+    """
+    Check if the files and directories still match their fingerprints.
+
+    For each input a `stat` call is sufficient unless its modification time
+    changed.
+    Only then the content is being compared.
+
+    :param list fingerprints: The result of :func:`get_input_fingerprints`
+    :rtype: bool
+    """
+    for fingerprint in fingerprints:
+        if not _is_unchanged(fingerprint):
+            return False
+    return True
+
+
+def get_content_fingerprint(path):
+    """
+    Get the fingerprint of a file or directory only based on its content.
+
+    Unlike the fingerprints of :func:`get_input_fingerprints` it doesn't
+    contain the modification time which differs between machines.
+
+    :param str path: The absolute path
+    :returns: A dictionary with the key `type` and depending on the type
+      `sha256`
+    :rtype: dict
+    """
+    if os.path.isfile(path):
+        return {'type': 'file', 'sha256': _hash_file(path)}
+    if os.path.isdir(path):
+        return {'type': 'directory', 'sha256': _hash_directory(path)}
+    if os.path.lexists(path):
+        return {'type': 'other'}
+    return {'type': 'missing'}
+
+
+def _is_unchanged(fingerprint):
+    path = fingerprint['path']
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return fingerprint['type'] == 'missing'
+    except OSError:
+        return False
+    if fingerprint['type'] == 'file':
+        if stat.st_size != fingerprint['size']:
+            return False
+        if stat.st_mtime_ns == fingerprint['mtime_ns']:
+            return True
+        return _hash_file(path) == fingerprint['sha256']
+    if fingerprint['type'] == 'directory':
+        if stat.st_mtime_ns == fingerprint['mtime_ns']:
+            return True
+        return _hash_directory(path) == fingerprint['sha256']
+    return False
+
+
+def _get_file_fingerprint(path):
+    try:
+        stat = os.stat(path)
+        if not os.path.isfile(path):
+            return {'path': path, 'type': 'other'}
+        sha256 = _hash_file(path)
+    except FileNotFoundError:
+        return {'path': path, 'type': 'missing'}
+    except OSError:
+        return {'path': path, 'type': 'other'}
+    return {
+        'path': path, 'type': 'file', 'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size, 'sha256': sha256}
+
+
+def _get_directory_fingerprint(path):
+    try:
+        stat = os.stat(path)
+        sha256 = _hash_directory(path)
+    except FileNotFoundError:
+        return {'path': path, 'type': 'missing'}
+    except OSError:
+        return {'path': path, 'type': 'other'}
+    return {
+        'path': path, 'type': 'directory', 'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256}
+
+
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as h_file:
+        for chunk in iter(lambda: h_file.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_directory(path):
+    # only the names of the entries affect the listing,
+    # ignoring entries created by building the package
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        if name == '__pycache__' or name.endswith('.egg-info'):
+            continue
+        h.update(os.fsencode(name) + b'\0')
+    return h.hexdigest()
@@ -0,0 +1,220 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import atexit
+from collections import deque
+from contextlib import contextmanager
+import json
+import threading
+import time
+
+from colcon_core.location import get_log_path
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+# the name of the report in the log directory of the colcon invocation
+REPORT_FILENAME = 'python_setup_py_metrics.json'
+
+# the number of slowest packages summarized at the end
+_SLOWEST_COUNT = 10
+# the maximum number of records kept for long-lived processes
+_MAX_RECORDS = 10000
+
+# the durations in seconds which are being recorded for an evaluation
+DURATION_NAMES = (
+    # waiting for a worker or a concurrent evaluation of the same file
+    'queue',
+    # starting the interpreter and exchanging messages with it
+    'spawn',
+    # importing setuptools in the interpreter
+    'import',
+    # running the setup.py file until the configuration is complete
+    'run_setup',
+    # decoding the result
+    'decode',
+)
+
+_local = threading.local()
+_lock = threading.Lock()
+_records = deque(maxlen=_MAX_RECORDS)
+_atexit_registered = False
+
+
+@contextmanager
+def measure(setup_py):
+    """
+    Record the metrics of getting the information of a setup.py file.
+
+    Within the context :func:`add_duration` and :func:`set_value` update
+    the record of the current thread.
+
+    :param Path setup_py: The path of the setup.py file
+    :returns: A context manager yielding the record
+    """
+    global _atexit_registered
+    parent = getattr(_local, 'record', None)
+    record = {'setup_py': str(setup_py), 'cache': None}
+    _local.record = record
+    start = time.monotonic()
+    try:
+        yield record
+    finally:
+        record['total'] = time.monotonic() - start
+        _local.record = parent
+        if parent is None:
+            _log_record(record)
+            with _lock:
+                _records.append(record)
+                if not _atexit_registered:
+                    atexit.register(write_report)
+                    _atexit_registered = True
+
+
+def add_duration(name, seconds):
+    """
+    Add a duration to the record of the current thread.
+
+    :param str name: One of :data:`DURATION_NAMES`
+    :param float seconds: The duration
+    """
+    record = getattr(_local, 'record', None)
+    if record is not None:
+        record[name] = record.get(name, 0.0) + seconds
+
+
+def set_value(name, value):
+    """
+    Set a value in the record of the current thread.
+
+    :param str name: The name, e.g. `cache`, `static`, `payload_size` or
+      `max_rss`
+    :param value: The value
+    """
+    record = getattr(_local, 'record', None)
+    if record is not None:
+        record[name] = value
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the duration of the context to the record of the current thread.
+
+    :param str name: One of :data:`DURATION_NAMES`
+    """
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        add_duration(name, time.monotonic() - start)
+
+
+def add_evaluation(message, payload_size, round_trip, decode):
+    """
+    Add the metrics of an evaluation in a separate interpreter.
+
+    :param dict message: The decoded result of the evaluation
+    :param int payload_size: The size of the encoded result in bytes
+    :param float round_trip: The duration from sending the request until
+      receiving the result in seconds
+    :param float decode: The duration of decoding the result in seconds
+    """
+    timings = message.get('timings') or {}
+    for name in ('import', 'run_setup'):
+        add_duration(name, timings.get(name, 0.0))
+    add_duration('spawn', max(0.0, round_trip - sum(timings.values())))
+    add_duration('decode', decode)
+    set_value('payload_size', payload_size)
+    set_value('max_rss', message.get('max_rss'))
+
+
+def _log_record(record):
+    durations = ', '.join(
+        f'{name} {record[name]:.3f}s' for name in DURATION_NAMES
+        if name in record)
+    details = [f"total {record['total']:.3f}s"]
+    if durations:
+        details.append(durations)
+    if record['cache']:
+        details.append(f"{record['cache']} cache hit")
+    if record.get('static'):
+        details.append('read statically')
+    if record.get('payload_size') is not None:
+        details.append(f"payload {record['payload_size']} bytes")
+    if record.get('max_rss') is not None:
+        details.append(f"peak RSS {record['max_rss']} KiB")
+    logger.debug(
+        f"Metrics of '{record['setup_py']}': " + ', '.join(details))
+
+
+def get_records():
+    """
+    Get the records of all measurements.
+
+    :rtype: list
+    """
+    with _lock:
+        return list(_records)
+
+
+def get_report():
+    """
+    Aggregate the records of all measurements.
+
+    :returns: A dictionary with the keys `records`, `totals`, `cache` and
+      `slowest`
+    :rtype: dict
+    """
+    records = get_records()
+    totals = {
+        name: sum(r.get(name, 0.0) for r in records)
+        for name in ('total', ) + DURATION_NAMES}
+    cache = {}
+    for record in records:
+        cache_key = record['cache'] or 'miss'
+        cache[cache_key] = cache.get(cache_key, 0) + 1
+    evaluations = [r for r in records if r['cache'] is None]
+    slowest = sorted(
+        evaluations, key=lambda r: r['total'], reverse=True)[:_SLOWEST_COUNT]
+    return {
+        'records': records,
+        'totals': totals,
+        'cache': cache,
+        'slowest': [
+            {'setup_py': r['setup_py'], 'total': r['total']}
+            for r in slowest],
+    }
+
+
+def write_report():
+    """
+    Write the report to the log directory and summarize the slowest files.
+
+    Nothing is written if no setup.py file has been evaluated or if the
+    log directory doesn't exist.
+    """
+    report = get_report()
+    if not report['records']:
+        return
+    for entry in report['slowest']:
+        logger.info(
+            f"Evaluating '{entry['setup_py']}' took {entry['total']:.3f}s")
+    try:
+        log_path = get_log_path()
+    except TypeError:
+        # the default log path hasn't been set
+        return
+    if log_path is None or not log_path.is_dir():
+        return
+    report_path = log_path / REPORT_FILENAME
+    try:
+        report_path.write_text(json.dumps(report, indent=2) + '\n')
+    except OSError as e:
+        logger.debug(f"Failed to write report '{report_path}': {e}")
+
+
+def reset():
+    """Remove the records of all measurements."""
+    with _lock:
+        _records.clear()
@@ -1,6 +1,9 @@
 # Copyright 2016-2018 Dirk Thomas
 # Licensed under the Apache License, Version 2.0
 
+from functools import lru_cache
+
+from colcon_core.dependency_descriptor import DependencyDescriptor
 from colcon_core.package_augmentation \
     import PackageAugmentationExtensionPoint
 from colcon_core.package_augmentation.python import \
@@ -8,6 +11,10 @@ from colcon_core.package_augmentation.python import \
 from colcon_core.plugin_system import satisfies_version
 from colcon_python_setup_py.package_identification.python_setup_py import \
     get_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py import \
+    get_setup_information_async
+from colcon_python_setup_py.package_identification.python_setup_py import \
+    PACKAGE_FIELDS
 
 
 class PythonPackageAugmentation(PackageAugmentationExtensionPoint):
@@ -35,7 +42,8 @@ class PythonPackageAugmentation(PackageAugmentationExtensionPoint):
         if not setup_py.is_file():
             return
 
-        config = get_setup_information(setup_py)
+        # the getters below still provide all options
+        config = get_setup_information(setup_py, fields=PACKAGE_FIELDS)
 
         mapping = {
             ('build', 'setup_requires'),
@@ -60,6 +68,12 @@ class PythonPackageAugmentation(PackageAugmentationExtensionPoint):
 
         desc.metadata['get_python_setup_options'] = getter
 
+        async def async_getter(env):
+            # awaitable without blocking other jobs of the event loop
+            return await get_setup_information_async(setup_py, env=env)
+
+        desc.metadata['get_python_setup_options_async'] = async_getter
+
         desc.metadata['version'] = config['metadata'].get('version')
 
 
@@ -67,5 +81,22 @@ def _map_dependencies(options, mapping, dependencies):
     for dependency_type, option_name in mapping:
         dependencies.setdefault(dependency_type, set())
         dependencies[dependency_type].update(
-           create_dependency_descriptor(d)
+           _create_dependency_descriptor(d)
            for d in options.get(option_name) or ())
+
+
+# the number of distinct requirement strings whose parsed form is kept
+_MAX_PARSED_REQUIREMENTS = 4096
+
+
+@lru_cache(maxsize=_MAX_PARSED_REQUIREMENTS)
+def _parse_requirement(requirement_string):
+    descriptor = create_dependency_descriptor(requirement_string)
+    return descriptor.name, descriptor.metadata
+
+
+def _create_dependency_descriptor(requirement_string):
+    # the same requirements are used by many packages in a workspace,
+    # each package still gets its own descriptors since they are mutable
+    name, metadata = _parse_requirement(requirement_string)
+    return DependencyDescriptor(name, metadata=dict(metadata))
@@ -1,27 +1,46 @@
 # Copyright 2016-2018 Dirk Thomas
 # Licensed under the Apache License, Version 2.0
 
-import ast
-from contextlib import suppress
-with suppress(ImportError):
-    # needed before importing distutils
-    # to avoid warning introduced in setuptools 49.2.0
-    import setuptools
-import distutils.core
+import atexit
+from functools import partial
+import io
 import os
 from pathlib import Path
-import runpy
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 from threading import Lock
+import time
 import warnings
 
+from colcon_core.environment_variable import EnvironmentVariable
 from colcon_core.package_identification import logger
 from colcon_core.package_identification \
     import PackageIdentificationExtensionPoint
 from colcon_core.package_identification.python import \
     create_dependency_descriptor
 from colcon_core.plugin_system import satisfies_version
+from colcon_python_setup_py import governor
+from colcon_python_setup_py import metrics
+from colcon_python_setup_py import persistent_cache
+from colcon_python_setup_py import profiling
+from colcon_python_setup_py import shim_setup_py
+from colcon_python_setup_py import static_setup_py
+from colcon_python_setup_py import watch_daemon
+from colcon_python_setup_py import worker_pool
+from colcon_python_setup_py.environment_key import get_environment_key
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.environment_key import matches_environment_key
+from colcon_python_setup_py.evaluate_setup_py import decode_payload
+from colcon_python_setup_py.evaluate_setup_py import project_setup_data
+from colcon_python_setup_py.evaluate_setup_py import read_payload
+from colcon_python_setup_py.failure_cache import FailureCache
+from colcon_python_setup_py.failure_cache import SetupPyError
+from colcon_python_setup_py.input_files import get_input_fingerprints
+from colcon_python_setup_py.setup_information_cache import freeze
+from colcon_python_setup_py.setup_information_cache \
+    import SetupInformationCache
+from colcon_python_setup_py.workspace_index import get_workspace_index
 
 
 class PythonPackageIdentification(PackageIdentificationExtensionPoint):
@@ -43,9 +62,14 @@ class PythonPackageIdentification(PackageIdentificationExtensionPoint):
 
         setup_py = desc.path / 'setup.py'
         if not setup_py.is_file():
+            if desc.type is None and is_prefetch_enabled():
+                # start evaluating packages in subdirectories while the
+                # discovery continues crawling
+                _prefetch_subdirectories(desc.path)
             return
 
-        config = get_setup_information(setup_py)
+        # the augmentation requests the same fields and reuses the result
+        config = get_setup_information(setup_py, fields=PACKAGE_FIELDS)
 
         desc.type = 'python'
 
@@ -84,6 +108,17 @@ def get_setup_arguments(setup_py):
         'colcon_python_setup_py.package_identification.python_setup_py.'
         'get_setup_information() instead',
         stacklevel=2)
+    # importing setuptools is expensive, only do it when a file is evaluated
+    try:
+        # needed before importing distutils
+        # to avoid warning introduced in setuptools 49.2.0
+        import setuptools
+    except ImportError:
+        setuptools = None
+    import ast
+    import distutils.core
+    import runpy
+
     global cwd_lock
     if not cwd_lock:
         cwd_lock = Lock()
@@ -102,14 +137,14 @@ def get_setup_arguments(setup_py):
             try:
                 distutils_setup = distutils.core.setup
                 distutils.core.setup = mock_setup
-                with suppress(NameError):
+                if setuptools is not None:
                     setuptools_setup = setuptools.setup
                     setuptools.setup = mock_setup
                 # evaluate the setup.py file
                 runpy.run_path(str(setup_py))
             finally:
                 distutils.core.setup = distutils_setup
-                with suppress(NameError):
+                if setuptools is not None:
                     setuptools.setup = setuptools_setup
             # filter out any data which doesn't work with ast.literal_eval
             for key, value in list(data.items()):
@@ -198,6 +233,8 @@ def get_setup_arguments_with_context(setup_py, env):
     :returns: a dictionary containing the arguments of the setup() function
     :rtype: dict
     """
+    import ast
+
     pkg_path = Path(__file__).parents[3]
     if sys.platform == 'win32':
         pkg_path = str(pkg_path).replace(os.sep, os.altsep)
@@ -224,78 +261,849 @@ def get_setup_arguments_with_context(setup_py, env):
     return ast.literal_eval(output)
 
 
-_setup_information_cache = {}
+# the fields used by the package identification and augmentation, which
+# are also the keys whose changes affect the dependency graph of the
+# workspace
+PACKAGE_FIELDS = (
+    'metadata.name', 'metadata.version', 'setup_requires',
+    'install_requires', 'tests_require', 'extras_require')
 
+"""Environment variable to evaluate setup.py files ahead of time"""
+PREFETCH_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_PREFETCH',
+    'Set to 1 to start evaluating setup.py files in subdirectories in the '
+    'background while the package discovery continues')
 
-def get_setup_information(setup_py, *, env=None):
+# the cached results for each setup.py file and the relevant environment
+_setup_information_cache = SetupInformationCache()
+_setup_information_lock = Lock()
+# futures of evaluations in progress for each setup.py file and environment
+_pending_setup_information = {}
+# the errors of failed evaluations until the setup.py file or its inputs
+# change
+_setup_information_failures = FailureCache()
+# the number of background refreshes of each setup.py file, results
+# determined before a refresh finished aren't cached anymore
+_setup_information_refreshes = {}
+
+
+def get_setup_information(setup_py, *, env=None, fields=None):
     """
     Dry run the setup.py file and get the configuration information.
 
+    If the setup.py file only passes literals to the setup() function the
+    information is determined without running the file.
     A repeated invocation with the same arguments returns a cached result.
+    The cached result is also used for other environments as long as they
+    only differ in variables which the setup.py file didn't read.
+    If the persistent cache is enabled the result is also reused across
+    processes as long as the setup.py file, the interpreter and the
+    relevant environment variables are unchanged.
+    A failed evaluation isn't repeated for the same relevant environment
+    either, the error is raised again until the setup.py file or any of the
+    files it read change.
+
+    The returned information is read-only and shared between callers.
+    Callers only interested in a few fields can request them explicitly to
+    only transfer and keep those in memory.
 
     :param Path setup_py: path to a setup.py script
     :param dict env: environment variables to set before running setup.py
+    :param fields: names of the keys to return, the keys of the metadata
+      are prefixed with `metadata.` (e.g. `metadata.name`), or None to
+      return all keys
     :return: dictionary of data describing the package.
-    :raise: RuntimeError if the setup script encountered an error
+    :raise: SetupPyError if the setup script encountered an error
+    :raise: RuntimeError if the result of the setup script couldn't be
+      determined
     """
-    global _setup_information_cache
+    from concurrent.futures import Future
+
     if env is None:
         env = os.environ
     if 'DISTUTILS_DEBUG' in env:
         env = dict(env)
         env.pop('DISTUTILS_DEBUG')
-    hashable_env = (setup_py, ) + tuple(sorted(env.items()))
-    if hashable_env not in _setup_information_cache:
-        _setup_information_cache[hashable_env] = _get_setup_information(
-            setup_py, env=env)
-    return _setup_information_cache[hashable_env]
+    if fields is not None:
+        fields = frozenset(fields)
+    startup_environment = get_startup_environment(env)
+    with _setup_information_lock:
+        data = _setup_information_cache.get(
+            setup_py, env, startup_environment=startup_environment,
+            fields=fields)
+        if data is not None:
+            return data
+        error = _setup_information_failures.get(
+            setup_py, env, startup_environment=startup_environment)
+        if error is not None:
+            raise error
+        pending_key = (Path(str(setup_py)), frozenset(env.items()), fields)
+        refreshes = _setup_information_refreshes.get(pending_key[0])
+        future = _pending_setup_information.get(pending_key)
+        if future is None:
+            future = Future()
+            _pending_setup_information[pending_key] = future
+            is_evaluating = True
+        else:
+            is_evaluating = False
+
+    with metrics.measure(setup_py):
+        # wait for a concurrent evaluation of the same file
+        if not is_evaluating:
+            metrics.set_value('cache', 'pending')
+            with metrics.timed('queue'):
+                return future.result()
+
+        try:
+            data, environment_names = _get_uncached_setup_information(
+                setup_py, env=env, fields=fields)
+        except BaseException as e:  # noqa: B902
+            if isinstance(e, SetupPyError):
+                _setup_information_failures.put(
+                    setup_py, env, e, startup_environment=startup_environment)
+            future.set_exception(e)
+            raise
+        else:
+            with _setup_information_lock:
+                data = _put_setup_information(
+                    setup_py, env, environment_names, data, refreshes,
+                    startup_environment=startup_environment, fields=fields)
+            future.set_result(data)
+        finally:
+            with _setup_information_lock:
+                del _pending_setup_information[pending_key]
+    return data
+
+
+def _put_setup_information(
+    setup_py, env, environment_names, data, refreshes, *,
+    startup_environment, fields
+):
+    # the lock must be held by the caller
+    if _setup_information_refreshes.get(Path(str(setup_py))) != refreshes:
+        # a background refresh already stored fresher information than the
+        # outdated one this result might be based on
+        return freeze(data)
+    return _setup_information_cache.put(
+        setup_py, env, environment_names, data,
+        startup_environment=startup_environment, fields=fields)
+
+
+def invalidate_setup_information(setup_py=None):
+    """
+    Remove cached configuration information from memory.
+
+    A following invocation of :func:`get_setup_information` evaluates the
+    setup.py file again, also if the previous evaluation failed.
+    The persistent cache isn't affected since its entries are invalidated
+    by changes to the content of the setup.py file.
+
+    :param Path setup_py: path to a setup.py script, or None to remove the
+      information of all files
+    :returns: the number of removed results
+    :rtype: int
+    """
+    with _setup_information_lock:
+        _setup_information_failures.invalidate(setup_py)
+        if setup_py is None:
+            count = len(_setup_information_cache)
+            _setup_information_cache.clear()
+            return count
+        return _setup_information_cache.invalidate(setup_py)
+
+
+def get_setup_information_statistics():
+    """
+    Get the statistics of the in-memory cache of configuration information.
+
+    :returns: a dictionary with the keys `hits`, `misses`, `evictions`,
+      `size` and `max_size`
+    :rtype: dict
+    """
+    with _setup_information_lock:
+        return _setup_information_cache.get_statistics()
+
+
+def is_prefetch_enabled():
+    """
+    Check if setup.py files should be evaluated ahead of time.
+
+    :rtype: bool
+    """
+    return os.environ.get(PREFETCH_ENVIRONMENT_VARIABLE.name) in (
+        '1', 'true')
+
+
+# the executor and pending futures of tasks running in the background
+_background_executor = None
+_background_futures = set()
+
+
+def prefetch_setup_information(setup_py):
+    """
+    Start evaluating a setup.py file in the background.
+
+    A later invocation of :func:`get_setup_information` for the same file
+    only waits for this evaluation instead of starting another one.
+    Any error is only reported by that later invocation.
+
+    :param Path setup_py: path to a setup.py script
+    """
+    _submit_background_task(_prefetch_setup_information, setup_py)
+
+
+def _submit_background_task(function, *args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    global _background_executor
+    with _setup_information_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                thread_name_prefix='colcon-python-setup-py-background')
+            atexit.register(_cancel_background_tasks)
+        future = _background_executor.submit(function, *args)
+        _background_futures.add(future)
+    future.add_done_callback(_background_futures.discard)
+    return future
+
+
+def _prefetch_setup_information(setup_py):
+    try:
+        get_setup_information(setup_py, fields=PACKAGE_FIELDS)
+    except Exception:  # noqa: B902
+        # the error is raised again when the information is requested
+        pass
+
+
+def _prefetch_subdirectories(path):
+    try:
+        entries = list(os.scandir(str(path)))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith('.') or not entry.is_dir():
+            continue
+        if os.path.exists(os.path.join(entry.path, 'COLCON_IGNORE')):
+            continue
+        setup_py = Path(entry.path) / 'setup.py'
+        if setup_py.is_file():
+            prefetch_setup_information(setup_py)
+
+
+def _cancel_background_tasks():
+    # don't evaluate packages which haven't been requested before exiting
+    for future in list(_background_futures):
+        future.cancel()
+
+
+def get_setup_information_many(paths, *, env=None, max_workers=None):
+    """
+    Get the configuration information of multiple setup.py files.
+
+    The files are being evaluated concurrently and the results are added to
+    the same cache as :func:`get_setup_information`.
+    Duplicate paths are only evaluated once.
+
+    :param paths: paths to setup.py scripts
+    :param dict env: environment variables to set before running setup.py
+    :param int max_workers: the maximum number of concurrent evaluations,
+      defaults to the number of CPU cores
+    :return: a generator yielding a tuple for each unique path in the order
+      of completion, containing the path, the dictionary of data describing
+      the package or None as well as the exception raised during the
+      evaluation or None
+    """
+    from concurrent.futures import as_completed
+    from concurrent.futures import ThreadPoolExecutor
+
+    unique_paths = list(dict.fromkeys(Path(str(p)) for p in paths))
+    if not unique_paths:
+        return
+    if env is None:
+        env = os.environ
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(unique_paths)))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {
+        executor.submit(get_setup_information, setup_py, env=env): setup_py
+        for setup_py in unique_paths}
+    try:
+        for future in as_completed(futures):
+            setup_py = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:  # noqa: B902
+                yield setup_py, None, e
+            else:
+                yield setup_py, data, None
+    finally:
+        # stop scheduling evaluations if the caller stops iterating early
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+# the evaluations of coroutines which are awaited by further requests
+# for the same information, the keys also contain the event loop
+_pending_setup_information_async = {}
+
+
+async def get_setup_information_async(setup_py, *, env=None, fields=None):
+    """
+    Get the configuration information without blocking the event loop.
+
+    This is the awaitable counterpart of :func:`get_setup_information`
+    sharing the same cache.
+    Setup.py files are dry run in asyncio subprocesses and concurrent
+    requests for the same information await a single evaluation.
+    Cancelling one request doesn't affect the others.
+
+    :param Path setup_py: path to a setup.py script
+    :param dict env: environment variables to set before running setup.py
+    :param fields: names of the keys to return, see
+      :func:`get_setup_information`
+    :return: dictionary of data describing the package.
+    :raise: SetupPyError if the setup script encountered an error
+    :raise: RuntimeError if the result of the setup script couldn't be
+      determined
+    """
+    import asyncio
+
+    if env is None:
+        env = os.environ
+    if 'DISTUTILS_DEBUG' in env:
+        env = dict(env)
+        env.pop('DISTUTILS_DEBUG')
+    if fields is not None:
+        fields = frozenset(fields)
+    startup_environment = get_startup_environment(env)
+    loop = asyncio.get_event_loop()
+    with _setup_information_lock:
+        data = _setup_information_cache.get(
+            setup_py, env, startup_environment=startup_environment,
+            fields=fields)
+        if data is not None:
+            return data
+        error = _setup_information_failures.get(
+            setup_py, env, startup_environment=startup_environment)
+        if error is not None:
+            raise error
+        pending_key = (Path(str(setup_py)), frozenset(env.items()), fields)
+        # a synchronous evaluation runs in another thread, the coroutines
+        # don't register in the same map since a synchronous request from
+        # within the event loop would block it while waiting for them
+        future = _pending_setup_information.get(pending_key)
+        task = _pending_setup_information_async.get((loop, pending_key))
+        if future is None and task is None:
+            task = loop.create_task(_evaluate_setup_information_async(
+                setup_py, env=env, fields=fields,
+                startup_environment=startup_environment,
+                refreshes=_setup_information_refreshes.get(pending_key[0])))
+            _pending_setup_information_async[(loop, pending_key)] = task
+            task.add_done_callback(
+                lambda _: _pending_setup_information_async.pop(
+                    (loop, pending_key), None))
+    if future is not None:
+        return await asyncio.wrap_future(future)
+    return await asyncio.shield(task)
+
+
+async def _evaluate_setup_information_async(
+    setup_py, *, env, fields, startup_environment, refreshes
+):
+    try:
+        data, environment_names = \
+            await _get_uncached_setup_information_async(
+                setup_py, env=env, fields=fields)
+    except SetupPyError as e:
+        _setup_information_failures.put(
+            setup_py, env, e, startup_environment=startup_environment)
+        raise
+    with _setup_information_lock:
+        return _put_setup_information(
+            setup_py, env, environment_names, data, refreshes,
+            startup_environment=startup_environment, fields=fields)
+
+
+def _get_uncached_setup_information(setup_py, *, env, fields=None):
+    result = _get_available_setup_information(setup_py, env=env)
+    if result is None:
+        logger.debug(f"Dry running '{setup_py}'")
+        cache_path = persistent_cache.get_cache_path()
+        if cache_path is None:
+            return _evaluate_setup_py(setup_py, env=env, fields=fields)[:2]
+        result = _evaluate_and_store(
+            setup_py, env, cache_path, persistent_cache.compute_key(setup_py))
+    if fields is not None:
+        result = (project_setup_data(result[0], fields), result[1])
+    return result
+
+
+async def _get_uncached_setup_information_async(
+    setup_py, *, env, fields=None
+):
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    # reading files doesn't take long but shouldn't block the event loop
+    result = await _get_static_setup_information_async(setup_py, env=env)
+    if result is None:
+        result = await loop.run_in_executor(
+            None, partial(_get_cached_setup_information, setup_py, env=env))
+    if result is None:
+        logger.debug(f"Dry running '{setup_py}'")
+        cache_path = persistent_cache.get_cache_path()
+        if cache_path is None:
+            return (await _evaluate_setup_py_async(
+                setup_py, env=env, fields=fields))[:2]
+        result = await _evaluate_setup_py_async(setup_py, env=env)
+        result = await loop.run_in_executor(None, partial(
+            _store_setup_information, setup_py, env, cache_path,
+            persistent_cache.compute_key(setup_py), result))
+    if fields is not None:
+        result = (project_setup_data(result[0], fields), result[1])
+    return result
+
+
+async def _get_static_setup_information_async(setup_py, *, env):
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    create_information = await loop.run_in_executor(
+        None, partial(_read_static_setup_py, setup_py))
+    if create_information is None:
+        return None
+    # the default information is evaluated by the coroutine since a thread
+    # of the executor waiting for the evaluation semaphore might block the
+    # coroutines holding it
+    return _create_static_setup_information(
+        setup_py, create_information,
+        await _get_default_setup_information_async(env))
+
+
+def _get_available_setup_information(setup_py, *, env):
+    # get the information without dry running the setup.py file
+    result = _get_static_setup_information(setup_py, env=env)
+    if result is not None:
+        return result
+    return _get_cached_setup_information(setup_py, env=env)
+
+
+def _get_cached_setup_information(setup_py, *, env):
+    result = watch_daemon.query(setup_py, env)
+    if result is not None:
+        logger.debug(f"Using the watch daemon's information of '{setup_py}'")
+        metrics.set_value('cache', 'daemon')
+        return result
+    workspace_index = get_workspace_index()
+    if workspace_index is not None:
+        result = workspace_index.lookup(setup_py, env)
+        if result is not None:
+            logger.debug(f"Using the workspace index entry of '{setup_py}'")
+            metrics.set_value('cache', 'index')
+            return result
+    return _get_persistent_setup_information(setup_py, env=env)
+
+
+def _get_static_setup_information(setup_py, *, env):
+    create_information = _read_static_setup_py(setup_py)
+    if create_information is None:
+        return None
+    return _create_static_setup_information(
+        setup_py, create_information, _get_default_setup_information(env))
+
+
+def _read_static_setup_py(setup_py):
+    # returns a function creating the information from the default
+    # information, or None if the file needs to be dry run
+    if os.environ.get(
+        static_setup_py.STATIC_ENVIRONMENT_VARIABLE.name
+    ) in ('0', 'false'):
+        return None
+    if shim_setup_py.has_pyproject_configuration(setup_py.parent):
+        return None
+    arguments = static_setup_py.get_static_setup_arguments(setup_py)
+    if arguments is None:
+        return None
+    if (setup_py.parent / shim_setup_py.SETUP_CFG_FILENAME).exists():
+        # the declarative configuration is only used by itself for files
+        # calling setup() without arguments, otherwise both are merged
+        if arguments:
+            return None
+        configuration = shim_setup_py.get_declarative_configuration(
+            setup_py.parent)
+        if configuration is None:
+            return None
+        return partial(
+            shim_setup_py.create_declarative_setup_information,
+            configuration)
+    return partial(static_setup_py.create_setup_information, arguments)
+
+
+def _create_static_setup_information(
+    setup_py, create_information, default_information
+):
+    default_data, environment_names = default_information
+    data = create_information(default_data)
+    if data is None:
+        return None
+    logger.debug(f"Read '{setup_py}' statically without running it")
+    metrics.set_value('static', True)
+    # the result depends on the same variables as the default information
+    return data, environment_names
+
+
+# the results of a setup.py file passing no arguments
+# as a list of tuples containing the relevant environment key and the result
+_default_setup_information_cache = []
+_default_setup_information_lock = Lock()
+# futures of evaluations in progress for each environment, the lock is only
+# held while accessing the cache and the futures, never while evaluating
+_pending_default_setup_information = {}
+
+
+def _get_default_setup_information(env):
+    from concurrent.futures import Future
+
+    pending_key = frozenset(env.items())
+    with _default_setup_information_lock:
+        result = _find_default_setup_information(env)
+        if result is not None:
+            return result
+        future = _pending_default_setup_information.get(pending_key)
+        if future is None:
+            future = Future()
+            _pending_default_setup_information[pending_key] = future
+            is_evaluating = True
+        else:
+            is_evaluating = False
+
+    # wait for a concurrent evaluation in the same environment
+    if not is_evaluating:
+        return future.result()
+
+    try:
+        with TemporaryDirectory(prefix='colcon_') as basepath:
+            setup_py = _write_default_setup_py(basepath)
+            # the files of the temporary directory aren't relevant
+            result = _evaluate_setup_py(setup_py, env=env)[:2]
+    except BaseException as e:  # noqa: B902
+        future.set_exception(e)
+        raise
+    else:
+        result = _put_default_setup_information(env, result)
+        future.set_result(result)
+    finally:
+        with _default_setup_information_lock:
+            del _pending_default_setup_information[pending_key]
+    return result
+
+
+# the evaluations of coroutines for each event loop and environment
+_pending_default_setup_information_async = {}
+
+
+async def _get_default_setup_information_async(env):
+    import asyncio
+
+    pending_key = frozenset(env.items())
+    loop = asyncio.get_event_loop()
+    with _default_setup_information_lock:
+        result = _find_default_setup_information(env)
+        if result is not None:
+            return result
+        future = _pending_default_setup_information.get(pending_key)
+        task = _pending_default_setup_information_async.get(
+            (loop, pending_key))
+        if future is None and task is None:
+            task = loop.create_task(
+                _evaluate_default_setup_information_async(env))
+            _pending_default_setup_information_async[(loop, pending_key)] = \
+                task
+            task.add_done_callback(
+                lambda _: _pending_default_setup_information_async.pop(
+                    (loop, pending_key), None))
+    if future is not None:
+        return await asyncio.wrap_future(future)
+    return await asyncio.shield(task)
+
+
+async def _evaluate_default_setup_information_async(env):
+    with TemporaryDirectory(prefix='colcon_') as basepath:
+        setup_py = _write_default_setup_py(basepath)
+        result = (await _evaluate_setup_py_async(setup_py, env=env))[:2]
+    return _put_default_setup_information(env, result)
+
+
+def _find_default_setup_information(env):
+    # the lock must be held by the caller
+    for environment_key, result in _default_setup_information_cache:
+        if matches_environment_key(environment_key, env):
+            return result
+    return None
+
+
+def _put_default_setup_information(env, result):
+    with _default_setup_information_lock:
+        # keep the result of a concurrent evaluation in a different
+        # environment which turned out to be equivalent
+        existing = _find_default_setup_information(env)
+        if existing is not None:
+            return existing
+        _default_setup_information_cache.append(
+            (get_environment_key(env, result[1]), result))
+    return result
+
+
+def _write_default_setup_py(basepath):
+    setup_py = Path(basepath) / 'setup.py'
+    setup_py.write_text(
+        'from setuptools import setup\n'
+        'setup()\n')
+    return setup_py
+
+
+def _get_persistent_setup_information(setup_py, *, env):
+    cache_path = persistent_cache.get_cache_path()
+    if cache_path is None:
+        return None
+
+    key = persistent_cache.compute_key(setup_py)
+    result = persistent_cache.load(cache_path, key, env)
+    if result is not None:
+        logger.debug(
+            f"Using cached information of '{setup_py}' from '{cache_path}'")
+        metrics.set_value('cache', 'persistent')
+    elif persistent_cache.is_stale_enabled():
+        result = persistent_cache.load_latest(cache_path, setup_py, env)
+        if result is not None:
+            logger.debug(
+                f"Using outdated information of '{setup_py}' while "
+                're-evaluating it in the background')
+            metrics.set_value('cache', 'stale')
+            _submit_background_task(
+                _refresh_setup_information, setup_py, dict(env),
+                result[0], cache_path, key)
+    return result
+
+
+def _evaluate_and_store(setup_py, env, cache_path, key):
+    # evaluate all fields to store a result which satisfies any request
+    return _store_setup_information(
+        setup_py, env, cache_path, key, _evaluate_setup_py(setup_py, env=env))
+
+
+def _store_setup_information(setup_py, env, cache_path, key, result):
+    data, environment_names, inputs = result
+    if inputs is None:
+        logger.debug(
+            f"Not caching the information of '{setup_py}' since the files "
+            'it read are unknown')
+    else:
+        persistent_cache.store(
+            cache_path, key, setup_py, env, data, environment_names,
+            get_input_fingerprints(setup_py.parent, inputs))
+    return data, environment_names
+
+
+def _refresh_setup_information(setup_py, env, stale_data, cache_path, key):
+    with metrics.measure(setup_py):
+        try:
+            data, environment_names = _evaluate_and_store(
+                setup_py, env, cache_path, key)
+        except Exception as e:  # noqa: B902
+            logger.warning(f"Failed to re-evaluate '{setup_py}': {e}")
+            return
+    changed = [
+        name for name in PACKAGE_FIELDS
+        if _get_value(stale_data, name) != _get_value(data, name)]
+    if changed:
+        logger.warning(
+            f"The information of '{setup_py}' used by this invocation was "
+            f"outdated, changed: {', '.join(changed)}")
+    # later requests get the fresh information, also if the request which
+    # used the outdated information didn't store it yet
+    with _setup_information_lock:
+        path = Path(str(setup_py))
+        _setup_information_refreshes[path] = \
+            _setup_information_refreshes.get(path, 0) + 1
+        _setup_information_cache.invalidate(setup_py)
+        _setup_information_cache.put(setup_py, env, environment_names, data)
+
+
+def _get_value(data, name):
+    if name.startswith('metadata.'):
+        return (data.get('metadata') or {}).get(name[len('metadata.'):])
+    return data.get(name)
 
 
 def _get_setup_information(setup_py, *, env=None):
-    code_lines = [
-        'import sys',
-        # setuptools needs to be imported before distutils
-        # to avoid warning introduced in setuptools 49.2.0
-        'from contextlib import suppress',
-        'exec("with suppress(ImportError):'
-        '    from setuptools.extern.packaging.specifiers'
-        '    import SpecifierSet")',
-        # newer versions expose 'packaging' directly
-        # on Arch 'extern' isn't part of the package
-        'exec("with suppress(ImportError):'
-        '    from packaging.specifiers import SpecifierSet")',
-        'from distutils.core import run_setup',
-
-        'dist = run_setup('
-        "    'setup.py', script_args=('--dry-run',), stop_after='config')",
-
-        "skip_keys = ('cmdclass', 'distclass', 'ext_modules', 'metadata')",
-        'data = {'
-        '    key: value for key, value in dist.__dict__.items() '
-        '    if ('
-        # skip private properties
-        "        not key.startswith('_') and "
-        # skip methods
-        '        not callable(value) and '
-        # skip objects whose representation can't be evaluated
-        '        key not in skip_keys and '
-        # skip display options since they have no value, using metadata instead
-        '        key not in dist.display_option_names'
-        '    )'
-        '}',
-        "data['metadata'] = {"
-        '    k: v for k, v in dist.metadata.__dict__.items() '
-        # skip values with custom type OrderedSet
-        "    if k not in ('license_files', 'provides_extras')}",
-
-        "sys.stdout.buffer.write(repr(data).encode('utf-8'))"]
-
-    # invoke distutils.core.run_setup() in a separate interpreter
-    cmd = [
-        sys.executable, '-c', ';'.join(line.lstrip() for line in code_lines)]
+    return _evaluate_setup_py(setup_py, env=env)[0]
+
+
+def _evaluate_setup_py(setup_py, *, env, fields=None):
+    # returns the data, the names of the read environment variables
+    # and the paths of the read files and directories
+    if env is None:
+        env = os.environ
+    # limit the number of concurrent evaluations across all callers
+    semaphore = governor.get_evaluation_semaphore()
+    with metrics.timed('queue'):
+        semaphore.acquire()
+    try:
+        return _evaluate_setup_py_acquired(setup_py, env=env, fields=fields)
+    finally:
+        semaphore.release()
+
+
+def _evaluate_setup_py_acquired(setup_py, *, env, fields=None):
+    # the caller holds the evaluation semaphore
+    timeout = governor.get_evaluation_timeout()
+    profile = profiling.get_profile_request(setup_py)
+    try:
+        pool = worker_pool.get_worker_pool()
+        if pool is not None:
+            data, environment_names, inputs = pool.evaluate(
+                setup_py, env=env, fields=fields, profile=profile,
+                timeout=timeout)
+        else:
+            data, environment_names, inputs = _run_setup_py(
+                setup_py, env=env, fields=fields, profile=profile,
+                timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise _create_timeout_error(setup_py, timeout)
+    if environment_names is not None:
+        environment_names = tuple(environment_names)
+    return data, environment_names, inputs
+
+
+async def _evaluate_setup_py_async(setup_py, *, env, fields=None):
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    # the workers communicate through blocking pipes
+    in_thread = worker_pool.get_worker_pool() is not None
+    if not in_thread:
+        timeout = governor.get_evaluation_timeout()
+        profile = profiling.get_profile_request(setup_py)
+        # creating the startup snapshot of a new environment runs a
+        # process, the executor isn't used while holding the semaphore
+        # since the threads might all be busy with other steps
+        cmd = await loop.run_in_executor(None, partial(
+            _get_evaluation_command, fields, profile, env))
+
+    # the coroutine waits for the semaphore instead of a thread of the
+    # executor since the coroutines holding it might need one to proceed
+    semaphore = governor.get_evaluation_semaphore()
+    await semaphore.acquire_async()
+    if in_thread:
+        try:
+            evaluation = loop.run_in_executor(None, partial(
+                _evaluate_setup_py_and_release, semaphore, setup_py,
+                env=env, fields=fields))
+        except BaseException:  # noqa: B902
+            semaphore.release()
+            raise
+        # a cancelled request doesn't stop the evaluation in the thread
+        # which keeps holding the semaphore until it finished
+        return await asyncio.shield(evaluation)
+    try:
+        data, environment_names, inputs = await _run_setup_py_async(
+            setup_py, cmd=cmd, env=env, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise _create_timeout_error(setup_py, timeout)
+    finally:
+        semaphore.release()
+    if environment_names is not None:
+        environment_names = tuple(environment_names)
+    return data, environment_names, inputs
+
+
+def _evaluate_setup_py_and_release(semaphore, setup_py, *, env, fields):
+    try:
+        return _evaluate_setup_py_acquired(setup_py, env=env, fields=fields)
+    finally:
+        semaphore.release()
+
+
+def _create_timeout_error(setup_py, timeout):
+    logger.error(
+        f"Evaluating '{setup_py}' didn't finish within {timeout} seconds")
+    return RuntimeError(
+        f"Evaluating '{setup_py}' didn't finish within {timeout} seconds "
+        '(see environment variable '
+        f"'{governor.TIMEOUT_ENVIRONMENT_VARIABLE.name}')")
+
+
+def _run_setup_py(setup_py, *, env, fields=None, profile=None, timeout=None):
+    # invoke distutils.core.run_setup() in a separate interpreter,
+    # setup.py files prompting for input read from an empty stdin
+    cmd = _get_evaluation_command(fields, profile, env)
+    start = time.monotonic()
     result = subprocess.run(
-        cmd, stdout=subprocess.PIPE,
-        cwd=os.path.abspath(str(setup_py.parent)), check=True, env=env)
-    output = result.stdout.decode('utf-8')
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, cwd=os.path.abspath(str(setup_py.parent)),
+        env=env, timeout=timeout)
+    return _decode_output(
+        setup_py, cmd, result.returncode, result.stdout, result.stderr, start)
 
-    return ast.literal_eval(output)
+
+async def _run_setup_py_async(setup_py, *, cmd, env, timeout=None):
+    import asyncio
+
+    # the command is determined by the caller since it might block
+    start = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, cwd=os.path.abspath(str(setup_py.parent)),
+        env=env)
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+    return _decode_output(
+        setup_py, cmd, process.returncode, stdout, stderr, start)
+
+
+def _get_evaluation_command(fields, profile, env):
+    args = []
+    if fields is not None:
+        args += ['--fields', ','.join(sorted(fields))]
+    if profile is not None:
+        args += ['--profile', profile['path'], str(profile['threshold'])]
+    return worker_pool.get_evaluation_command(*args, env=env)
+
+
+def _decode_output(setup_py, cmd, returncode, stdout, stderr, start):
+    received = time.monotonic()
+    stderr = stderr.decode(errors='replace')
+    payload = read_payload(io.BytesIO(stdout))
+    output = decode_payload(payload) if payload is not None else None
+    if returncode or (output is not None and 'error' in output):
+        # the message of a failed setup.py file contains the read inputs,
+        # the output contains the traceback as well as anything printed
+        # before
+        output = output or {}
+        raise SetupPyError(
+            setup_py, returncode or 1, cmd, stderr,
+            environment_names=output.get('environment_names'),
+            inputs=output.get('inputs'))
+    if stderr.strip():
+        logger.debug(f"Output of '{setup_py}':\n{stderr.rstrip()}")
+    if output is None:
+        raise RuntimeError(f"Failed to get the result of '{setup_py}'")
+    metrics.add_evaluation(
+        output, len(payload), received - start, time.monotonic() - received)
+    worker_pool.log_skipped_values(setup_py, output['skipped'])
+    profiling.log_profile(setup_py, output.get('profile'))
+
+    return output['data'], output['environment_names'], output['inputs']
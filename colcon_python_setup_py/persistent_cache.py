@@ -0,0 +1,484 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import argparse
+import hashlib
+import os
+from pathlib import Path
+import sys
+from threading import get_ident
+from threading import Lock
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py.environment_key import get_environment_key
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.environment_key import matches_environment_key
+from colcon_python_setup_py.evaluate_setup_py import decode_payload
+from colcon_python_setup_py.evaluate_setup_py import encode_payload
+from colcon_python_setup_py.evaluate_setup_py import to_json
+from colcon_python_setup_py.input_files import are_inputs_unchanged
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to enable the persistent setup.py cache"""
+CACHE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_CACHE',
+    'Enable a persistent cache of evaluated setup.py files, the value is '
+    "either a directory or '1' to use the user cache directory")
+
+"""Environment variable to limit the size of the persistent setup.py cache"""
+CACHE_SIZE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_CACHE_SIZE',
+    'Set the maximum size of the persistent setup.py cache in MiB '
+    '(default: 64)')
+
+"""Environment variable to use outdated results of the persistent cache"""
+STALE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_STALE',
+    'Set to 1 to immediately use the last result of the persistent cache '
+    'for setup.py files which changed and re-evaluate them in the '
+    'background')
+
+# bump whenever the layout of the cache entries changes
+CACHE_FORMAT_VERSION = 4
+
+# the maximum number of environments for which results are stored per file
+_MAX_VARIANTS = 8
+
+_DEFAULT_CACHE_SIZE = 64
+
+_cache_size_lock = Lock()
+# the approximate size of the cache directories in bytes
+# which have been used by this process
+_cache_sizes = {}
+
+
+def get_cache_path():
+    """
+    Get the directory of the persistent cache.
+
+    :returns: The path of the cache directory, or None if the cache is
+      disabled
+    :rtype: Path
+    """
+    value = os.environ.get(CACHE_ENVIRONMENT_VARIABLE.name)
+    if not value or value == '0':
+        return None
+    if value != '1':
+        return Path(value)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'colcon' / 'python_setup_py'
+
+
+def get_cache_size():
+    """
+    Get the maximum size of the persistent cache.
+
+    :returns: The size in bytes
+    :rtype: int
+    """
+    value = os.environ.get(CACHE_SIZE_ENVIRONMENT_VARIABLE.name)
+    size = _DEFAULT_CACHE_SIZE
+    if value:
+        try:
+            size = float(value)
+        except ValueError:
+            logger.warning(
+                f"Ignoring invalid value '{value}' of environment variable "
+                f"'{CACHE_SIZE_ENVIRONMENT_VARIABLE.name}'")
+    return int(size * 1024 * 1024)
+
+
+def is_stale_enabled():
+    """
+    Check if outdated results of the persistent cache should be used.
+
+    :rtype: bool
+    """
+    return os.environ.get(STALE_ENVIRONMENT_VARIABLE.name) in ('1', 'true')
+
+
+def compute_key(setup_py):
+    """
+    Compute the cache key for evaluating a setup.py file.
+
+    The key covers the content of the setup.py file, the Python interpreter
+    and the setuptools version.
+    The results for different environments are stored under the same key.
+
+    :param Path setup_py: The path of the setup.py file
+    :returns: The hex digest identifying the evaluation
+    :rtype: str
+    """
+    h = hashlib.sha256()
+    for part in get_interpreter_fingerprint():
+        h.update(part.encode('utf-8', 'surrogateescape') + b'\0')
+    h.update(os.path.abspath(str(setup_py)).encode(
+        'utf-8', 'surrogateescape') + b'\0')
+    h.update(Path(str(setup_py)).read_bytes())
+    return h.hexdigest()
+
+
+_interpreter_fingerprint = None
+
+
+def get_interpreter_fingerprint():
+    """
+    Get the properties of the interpreter which affect an evaluation.
+
+    :returns: The cache format version, the path and the version of the
+      interpreter as well as the setuptools version
+    :rtype: tuple
+    """
+    global _interpreter_fingerprint
+    if _interpreter_fingerprint is None:
+        try:
+            import setuptools
+        except ImportError:
+            setuptools_version = ''
+        else:
+            setuptools_version = setuptools.__version__
+        _interpreter_fingerprint = (
+            str(CACHE_FORMAT_VERSION), sys.executable, sys.version,
+            setuptools_version)
+    return _interpreter_fingerprint
+
+
+def load(cache_path, key, env):
+    """
+    Load an entry from the persistent cache.
+
+    Entries which can't be read are treated like missing entries as well
+    as entries whose input files changed.
+
+    :param Path cache_path: The cache directory
+    :param str key: The cache key
+    :param env: The environment variables
+    :returns: The cached data and the names of the environment variables
+      read by the setup.py file, or None if there is no valid entry for the
+      environment
+    :rtype: tuple
+    """
+    entry_path = _get_entry_path(cache_path, key)
+    variants = _load_variants(entry_path)
+    startup_environment = get_startup_environment(env)
+    for variant in reversed(variants):
+        if matches_environment_key(
+            variant['key'], env, startup_environment=startup_environment
+        ):
+            break
+    else:
+        return None
+    if not are_inputs_unchanged(variant['inputs']):
+        logger.debug(f"Ignoring outdated cache entry '{entry_path}'")
+        return None
+    # mark the entry as recently used for the eviction
+    try:
+        os.utime(str(entry_path))
+    except OSError:
+        pass
+    return variant['data'], variant['key'][1]
+
+
+def load_latest(cache_path, setup_py, env):
+    """
+    Load the most recently stored entry of a setup.py file.
+
+    Unlike :func:`load` the entry is also returned if the content of the
+    setup.py file or the files it read changed since it has been stored.
+
+    :param Path cache_path: The cache directory
+    :param Path setup_py: The path of the setup.py file
+    :param env: The environment variables
+    :returns: The cached data and the names of the environment variables
+      read by the setup.py file, or None if there is no entry for the
+      environment
+    :rtype: tuple
+    """
+    try:
+        key = _get_latest_path(cache_path, setup_py).read_text(
+            encoding='utf-8')
+    except OSError:
+        return None
+    variants = _load_variants(_get_entry_path(cache_path, key))
+    startup_environment = get_startup_environment(env)
+    for variant in reversed(variants):
+        if matches_environment_key(
+            variant['key'], env, startup_environment=startup_environment
+        ):
+            return variant['data'], variant['key'][1]
+    return None
+
+
+def _load_variants(entry_path):
+    try:
+        content = entry_path.read_bytes()
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        logger.debug(f"Failed to read cache entry '{entry_path}': {e}")
+        return []
+    try:
+        entry = decode_payload(content)
+        if entry['version'] != CACHE_FORMAT_VERSION:
+            raise ValueError(f"unknown version '{entry['version']}'")
+        variants = entry['variants']
+        if not all(
+            'key' in v and 'data' in v and 'inputs' in v for v in variants
+        ):
+            raise ValueError('incomplete variant')
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug(f"Ignoring invalid cache entry '{entry_path}': {e}")
+        return []
+    return variants
+
+
+def store(
+    cache_path, key, setup_py, env, data, environment_names, inputs=()
+):
+    """
+    Store an entry in the persistent cache.
+
+    The result is stored for all environments which only differ in
+    variables which haven't been read by the setup.py file.
+    The entry is written atomically so that concurrent processes only ever
+    see complete entries.
+    If the cache exceeds its maximum size the least recently used entries
+    are being evicted.
+
+    :param Path cache_path: The cache directory
+    :param str key: The cache key
+    :param Path setup_py: The path of the setup.py file
+    :param env: The environment variables
+    :param dict data: The data to store
+    :param tuple environment_names: The names of the environment variables
+      read by the setup.py file, or None if the whole environment might
+      affect the data
+    :param list inputs: The fingerprints of the files and directories read
+      by the setup.py file as returned by
+      :func:`colcon_python_setup_py.input_files.get_input_fingerprints`
+    """
+    entry_path = _get_entry_path(cache_path, key)
+    environment_key = get_environment_key(env, environment_names)
+    # a concurrent process might add another variant at the same time
+    # in which case only one of them is kept
+    variants = [
+        variant for variant in _load_variants(entry_path)
+        if variant['key'] != environment_key]
+    variants.append(
+        {'key': environment_key, 'data': data, 'inputs': list(inputs)})
+    # the entries are encoded like the messages of the evaluating
+    # interpreter which also supports values like sets and infinite floats
+    content = encode_payload(to_json({
+        'version': CACHE_FORMAT_VERSION,
+        'setup_py': os.path.abspath(str(setup_py)),
+        'variants': variants[-_MAX_VARIANTS:],
+    })).decode('ascii')
+    if not _write_atomically(entry_path, content):
+        return
+    # remember the entry for using it even after the setup.py file changed
+    _write_atomically(_get_latest_path(cache_path, setup_py), key)
+
+    max_size = get_cache_size()
+    with _cache_size_lock:
+        size = _cache_sizes.get(cache_path)
+        if size is None:
+            size = sum(entry['size'] for entry in get_entries(cache_path))
+        else:
+            size += len(content)
+        if size > max_size:
+            size = _evict(cache_path, max_size * 3 // 4)
+        _cache_sizes[cache_path] = size
+
+
+def get_entries(cache_path):
+    """
+    Get information about the entries in the persistent cache.
+
+    :param Path cache_path: The cache directory
+    :returns: A list of dictionaries with the keys `key`, `path`, `size`
+      and `mtime`, the least recently used entry first
+    :rtype: list
+    """
+    entries = []
+    try:
+        dir_entries = list(os.scandir(str(cache_path)))
+    except FileNotFoundError:
+        return entries
+    for dir_entry in dir_entries:
+        if not dir_entry.name.endswith('.entry'):
+            continue
+        try:
+            stat = dir_entry.stat()
+        except FileNotFoundError:
+            # evicted by a concurrent process
+            continue
+        entries.append({
+            'key': dir_entry.name[:-len('.entry')],
+            'path': Path(dir_entry.path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+        })
+    entries.sort(key=lambda entry: entry['mtime'])
+    return entries
+
+
+def get_entry_setup_py(entry_path):
+    """
+    Get the path of the setup.py file a cache entry belongs to.
+
+    :param Path entry_path: The path of the cache entry
+    :returns: The path of the setup.py file, or None if the entry is invalid
+    :rtype: str
+    """
+    try:
+        return decode_payload(entry_path.read_bytes())['setup_py']
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def clear(cache_path, *, setup_py=None):
+    """
+    Remove entries from the persistent cache.
+
+    :param Path cache_path: The cache directory
+    :param setup_py: Only remove the entries of this setup.py file
+    :returns: The number of removed entries
+    :rtype: int
+    """
+    if setup_py is not None:
+        setup_py = os.path.abspath(str(setup_py))
+    count = 0
+    for entry in get_entries(cache_path):
+        if (
+            setup_py is not None and
+            get_entry_setup_py(entry['path']) != setup_py
+        ):
+            continue
+        try:
+            entry['path'].unlink()
+        except FileNotFoundError:
+            continue
+        count += 1
+    if setup_py is not None:
+        latest_paths = [_get_latest_path(cache_path, setup_py)]
+    else:
+        latest_paths = Path(cache_path).glob('*.latest')
+    for latest_path in latest_paths:
+        try:
+            latest_path.unlink()
+        except FileNotFoundError:
+            pass
+    with _cache_size_lock:
+        _cache_sizes.pop(cache_path, None)
+    return count
+
+
+def _get_entry_path(cache_path, key):
+    return Path(cache_path) / f'{key}.entry'
+
+
+def _get_latest_path(cache_path, setup_py):
+    name = hashlib.sha256(os.path.abspath(str(setup_py)).encode(
+        'utf-8', 'surrogateescape')).hexdigest()
+    return Path(cache_path) / f'{name}.latest'
+
+
+def _write_atomically(path, content):
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.{get_ident()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(content, encoding='utf-8')
+        os.replace(str(temp_path), str(path))
+    except OSError as e:
+        logger.debug(f"Failed to write cache file '{path}': {e}")
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _evict(cache_path, target_size):
+    entries = get_entries(cache_path)
+    size = sum(entry['size'] for entry in entries)
+    evicted_keys = set()
+    for entry in entries:
+        if size <= target_size:
+            break
+        try:
+            entry['path'].unlink()
+        except FileNotFoundError:
+            pass
+        evicted_keys.add(entry['key'])
+        size -= entry['size']
+    if evicted_keys:
+        _remove_latest_paths(cache_path, evicted_keys)
+    return size
+
+
+def _remove_latest_paths(cache_path, keys):
+    # remove the references to the most recent entries which have been
+    # evicted, a reference updated concurrently by another process might be
+    # removed as well which only affects the use of outdated results
+    for latest_path in Path(cache_path).glob('*.latest'):
+        try:
+            key = latest_path.read_text(encoding='utf-8')
+        except OSError:
+            continue
+        if key not in keys:
+            continue
+        try:
+            latest_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def main(argv=None):
+    """
+    Inspect or clear the persistent cache.
+
+    :param list argv: The command line arguments
+    :returns: The return code
+    """
+    parser = argparse.ArgumentParser(
+        prog=f'{sys.executable} -m {__name__}',
+        description='Inspect or clear the persistent setup.py cache')
+    parser.add_argument(
+        '--cache-path', type=Path, default=get_cache_path(),
+        help='The cache directory (default: based on the environment '
+             f"variable '{CACHE_ENVIRONMENT_VARIABLE.name}')")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    subparsers.add_parser('list', help='List the cache entries')
+    clear_parser = subparsers.add_parser(
+        'clear', help='Remove the cache entries')
+    clear_parser.add_argument(
+        'setup_py', nargs='?',
+        help='Only remove the entries of this setup.py file')
+    args = parser.parse_args(argv)
+
+    if args.cache_path is None:
+        parser.error(
+            'The persistent cache is disabled, set the environment variable '
+            f"'{CACHE_ENVIRONMENT_VARIABLE.name}' or pass '--cache-path'")
+
+    if args.action == 'list':
+        entries = get_entries(args.cache_path)
+        for entry in entries:
+            setup_py = get_entry_setup_py(entry['path'])
+            print(f"{entry['key'][:16]} {entry['size']:>8} {setup_py}")
+        total_size = sum(entry['size'] for entry in entries)
+        print(f'{len(entries)} entries, {total_size} bytes')
+    else:
+        count = clear(args.cache_path, setup_py=args.setup_py)
+        print(f'Removed {count} entries')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
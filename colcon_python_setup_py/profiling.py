@@ -0,0 +1,121 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import hashlib
+import io
+import os
+from pathlib import Path
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to profile slow setup.py files"""
+PROFILE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_PROFILE',
+    'Profile the evaluation of setup.py files and write the profiles of the '
+    'files taking longer than the given number of seconds to the log '
+    'directory')
+
+# the name of the directory in the log directory containing the profiles
+PROFILE_DIRNAME = 'python_setup_py_profiles'
+
+# the number of functions summarized for each profile
+_SUMMARY_COUNT = 15
+
+
+def get_profile_threshold():
+    """
+    Get the duration above which evaluations are profiled.
+
+    :returns: The number of seconds, or None if profiling is disabled
+    :rtype: float
+    """
+    value = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE.name)
+    if not value:
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        logger.warning(
+            f"Ignoring invalid value '{value}' of environment variable "
+            f"'{PROFILE_ENVIRONMENT_VARIABLE.name}'")
+        return None
+    if threshold < 0:
+        return None
+    return threshold
+
+
+def get_profile_directory():
+    """
+    Get the directory to write the profiles to.
+
+    :returns: The path of the directory, or None if there is no log
+      directory
+    :rtype: Path
+    """
+    from colcon_core.location import get_log_path
+
+    try:
+        log_path = get_log_path()
+    except TypeError:
+        # the default log path hasn't been set
+        return None
+    if log_path is None:
+        return None
+    return log_path / PROFILE_DIRNAME
+
+
+def get_profile_request(setup_py):
+    """
+    Get the parameters for profiling the evaluation of a setup.py file.
+
+    :param Path setup_py: The path of the setup.py file
+    :returns: A dictionary with the keys `path` and `threshold` to be passed
+      to the evaluating interpreter, or None if profiling is disabled
+    :rtype: dict
+    """
+    threshold = get_profile_threshold()
+    if threshold is None:
+        return None
+    directory = get_profile_directory()
+    if directory is None:
+        logger.debug(
+            f"Not profiling '{setup_py}' since there is no log directory")
+        return None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.debug(f"Failed to create directory '{directory}': {e}")
+        return None
+    package_path = os.path.abspath(str(Path(str(setup_py)).parent))
+    # packages in different directories can have the same directory name
+    suffix = hashlib.sha256(
+        package_path.encode('utf-8', 'surrogateescape')).hexdigest()[:8]
+    name = f'{os.path.basename(package_path)}-{suffix}.prof'
+    return {'path': str(directory / name), 'threshold': threshold}
+
+
+def log_profile(setup_py, profile_path):
+    """
+    Log the functions taking the most time in the profile of a setup.py.
+
+    :param Path setup_py: The path of the setup.py file
+    :param str profile_path: The path of the written profile, or None if the
+      evaluation hasn't been profiled
+    """
+    if profile_path is None:
+        return
+    import pstats
+
+    stream = io.StringIO()
+    try:
+        stats = pstats.Stats(profile_path, stream=stream)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Failed to read profile '{profile_path}': {e}")
+        return
+    stats.sort_stats('cumulative').print_stats(_SUMMARY_COUNT)
+    logger.info(
+        f"Evaluating '{setup_py}' was slow, the profile has been written to "
+        f"'{profile_path}':\n{stream.getvalue().strip()}")
@@ -0,0 +1,314 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from collections import OrderedDict
+import os
+from pathlib import Path
+import sys
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py.environment_key import get_environment_key
+from colcon_python_setup_py.evaluate_setup_py import project_setup_data
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to limit the size of the in-memory cache"""
+MEMORY_CACHE_SIZE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_MEMORY_CACHE_SIZE',
+    'Set the maximum number of setup.py results kept in memory '
+    '(default: 1024)')
+
+_DEFAULT_MEMORY_CACHE_SIZE = 1024
+
+
+def get_memory_cache_size():
+    """
+    Get the maximum number of results kept in memory.
+
+    :rtype: int
+    """
+    value = os.environ.get(MEMORY_CACHE_SIZE_ENVIRONMENT_VARIABLE.name)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(
+                f"Ignoring invalid value '{value}' of environment variable "
+                f"'{MEMORY_CACHE_SIZE_ENVIRONMENT_VARIABLE.name}'")
+    return _DEFAULT_MEMORY_CACHE_SIZE
+
+
+# strings up to this length are interned to share them between results
+_MAX_INTERNED_LENGTH = 256
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(
+        f"'{type(self).__name__}' object is read-only, create a copy to "
+        'modify it')
+
+
+class FrozenDict(dict):
+    """A read-only dictionary."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):  # noqa: D105
+        return (type(self), (dict(self), ))
+
+
+class FrozenList(list):
+    """A read-only list."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = _read_only
+    reverse = sort = _read_only
+
+    def __reduce__(self):  # noqa: D105
+        return (type(self), (list(self), ))
+
+
+def freeze(value):
+    """
+    Convert a value into a read-only structure.
+
+    Dictionaries, lists and sets are converted recursively into
+    :class:`FrozenDict`, :class:`FrozenList` and `frozenset` which are
+    still instances of the original types, except for sets.
+    Short strings are interned.
+
+    :param value: The value
+    :returns: The read-only value
+    """
+    if isinstance(value, str):
+        if len(value) <= _MAX_INTERNED_LENGTH and type(value) is str:
+            return sys.intern(value)
+        return value
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((freeze(k), freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+def project(data, fields):
+    """
+    Select a subset of read-only setup information without copying values.
+
+    :param dict data: The frozen information
+    :param frozenset fields: The fields to select as described by
+      :func:`colcon_python_setup_py.evaluate_setup_py.project_setup_data`,
+      or None to select all fields
+    :rtype: FrozenDict
+    """
+    if fields is None:
+        return data
+    projection = project_setup_data(data, fields)
+    projection['metadata'] = FrozenDict(projection['metadata'])
+    return FrozenDict(projection)
+
+
+class SetupInformationCache:
+    """
+    A bounded cache of setup.py information.
+
+    Each setup.py file can have multiple results for environments which
+    differ in the variables read by the file.
+    When the number of results exceeds the maximum size the results of the
+    least recently used files are evicted.
+    The parts of the environment keys are interned so that results for the
+    same environment share a single copy of it.
+    The results are stored as read-only structures which are shared with
+    the callers.
+    A result can contain only a subset of the fields, it is then only used
+    for requests of the same or fewer fields.
+
+    The cache isn't thread-safe, callers need to synchronize the access.
+    """
+
+    def __init__(self, max_size=None):
+        """
+        Construct a cache.
+
+        :param int max_size: The maximum number of results, defaults to the
+          value of :func:`get_memory_cache_size` when the first result is
+          added
+        """
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        # the interned parts of the environment keys and their reference
+        # counts
+        self._interned = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):  # noqa: D105
+        return self._size
+
+    def get(self, setup_py, env, *, startup_environment, fields=None):
+        """
+        Get the cached result of a setup.py file.
+
+        :param setup_py: The path of the setup.py file
+        :param env: The environment variables
+        :param tuple startup_environment: The result of
+          :func:`get_startup_environment` for the environment
+        :param frozenset fields: The requested fields, or None for all fields
+        :returns: The read-only data, or None if there is no result for the
+          environment
+        """
+        setup_py = Path(str(setup_py))
+        results = self._entries.get(setup_py)
+        if results is not None:
+            all_items = None
+            for environment_key, data, result_fields in results:
+                if environment_key[0] != startup_environment:
+                    continue
+                if result_fields is not None and (
+                    fields is None or not fields <= result_fields
+                ):
+                    continue
+                names = environment_key[1]
+                if names is None:
+                    # only sort the whole environment once per lookup
+                    if all_items is None:
+                        all_items = tuple(sorted(env.items()))
+                    values = all_items
+                else:
+                    values = tuple(env.get(n) for n in names)
+                if values == environment_key[2]:
+                    self._entries.move_to_end(setup_py)
+                    self.hits += 1
+                    if fields == result_fields:
+                        return data
+                    return project(data, fields)
+        self.misses += 1
+        return None
+
+    def put(self, setup_py, env, environment_names, data, *,
+            startup_environment=None, fields=None):
+        """
+        Add the result of a setup.py file.
+
+        A result replaces the results for the same environment containing
+        the same or fewer fields.
+
+        :param setup_py: The path of the setup.py file
+        :param env: The environment variables
+        :param tuple environment_names: The names of the environment variables
+          read by the setup.py file, or None if the whole environment might
+          affect the data
+        :param dict data: The data
+        :param tuple startup_environment: The result of
+          :func:`get_startup_environment` if it has already been computed for
+          the environment
+        :param frozenset fields: The fields contained in the data, or None
+          for all fields
+        :returns: The read-only data
+        :rtype: FrozenDict
+        """
+        setup_py = Path(str(setup_py))
+        data = freeze(data)
+        environment_key = tuple(
+            self._intern(part) for part in get_environment_key(
+                env, environment_names,
+                startup_environment=startup_environment))
+        results = self._entries.setdefault(setup_py, [])
+        self._entries.move_to_end(setup_py)
+        for other in list(results):
+            other_key, _, other_fields = other
+            if other_key == environment_key and (
+                fields is None or
+                (other_fields is not None and other_fields <= fields)
+            ):
+                # replace a less complete result or the result of a
+                # concurrent evaluation
+                self._release(other_key)
+                results.remove(other)
+                self._size -= 1
+        results.append((environment_key, data, fields))
+        self._size += 1
+
+        if self._max_size is None:
+            self._max_size = get_memory_cache_size()
+        while self._size > self._max_size:
+            oldest_path = next(iter(self._entries))
+            if oldest_path == setup_py:
+                # keep the most recent result of the added file
+                oldest_key, _, _ = results.pop(0)
+                self._release(oldest_key)
+                self._size -= 1
+                self.evictions += 1
+                continue
+            self.evictions += self._remove(oldest_path)
+        return data
+
+    def invalidate(self, setup_py):
+        """
+        Remove all results of a setup.py file.
+
+        :param setup_py: The path of the setup.py file
+        :returns: The number of removed results
+        :rtype: int
+        """
+        return self._remove(Path(str(setup_py)))
+
+    def clear(self):
+        """Remove all results and reset the statistics."""
+        self._entries.clear()
+        self._size = 0
+        self._interned.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_statistics(self):
+        """
+        Get the statistics of the cache.
+
+        :returns: A dictionary with the keys `hits`, `misses`, `evictions`,
+          `size` and `max_size`
+        :rtype: dict
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': self._size,
+            'max_size': self._max_size or get_memory_cache_size(),
+        }
+
+    def _remove(self, setup_py):
+        results = self._entries.pop(setup_py, ())
+        for environment_key, _, _ in results:
+            self._release(environment_key)
+        self._size -= len(results)
+        return len(results)
+
+    def _intern(self, part):
+        interned = self._interned.get(part)
+        if interned is None:
+            interned = self._interned[part] = [part, 0]
+        interned[1] += 1
+        return interned[0]
+
+    def _release(self, environment_key):
+        for part in environment_key:
+            interned = self._interned[part]
+            interned[1] -= 1
+            if not interned[1]:
+                del self._interned[part]
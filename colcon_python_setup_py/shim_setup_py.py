@@ -0,0 +1,383 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import configparser
+from fnmatch import fnmatchcase
+import os
+
+from colcon_python_setup_py.static_setup_py import create_setup_information
+
+# the name of the declarative configuration file
+SETUP_CFG_FILENAME = 'setup.cfg'
+
+# the aliases of metadata options supported by setuptools
+_METADATA_ALIASES = {
+    'classifier': 'classifiers',
+    'home_page': 'url',
+    'platform': 'platforms',
+    'summary': 'description',
+}
+
+# options which distutils ignores when running in a virtual environment
+_VIRTUAL_ENVIRONMENT_IGNORED_OPTIONS = (
+    'exec-prefix', 'home', 'install-base', 'install-data', 'install-headers',
+    'install-lib', 'install-platbase', 'install-platlib', 'install-purelib',
+    'install-scripts', 'prefix', 'root', 'user')
+
+# the patterns excluded by setuptools when finding packages
+_ALWAYS_EXCLUDED_PACKAGES = ('ez_setup', '*__pycache__')
+
+
+class _NotDeclarative(Exception):
+    """Raised when a configuration can't be read without setuptools."""
+
+
+def has_pyproject_configuration(path):
+    """
+    Check if a pyproject.toml file contains configuration for setuptools.
+
+    Files which only declare the build system don't affect the information.
+
+    :param Path path: The path of the package
+    :returns: True if the file contains a `project` or `tool.setuptools`
+      table or can't be read, otherwise False
+    :rtype: bool
+    """
+    pyproject_toml = path / 'pyproject.toml'
+    if not pyproject_toml.exists():
+        return False
+    try:
+        import tomllib
+    except ImportError:
+        # without a parser the file has to be assumed to be relevant
+        return True
+    try:
+        content = tomllib.loads(pyproject_toml.read_text(encoding='utf-8'))
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError):
+        return True
+    tool = content.get('tool', {})
+    return 'project' in content or (
+        not isinstance(tool, dict) or 'setuptools' in tool)
+
+
+def get_declarative_configuration(path):
+    """
+    Read the declarative configuration of a package without setuptools.
+
+    The `attr:` directive is only supported for module-level literals and
+    the `file:` directive only for existing files within the package.
+    Options and directives whose interpretation differs between setuptools
+    versions are not supported.
+
+    :param Path path: The path of the package containing the setup.cfg file
+    :returns: A tuple containing the keyword arguments equivalent to the
+      configuration and the command options recorded by distutils, or None
+      if the configuration isn't supported
+    :rtype: tuple
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    try:
+        with (path / SETUP_CFG_FILENAME).open(encoding='utf-8') as h:
+            parser.read_file(h)
+    except (OSError, UnicodeDecodeError, configparser.Error):
+        return None
+    try:
+        command_options = _get_command_options(parser)
+        return _ConfigurationReader(path).read(parser), command_options
+    except _NotDeclarative:
+        return None
+
+
+def create_declarative_setup_information(
+    configuration, default_information
+):
+    """
+    Create the information of a dry run from the declarative configuration.
+
+    :param tuple configuration: The result of
+      :func:`get_declarative_configuration`
+    :param dict default_information: The information of dry running a
+      setup.py file passing no arguments in the same environment
+    :returns: The information describing the package, or None if the
+      configuration isn't supported
+    :rtype: dict
+    """
+    arguments, command_options = configuration
+    # other configuration files would be merged with the setup.cfg file
+    if default_information.get('command_options'):
+        return None
+    data = create_setup_information(arguments, default_information)
+    if data is None:
+        return None
+    data['command_options'] = command_options
+    if 'python_requires' in arguments:
+        # setuptools converts the value into a specifier set which isn't
+        # part of the evaluated information
+        del data['python_requires']
+        del data['metadata']['python_requires']
+    return data
+
+
+def _get_command_options(parser):
+    if parser.defaults():
+        raise _NotDeclarative()
+    command_options = {}
+    for section in parser.sections():
+        # global options modify the distribution itself
+        if section == 'global':
+            raise _NotDeclarative()
+        options = {}
+        for option, value in parser.items(section):
+            if option != option.lower() or '%' in value or \
+                    option in _VIRTUAL_ENVIRONMENT_IGNORED_OPTIONS:
+                raise _NotDeclarative()
+            if _is_setuptools_section(section):
+                # setuptools versions differ in the handling of dashes
+                if '-' in option:
+                    raise _NotDeclarative()
+            else:
+                option = option.replace('-', '_')
+            options[option] = (SETUP_CFG_FILENAME, value)
+        command_options[section] = options
+    return command_options
+
+
+def _is_setuptools_section(section):
+    return section in ('metadata', 'options') or \
+        section.startswith('options.')
+
+
+class _ConfigurationReader:
+
+    def __init__(self, path):
+        self.path = path
+        self.arguments = {}
+        self.find_options = None
+        self.version_attribute = None
+
+    def read(self, parser):
+        for section in parser.sections():
+            values = dict(parser.items(section))
+            if section == 'metadata':
+                self.read_metadata(values)
+            elif section == 'options':
+                self.read_options(values)
+            elif section.startswith('options.'):
+                self.read_options_section(section[len('options.'):], values)
+        if self.arguments.get('packages') == 'find:':
+            self.arguments['packages'] = self.find_packages()
+        if self.version_attribute is not None:
+            self.arguments['version'] = self.read_attribute(
+                self.version_attribute)
+        return self.arguments
+
+    def read_metadata(self, values):
+        for name, value in values.items():
+            name = _METADATA_ALIASES.get(name, name)
+            if name in ('description', 'long_description'):
+                value = self.read_files(value)
+            elif name in ('keywords', 'platforms'):
+                value = _parse_list(value)
+            elif name == 'classifiers':
+                value = _parse_list(self.read_files(value))
+            elif name == 'project_urls':
+                value = _parse_dict(value)
+            elif name == 'license':
+                if value.startswith('file:'):
+                    raise _NotDeclarative()
+            elif name == 'version':
+                if value.startswith('attr:'):
+                    self.version_attribute = value[len('attr:'):]
+                elif value.startswith('file:'):
+                    value = self.read_files(value).strip()
+            elif name not in (
+                'author', 'author_email', 'download_url',
+                'long_description_content_type', 'maintainer',
+                'maintainer_email', 'name', 'url',
+            ):
+                raise _NotDeclarative()
+            self.add_argument(name, value)
+
+    def read_options(self, values):
+        for name, value in values.items():
+            if name in ('include_package_data', 'zip_safe'):
+                value = value.lower() in ('1', 'true', 'yes')
+            elif name == 'package_dir':
+                value = _parse_dict(value)
+            elif name in (
+                'dependency_links', 'namespace_packages', 'py_modules',
+                'scripts',
+            ):
+                value = _parse_list(value)
+            elif name in (
+                'install_requires', 'setup_requires', 'tests_require',
+            ):
+                value = _parse_requirements(value)
+            elif name == 'packages':
+                if value.strip() == 'find:':
+                    value = 'find:'
+                elif value.strip() == 'find_namespace:':
+                    raise _NotDeclarative()
+                else:
+                    value = _parse_list(value)
+            elif name not in ('python_requires', 'test_suite'):
+                raise _NotDeclarative()
+            self.add_argument(name, value)
+
+    def read_options_section(self, name, values):
+        if name == 'packages.find':
+            self.find_options = {
+                k: _parse_list(v) for k, v in values.items()}
+            return
+        if name == 'extras_require':
+            value = {k: _parse_requirements(v) for k, v in values.items()}
+        elif name in ('exclude_package_data', 'package_data'):
+            value = {k: _parse_list(v) for k, v in values.items()}
+            if '*' in value:
+                value[''] = value.pop('*')
+        elif name == 'entry_points':
+            value = {k: _parse_list(v) for k, v in values.items()}
+        elif name == 'data_files':
+            value = []
+            for destination, files in values.items():
+                files = _parse_list(files)
+                # newer setuptools versions expand glob patterns
+                if any(c in f for f in files for c in '*?[{'):
+                    raise _NotDeclarative()
+                value.append((destination, files))
+        else:
+            raise _NotDeclarative()
+        self.add_argument(name, value)
+
+    def add_argument(self, name, value):
+        # the first of multiple values would be used
+        if name in self.arguments:
+            raise _NotDeclarative()
+        self.arguments[name] = value
+
+    def read_files(self, value):
+        if not value.startswith('file:'):
+            return value
+        contents = []
+        root = os.path.abspath(str(self.path))
+        for filename in value[len('file:'):].split(','):
+            filename = os.path.abspath(os.path.join(root, filename.strip()))
+            # setuptools doesn't read files outside of the package
+            if not filename.startswith(root + os.sep) or \
+                    not os.path.isfile(filename):
+                raise _NotDeclarative()
+            try:
+                with open(filename, encoding='utf-8') as h:
+                    contents.append(h.read())
+            except (OSError, UnicodeDecodeError):
+                raise _NotDeclarative()
+        return '\n'.join(contents)
+
+    def find_packages(self):
+        options = self.find_options or {}
+        if set(options) - {'exclude', 'include', 'where'}:
+            raise _NotDeclarative()
+        # other locations are being added to the package directories
+        if options.get('where', ['.'])[:1] != ['.']:
+            raise _NotDeclarative()
+        include = options.get('include') or ['*']
+        exclude = list(_ALWAYS_EXCLUDED_PACKAGES) + (
+            options.get('exclude') or [])
+        root = str(self.path)
+        packages = []
+        for dirpath, dirnames, _ in os.walk(root, followlinks=True):
+            all_dirnames = dirnames[:]
+            dirnames[:] = []
+            for dirname in all_dirnames:
+                full_path = os.path.join(dirpath, dirname)
+                package = os.path.relpath(full_path, root).replace(
+                    os.path.sep, '.')
+                if '.' in dirname or not os.path.isfile(
+                    os.path.join(full_path, '__init__.py')
+                ):
+                    continue
+                if _matches(package, include) and \
+                        not _matches(package, exclude):
+                    packages.append(package)
+                # subdirectories of excluded packages are still searched
+                dirnames.append(dirname)
+        return packages
+
+    def read_attribute(self, description):
+        import ast
+
+        # the attribute lookup triggers the package discovery of setuptools
+        # unless the packages and modules are explicit
+        if self.arguments.get('package_dir') or not (
+            self.arguments.get('packages') or
+            self.arguments.get('py_modules')
+        ):
+            raise _NotDeclarative()
+        module_path = description.strip().split('.')
+        name = module_path.pop()
+        module_path = os.path.join(str(self.path), *(module_path or [
+            '__init__']))
+        for filename in (
+            module_path + '.py', os.path.join(module_path, '__init__.py')
+        ):
+            if os.path.isfile(filename):
+                break
+        else:
+            raise _NotDeclarative()
+        try:
+            with open(filename, 'rb') as h:
+                tree = ast.parse(h.read(), filename=filename)
+        except (OSError, SyntaxError, ValueError):
+            raise _NotDeclarative()
+        values = []
+        for node in tree.body:
+            if isinstance(node, ast.Assign):
+                targets = node.targets
+            elif isinstance(node, ast.AnnAssign) and node.value:
+                targets = [node.target]
+            else:
+                continue
+            if any(
+                isinstance(t, ast.Name) and t.id == name for t in targets
+            ):
+                values.append(node.value)
+        # the module would be imported if the value isn't a single literal
+        if len(values) != 1:
+            raise _NotDeclarative()
+        try:
+            value = ast.literal_eval(values[0])
+        except (SyntaxError, TypeError, ValueError):
+            raise _NotDeclarative()
+        if not isinstance(value, str):
+            raise _NotDeclarative()
+        return value
+
+
+def _parse_list(value, separator=','):
+    if '\n' in value:
+        chunks = value.splitlines()
+    else:
+        chunks = value.split(separator)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def _parse_dict(value):
+    result = {}
+    for line in _parse_list(value):
+        key, separator, value = line.partition('=')
+        if not separator:
+            raise _NotDeclarative()
+        result[key.strip()] = value.strip()
+    return result
+
+
+def _parse_requirements(value):
+    # setuptools versions differ in supporting files and comments
+    if value.startswith('file:') or '#' in value:
+        raise _NotDeclarative()
+    return _parse_list(value, separator=';')
+
+
+def _matches(name, patterns):
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
@@ -0,0 +1,190 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+# This file is being executed as a script by a separate Python interpreter
+# which might not be able to import colcon or this package.
+# Therefore it must only use the standard library.
+# When applying a snapshot modules are only imported after the cached
+# locations are in place, until then only builtin modules are available
+# without searching the module search path.
+
+from _frozen_importlib_external import spec_from_file_location
+import marshal
+import sys
+
+# the finder can't import the os module without finding it first
+try:
+    import posix as _os
+except ImportError:
+    import nt as _os
+
+# the loaders of modules found on the module search path whose locations
+# can be reused
+_FILE_LOADERS = (
+    'ExtensionFileLoader', 'SourceFileLoader', 'SourcelessFileLoader')
+
+
+def create_snapshot(snapshot_path, evaluate_script):
+    """
+    Write the state of an interpreter which has been started normally.
+
+    The snapshot contains the module search path and prefixes determined by
+    the `site` module, the executable lines of the processed `.pth` files,
+    the imported customization modules and the locations of the top-level
+    modules imported before evaluating setup.py files.
+
+    :param str snapshot_path: The path of the snapshot to write
+    :param str evaluate_script: The path of the script evaluating setup.py
+      files whose modules are being imported
+    """
+    import os
+    import site
+
+    sitedirs = []
+    if site.ENABLE_USER_SITE:
+        sitedirs.append(site.getusersitepackages())
+    sitedirs += site.getsitepackages()
+    pth_lines = []
+    for sitedir in sitedirs:
+        if not os.path.isdir(sitedir):
+            continue
+        for name in sorted(os.listdir(sitedir)):
+            if not name.endswith('.pth') or name.startswith('.'):
+                continue
+            with open(os.path.join(sitedir, name), encoding='utf-8') as h:
+                lines = [
+                    line.rstrip() for line in h
+                    if line.startswith(('import ', 'import\t'))]
+            if lines:
+                pth_lines.append((sitedir, lines))
+    customize_modules = [
+        name for name in ('sitecustomize', 'usercustomize')
+        if name in sys.modules]
+    path = list(sys.path)
+
+    with open(evaluate_script, 'rb') as h:
+        code = compile(h.read(), evaluate_script, 'exec')
+    namespace = {'__name__': 'evaluate_setup_py', '__file__': evaluate_script}
+    exec(code, namespace)
+    namespace['preimport']()
+
+    locations = {}
+    for name, module in list(sys.modules.items()):
+        spec = getattr(module, '__spec__', None)
+        if '.' in name or spec is None or not spec.has_location:
+            continue
+        if type(spec.loader).__name__ not in _FILE_LOADERS:
+            continue
+        search_locations = spec.submodule_search_locations
+        if search_locations is not None:
+            search_locations = list(search_locations)
+        locations[name] = (spec.origin, search_locations)
+
+    snapshot = {
+        'path': path,
+        'prefix': sys.prefix,
+        'exec_prefix': sys.exec_prefix,
+        'pth_lines': pth_lines,
+        'customize_modules': customize_modules,
+        'locations': locations,
+    }
+    with open(snapshot_path, 'wb') as h:
+        marshal.dump(snapshot, h)
+
+
+def apply_snapshot(snapshot_path):
+    """
+    Restore the state of a snapshot in an interpreter started with `-S`.
+
+    The executable lines of the `.pth` files and the customization modules
+    are run again since they can have side effects like registering import
+    hooks.
+    Then the module search path is reset to the one of the snapshot.
+
+    :param str snapshot_path: The path of the snapshot
+    """
+    with open(snapshot_path, 'rb') as h:
+        snapshot = marshal.load(h)
+    sys.prefix = snapshot['prefix']
+    sys.exec_prefix = snapshot['exec_prefix']
+    sys.path[:] = snapshot['path']
+    # the cached locations are consulted before searching the path
+    finder = _CachedLocationFinder(snapshot['path'], snapshot['locations'])
+    for index, meta_path_finder in enumerate(sys.meta_path):
+        if getattr(meta_path_finder, '__name__', None) == 'PathFinder':
+            sys.meta_path.insert(index, finder)
+            break
+    else:
+        sys.meta_path.append(finder)
+
+    import site
+
+    # the builtins added by the site module
+    site.setquit()
+    site.setcopyright()
+    site.sethelper()
+    for sitedir, lines in snapshot['pth_lines']:
+        for line in lines:
+            try:
+                exec(line, {'sitedir': sitedir})
+            except Exception:  # noqa: B902
+                # the site module skips the rest of the file
+                break
+    for name in snapshot['customize_modules']:
+        try:
+            __import__(name)
+        except Exception:  # noqa: B902
+            pass
+    sys.path[:] = snapshot['path']
+
+
+class _CachedLocationFinder:
+    """Find top-level modules at the locations of a snapshot."""
+
+    def __init__(self, path, locations):
+        self.path = path
+        self.locations = locations
+        self.cwd = None
+        self.cwd_names = ()
+
+    def find_spec(self, name, path=None, target=None):
+        location = self.locations.get(name)
+        # a modified search path might contain other modules of that name
+        if path is not None or location is None or sys.path != self.path:
+            return None
+        # the working directory is searched first and differs from the one
+        # the snapshot has been created in
+        if '' in sys.path:
+            cwd = _os.getcwd()
+            if cwd != self.cwd:
+                self.cwd = cwd
+                self.cwd_names = _os.listdir(cwd)
+            if any(
+                n == name or n.startswith(name + '.') for n in self.cwd_names
+            ):
+                return None
+        origin, search_locations = location
+        try:
+            if _os.stat(origin).st_mode & 0o170000 != 0o100000:
+                return None
+        except OSError:
+            return None
+        return spec_from_file_location(
+            name, origin, submodule_search_locations=search_locations)
+
+    def invalidate_caches(self):
+        self.cwd = None
+
+
+def main(argv):
+    """
+    Create a snapshot.
+
+    :param list argv: The path of the snapshot to write and the path of the
+      script evaluating setup.py files
+    """
+    create_snapshot(argv[0], argv[1])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,347 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import copy
+import re
+
+from colcon_core.environment_variable import EnvironmentVariable
+
+"""Environment variable to disable reading setup.py files statically"""
+STATIC_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_STATIC',
+    'Set to 0 to always dry run setup.py files instead of reading literal '
+    'setup() arguments or the setup.cfg file of setup.py files calling '
+    'setup() without arguments')
+
+# the modules which can provide the setup() function
+_SETUP_MODULES = ('distutils.core', 'setuptools')
+
+# modules which can be imported without affecting the setup() arguments
+_HARMLESS_MODULES = ('os', 'os.path', 'sys')
+
+# requirement strings which are not being modified by any setuptools version
+# (a name and at most one version specifier without whitespace)
+_CANONICAL_REQUIREMENT = re.compile(
+    r'^[A-Za-z0-9]([A-Za-z0-9._-]*[A-Za-z0-9])?'
+    r'((==|!=|<=|>=|~=|<|>)[A-Za-z0-9.*+!_-]+)?$')
+
+# versions which are not being normalized by any setuptools version
+_CANONICAL_VERSION = re.compile(r'^[0-9]+(\.[0-9]+)*$')
+
+
+class _NotStatic(Exception):
+    """Raised when a setup.py file can't be evaluated statically."""
+
+
+def _is_str(value):
+    return isinstance(value, str)
+
+
+def _is_bool(value):
+    return isinstance(value, bool)
+
+
+def _is_str_list(value):
+    return isinstance(value, list) and all(map(_is_str, value))
+
+
+def _is_requirement_list(value):
+    return _is_str_list(value) and all(
+        _CANONICAL_REQUIREMENT.match(v) for v in value)
+
+
+def _is_str_dict(value):
+    return isinstance(value, dict) and all(map(_is_str, value.keys()))
+
+
+def _is_str_mapping(value):
+    return _is_str_dict(value) and all(map(_is_str, value.values()))
+
+
+def _is_extras(value):
+    return _is_str_dict(value) and all(
+        ':' not in k and _is_requirement_list(v) for k, v in value.items())
+
+
+def _is_package_data(value):
+    return _is_str_dict(value) and all(map(_is_str_list, value.values()))
+
+
+def _is_entry_points(value):
+    return _is_str(value) or _is_package_data(value)
+
+
+def _is_data_files(value):
+    return isinstance(value, list) and all(
+        _is_str(v) or (
+            isinstance(v, tuple) and len(v) == 2 and _is_str(v[0]) and
+            _is_str_list(v[1]))
+        for v in value)
+
+
+def _is_version(value):
+    return _is_str(value) and bool(_CANONICAL_VERSION.match(value))
+
+
+# the arguments which end up unmodified in the metadata
+_METADATA_ARGUMENTS = {
+    'author': _is_str,
+    'author_email': _is_str,
+    'classifiers': _is_str_list,
+    'description': _is_str,
+    'download_url': _is_str,
+    'keywords': _is_str_list,
+    'license': _is_str,
+    'long_description': _is_str,
+    'long_description_content_type': _is_str,
+    'maintainer': _is_str,
+    'maintainer_email': _is_str,
+    'name': _is_str,
+    'platforms': _is_str_list,
+    'project_urls': _is_str_mapping,
+    'url': _is_str,
+    'version': _is_version,
+}
+
+# the arguments which end up unmodified as options of the distribution
+_OPTION_ARGUMENTS = {
+    'data_files': _is_data_files,
+    'dependency_links': _is_str_list,
+    'entry_points': _is_entry_points,
+    'exclude_package_data': _is_package_data,
+    'extras_require': _is_extras,
+    'include_package_data': _is_bool,
+    'install_requires': _is_requirement_list,
+    'namespace_packages': _is_str_list,
+    'package_data': _is_package_data,
+    'package_dir': _is_str_mapping,
+    'packages': _is_str_list,
+    'py_modules': _is_str_list,
+    'python_requires': _is_str,
+    'scripts': _is_str_list,
+    'setup_requires': _is_requirement_list,
+    'test_suite': _is_str,
+    'tests_require': _is_requirement_list,
+    'zip_safe': _is_bool,
+}
+
+
+def get_static_setup_arguments(setup_py):
+    """
+    Get the arguments of the setup() function without running the file.
+
+    Only files which contain nothing but imports, assignments of literals
+    and a single call of the setup() function are supported.
+    The arguments must be literals or names of module-level constants.
+
+    :param setup_py: The path of the setup.py file
+    :returns: The keyword arguments of the setup() function, or None if the
+      file can't be evaluated statically
+    :rtype: dict
+    """
+    # the module is only needed when reading a file, deferring the import
+    # keeps loading the extension cheap
+    import ast
+
+    try:
+        tree = ast.parse(setup_py.read_bytes(), filename=str(setup_py))
+    except (OSError, SyntaxError, ValueError):
+        return None
+    try:
+        return _SetupVisitor().visit_module(tree)
+    except _NotStatic:
+        return None
+
+
+class _SetupVisitor:
+
+    def __init__(self):
+        self.constants = {}
+        self.setup_names = set()
+        self.module_names = {}
+        self.arguments = None
+
+    def visit_module(self, tree):
+        import ast
+
+        body = tree.body
+        # skip the module docstring
+        if body and isinstance(body[0], ast.Expr) and \
+                _is_str(_literal(body[0].value)):
+            body = body[1:]
+        self.visit_body(body)
+        if self.arguments is None:
+            raise _NotStatic()
+        return self.arguments
+
+    def visit_body(self, body):
+        import ast
+
+        for node in body:
+            if isinstance(node, ast.Import):
+                self.visit_import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self.visit_import_from(node)
+            elif isinstance(node, ast.Assign):
+                self.visit_assign(node)
+            elif isinstance(node, ast.Expr) and \
+                    isinstance(node.value, ast.Call):
+                self.visit_setup_call(node.value)
+            elif isinstance(node, ast.If) and self._is_main_check(node):
+                self.visit_body(node.body)
+            else:
+                raise _NotStatic()
+
+    def visit_import(self, node):
+        for alias in node.names:
+            if alias.name in _SETUP_MODULES:
+                self.module_names[alias.asname or alias.name] = alias.name
+            elif alias.name not in _HARMLESS_MODULES:
+                raise _NotStatic()
+
+    def visit_import_from(self, node):
+        if node.level or node.module not in _SETUP_MODULES:
+            raise _NotStatic()
+        for alias in node.names:
+            if alias.name != 'setup':
+                raise _NotStatic()
+            self.setup_names.add(alias.asname or alias.name)
+
+    def visit_assign(self, node):
+        import ast
+
+        if len(node.targets) != 1 or \
+                not isinstance(node.targets[0], ast.Name):
+            raise _NotStatic()
+        self.constants[node.targets[0].id] = self.resolve(node.value)
+
+    def visit_setup_call(self, node):
+        if not self._is_setup_function(node.func):
+            raise _NotStatic()
+        if self.arguments is not None or node.args:
+            raise _NotStatic()
+        arguments = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                values = self.resolve(keyword.value)
+                if not _is_str_dict(values):
+                    raise _NotStatic()
+            else:
+                values = {keyword.arg: self.resolve(keyword.value)}
+            for name, value in values.items():
+                if name in arguments:
+                    raise _NotStatic()
+                arguments[name] = value
+        self.arguments = arguments
+
+    def resolve(self, node):
+        import ast
+
+        if isinstance(node, ast.Name):
+            if node.id not in self.constants:
+                raise _NotStatic()
+            # each use gets a separate copy like a re-evaluated literal
+            return copy.deepcopy(self.constants[node.id])
+        if isinstance(node, ast.List):
+            return [self.resolve(n) for n in node.elts]
+        if isinstance(node, ast.Tuple):
+            return tuple(self.resolve(n) for n in node.elts)
+        if isinstance(node, ast.Dict):
+            values = {}
+            for key, value in zip(node.keys, node.values):
+                if key is None:
+                    unpacked = self.resolve(value)
+                    if not isinstance(unpacked, dict):
+                        raise _NotStatic()
+                    values.update(unpacked)
+                else:
+                    values[self.resolve(key)] = self.resolve(value)
+            return values
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left = self.resolve(node.left)
+            right = self.resolve(node.right)
+            if type(left) is not type(right) or \
+                    not isinstance(left, (str, list, tuple)):
+                raise _NotStatic()
+            return left + right
+        value = _literal(node)
+        if value is None and not _is_none(node):
+            raise _NotStatic()
+        return value
+
+    def _is_setup_function(self, node):
+        import ast
+
+        if isinstance(node, ast.Name):
+            return node.id in self.setup_names
+        return (
+            isinstance(node, ast.Attribute) and node.attr == 'setup' and
+            isinstance(node.value, ast.Name) and
+            node.value.id in self.module_names)
+
+    def _is_main_check(self, node):
+        import ast
+
+        test = node.test
+        return (
+            not node.orelse and
+            isinstance(test, ast.Compare) and
+            isinstance(test.left, ast.Name) and
+            test.left.id == '__name__' and
+            len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq) and
+            _literal(test.comparators[0]) == '__main__')
+
+
+def _literal(node):
+    import ast
+
+    # only accept scalars, containers are resolved recursively
+    try:
+        value = ast.literal_eval(node)
+    except (SyntaxError, TypeError, ValueError):
+        return None
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+def _is_none(node):
+    import ast
+
+    try:
+        return ast.literal_eval(node) is None
+    except (SyntaxError, TypeError, ValueError):
+        return False
+
+
+def create_setup_information(arguments, default_information):
+    """
+    Create the information of a dry run from the setup() arguments.
+
+    The created information is identical to the result of dry running a
+    setup.py file passing the same arguments.
+    Arguments which might be modified by setuptools are not supported.
+
+    :param dict arguments: The keyword arguments of the setup() function
+    :param dict default_information: The information of dry running a
+      setup.py file passing no arguments in the same environment
+    :returns: The information describing the package, or None if the
+      arguments aren't supported
+    :rtype: dict
+    """
+    data = copy.deepcopy(default_information)
+    for name, value in arguments.items():
+        if name in _METADATA_ARGUMENTS:
+            if not _METADATA_ARGUMENTS[name](value) or \
+                    name not in data['metadata']:
+                return None
+            data['metadata'][name] = value
+        elif name in _OPTION_ARGUMENTS:
+            if not _OPTION_ARGUMENTS[name](value) or name not in data:
+                return None
+            data[name] = value
+        else:
+            return None
+    if data.get('python_requires'):
+        data['metadata']['python_requires'] = data['python_requires']
+    return data
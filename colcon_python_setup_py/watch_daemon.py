@@ -0,0 +1,548 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import argparse
+import os
+from pathlib import Path
+import socket
+import struct
+import sys
+from threading import Lock
+from threading import Thread
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py import persistent_cache
+from colcon_python_setup_py.environment_key import get_environment_key
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.environment_key import matches_environment_key
+from colcon_python_setup_py.evaluate_setup_py import read_message
+from colcon_python_setup_py.evaluate_setup_py import to_json
+from colcon_python_setup_py.evaluate_setup_py import write_message
+from colcon_python_setup_py.input_files import IMPLICIT_INPUT_FILES
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to query a running watch daemon"""
+DAEMON_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_DAEMON',
+    'The path of the socket of a watch daemon keeping the setup.py '
+    'information of a workspace in memory, started with '
+    "'python3 -m colcon_python_setup_py.watch_daemon'")
+
+# the inotify events which indicate a changed file or directory
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE |
+    _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+# the inotify events which aren't related to a single file
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+
+# the layout of the fixed size part of an inotify event
+_EVENT_HEADER = struct.Struct('iIII')
+
+# the inputs which are always relevant
+_NO_INPUTS = {'files': (), 'directories': ()}
+
+# the seconds to wait for connecting to the daemon and for its response,
+# independent of the evaluation timeout since a daemon which doesn't respond
+# in time is only skipped
+_CONNECT_TIMEOUT = 1
+_RESPONSE_TIMEOUT = 10
+
+# the socket path which couldn't be used within this process
+_unavailable_socket_path = None
+
+
+def get_socket_path():
+    """
+    Get the path of the socket selected by the environment variable.
+
+    :returns: The path, or None if no daemon should be queried
+    :rtype: str
+    """
+    return os.environ.get(DAEMON_ENVIRONMENT_VARIABLE.name) or None
+
+
+def query(setup_py, env):
+    """
+    Query the information of a setup.py file from the watch daemon.
+
+    If the daemon can't be reached, doesn't respond in time or runs a
+    different interpreter it isn't being queried again by this process.
+
+    :param Path setup_py: The path of the setup.py file
+    :param dict env: The environment variables
+    :returns: A tuple containing the data and the names of the read
+      environment variables, or None if no daemon is running or it failed
+      to evaluate the file
+    :rtype: tuple
+    """
+    global _unavailable_socket_path
+    socket_path = get_socket_path()
+    if socket_path is None or socket_path == _unavailable_socket_path:
+        return None
+    request = {
+        'setup_py': os.path.abspath(str(setup_py)), 'env': dict(env),
+        'interpreter': persistent_cache.get_interpreter_fingerprint()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(_RESPONSE_TIMEOUT)
+            with sock.makefile('rwb') as stream:
+                write_message(stream, to_json(request))
+                response = read_message(stream)
+    except (OSError, EOFError) as e:
+        logger.debug(
+            f"Not using the watch daemon at '{socket_path}' since it can't "
+            f'be reached: {e}')
+        _unavailable_socket_path = socket_path
+        return None
+    if response is not None and 'interpreter' in response:
+        logger.debug(
+            f"Not using the watch daemon at '{socket_path}' since it runs a "
+            f"different interpreter {response['interpreter']}")
+        _unavailable_socket_path = socket_path
+        return None
+    if response is None or 'error' in response:
+        # evaluating the file in this process reports the error
+        return None
+    environment_names = response['environment_names']
+    if environment_names is not None:
+        environment_names = tuple(environment_names)
+    return response['data'], environment_names
+
+
+class Inotify:
+    """
+    Watch directories for changes using the Linux inotify API.
+
+    The instance is thread-safe.
+    """
+
+    def __init__(self):
+        """
+        Construct a watcher.
+
+        :raises OSError: if inotify isn't available
+        """
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        try:
+            self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        except AttributeError:
+            raise OSError('inotify is not supported on this platform')
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        # closing the file descriptor doesn't interrupt a blocking read,
+        # instead a pipe wakes up the thread waiting for events
+        self._interrupt_fds = os.pipe()
+        self._lock = Lock()
+        # held while waiting for events, the file descriptors are only
+        # closed after the waiting thread released it
+        self._read_lock = Lock()
+        self._closed = False
+        self._directories = {}
+        self._descriptors = {}
+
+    def add_watch(self, directory):
+        """
+        Watch the entries of a directory.
+
+        :param str directory: The path of the directory
+        :returns: False if the directory can't be watched, otherwise True
+        :rtype: bool
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if directory in self._descriptors:
+                return True
+            descriptor = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), _WATCH_MASK)
+            if descriptor < 0:
+                errno = self._ctypes.get_errno()
+                logger.debug(
+                    f"Failed to watch '{directory}': {os.strerror(errno)}")
+                return False
+            self._directories[descriptor] = directory
+            self._descriptors[directory] = descriptor
+        return True
+
+    def read_events(self):
+        """
+        Wait for the next events.
+
+        :returns: A list of tuples containing the watched directory and the
+          name of the changed entry, the directory is None if events have
+          been lost
+        :rtype: list
+        :raises OSError: if the watcher has been closed
+        """
+        import select
+
+        with self._read_lock:
+            if self._closed:
+                raise OSError('the watcher has been closed')
+            readable, _, _ = select.select(
+                [self.fd, self._interrupt_fds[0]], [], [])
+            if self._interrupt_fds[0] in readable:
+                raise OSError('the watcher has been closed')
+            buffer = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            descriptor, mask, _, length = _EVENT_HEADER.unpack_from(
+                buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                events.append((None, None))
+                continue
+            with self._lock:
+                if mask & _IN_IGNORED:
+                    # the directory has been removed
+                    directory = self._directories.pop(descriptor, None)
+                    self._descriptors.pop(directory, None)
+                else:
+                    directory = self._directories.get(descriptor)
+            if directory is not None:
+                events.append((directory, name))
+        return events
+
+    def close(self):
+        """
+        Stop watching all directories and interrupt waiting for events.
+
+        The call returns after a thread waiting for events has been
+        interrupted.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        os.write(self._interrupt_fds[1], b'\0')
+        # the waiting thread might otherwise use closed or reused file
+        # descriptors
+        with self._read_lock, self._lock:
+            os.close(self.fd)
+            for fd in self._interrupt_fds:
+                os.close(fd)
+
+
+class _PackageState:
+
+    __slots__ = ('results', 'files', 'directories', 'generation', 'lock')
+
+    def __init__(self):
+        # a list of tuples containing the environment key and the data
+        self.results = []
+        # the read files and listed directories, None if they are unknown
+        self.files = set()
+        self.directories = set()
+        # incremented whenever the results are invalidated
+        self.generation = 0
+        # serializes the evaluations of the same file
+        self.lock = Lock()
+
+
+class WatchDaemon:
+    """
+    Keep the setup.py information of a workspace in memory.
+
+    The results are invalidated when the setup.py file or any file or
+    directory it read changes.
+    Each setup.py file is evaluated again on the next request.
+
+    The instance is thread-safe.
+    """
+
+    def __init__(self, watcher):
+        """
+        Construct a daemon.
+
+        :param watcher: The :class:`Inotify` instance
+        """
+        self.watcher = watcher
+        self._lock = Lock()
+        self._packages = {}
+        # the packages which are affected by changes in each directory
+        self._watched_directories = {}
+        self.hits = 0
+        self.evaluations = 0
+        self.invalidations = 0
+
+    def get_setup_information(self, setup_py, env):
+        """
+        Get the information of a setup.py file.
+
+        :param str setup_py: The absolute path of the setup.py file
+        :param dict env: The environment variables
+        :returns: A tuple containing the data and the names of the read
+          environment variables
+        :raises Exception: if the evaluation fails
+        """
+        from colcon_python_setup_py.package_identification.python_setup_py \
+            import _evaluate_setup_py
+
+        startup_environment = get_startup_environment(env)
+        with self._lock:
+            state = self._packages.setdefault(setup_py, _PackageState())
+        with state.lock:
+            with self._lock:
+                for environment_key, data in state.results:
+                    if matches_environment_key(
+                        environment_key, env,
+                        startup_environment=startup_environment
+                    ):
+                        self.hits += 1
+                        return data, environment_key[1]
+                generation = state.generation
+                self.evaluations += 1
+            # changes during the evaluation must not be missed
+            self._watch(setup_py, _NO_INPUTS)
+            data, environment_names, inputs = _evaluate_setup_py(
+                Path(setup_py), env=env)
+            self._watch(setup_py, inputs)
+            with self._lock:
+                # the inputs might have changed during the evaluation
+                if state.generation == generation:
+                    state.results.append((
+                        get_environment_key(
+                            env, environment_names,
+                            startup_environment=startup_environment),
+                        data))
+        return data, environment_names
+
+    def _watch(self, setup_py, inputs):
+        package_path = os.path.dirname(setup_py)
+        with self._lock:
+            state = self._packages[setup_py]
+            if inputs is None or state.files is None:
+                # any change within the package directory is relevant
+                state.files = None
+                directories = {package_path}
+            else:
+                state.files.add(setup_py)
+                state.files.update(
+                    os.path.join(package_path, name)
+                    for name in IMPLICIT_INPUT_FILES)
+                state.files.update(inputs['files'])
+                state.directories.update(inputs['directories'])
+                directories = {os.path.dirname(f) for f in state.files} | \
+                    state.directories
+            for directory in directories:
+                self._watched_directories.setdefault(
+                    directory, set()).add(setup_py)
+        for directory in directories:
+            self.watcher.add_watch(directory)
+
+    def handle_events(self, events):
+        """
+        Invalidate the results affected by changes.
+
+        :param list events: The result of :meth:`Inotify.read_events`
+        """
+        with self._lock:
+            for directory, name in events:
+                if directory is None:
+                    logger.warning(
+                        'Lost file system events, invalidating all results')
+                    affected = list(self._packages.keys())
+                else:
+                    path = os.path.join(directory, name)
+                    affected = [
+                        setup_py for setup_py in
+                        self._watched_directories.get(directory, ())
+                        if not name or
+                        self._is_affected(setup_py, directory, path)]
+                for setup_py in affected:
+                    state = self._packages[setup_py]
+                    if state.results:
+                        logger.info(f"Invalidating '{setup_py}'")
+                        self.invalidations += 1
+                    state.results = []
+                    state.generation += 1
+
+    def _is_affected(self, setup_py, directory, path):
+        state = self._packages[setup_py]
+        if state.files is None:
+            return True
+        return path in state.files or directory in state.directories
+
+    def get_statistics(self):
+        """
+        Get the statistics of the daemon.
+
+        :returns: a dictionary with the keys `packages`, `hits`,
+          `evaluations` and `invalidations`
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'packages': len(self._packages),
+                'hits': self.hits,
+                'evaluations': self.evaluations,
+                'invalidations': self.invalidations,
+            }
+
+    def watch_forever(self):
+        """Process the changes reported by the watcher until it is closed."""
+        while True:
+            try:
+                events = self.watcher.read_events()
+            except OSError:
+                return
+            self.handle_events(events)
+
+    def handle_connection(self, stream):
+        """
+        Answer the request of a client.
+
+        :param stream: The binary stream of the connection
+        """
+        request = read_message(stream)
+        if request is None:
+            return
+        interpreter = persistent_cache.get_interpreter_fingerprint()
+        if request.get('interpreter') != interpreter:
+            # the information might differ for another Python or setuptools
+            write_message(stream, to_json({
+                'error': 'different interpreter',
+                'interpreter': interpreter}))
+            return
+        try:
+            data, environment_names = self.get_setup_information(
+                request['setup_py'], request['env'])
+        except Exception as e:  # noqa: B902
+            response = {'error': str(e)}
+        else:
+            response = {
+                'data': data, 'environment_names': environment_names}
+        write_message(stream, to_json(response))
+
+
+def create_server(daemon, socket_path):
+    """
+    Create a server answering requests on a Unix domain socket.
+
+    :param daemon: The :class:`WatchDaemon` instance
+    :param str socket_path: The path of the socket
+    :rtype: socketserver.ThreadingUnixStreamServer
+    """
+    import socketserver
+
+    class Handler(socketserver.BaseRequestHandler):
+
+        def handle(self):
+            try:
+                with self.request.makefile('rwb') as stream:
+                    daemon.handle_connection(stream)
+            except (OSError, EOFError) as e:
+                logger.debug(f'Failed to answer a request: {e}')
+
+    if os.path.exists(socket_path):
+        # a socket left behind by a daemon which didn't exit cleanly
+        os.unlink(socket_path)
+    # only the current user is able to connect
+    umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    return server
+
+
+def serve(daemon, socket_path):
+    """
+    Answer requests and process changes until interrupted.
+
+    :param daemon: The :class:`WatchDaemon` instance
+    :param str socket_path: The path of the socket
+    """
+    server = create_server(daemon, socket_path)
+    Thread(target=daemon.watch_forever, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+
+
+def main(argv=None):
+    """
+    Run a daemon keeping the setup.py information of a workspace in memory.
+
+    :param list argv: The command line arguments
+    :returns: The return code
+    """
+    from colcon_python_setup_py.workspace_index import find_setup_py_files
+
+    parser = argparse.ArgumentParser(
+        prog=f'{sys.executable} -m {__name__}',
+        description='Keep the setup.py information of a workspace in memory '
+                    'and re-evaluate files only after they changed, colcon '
+                    'queries the daemon if the environment variable '
+                    f"'{DAEMON_ENVIRONMENT_VARIABLE.name}' contains the "
+                    'path of the socket')
+    parser.add_argument(
+        'socket', help='The path of the Unix domain socket to listen on')
+    parser.add_argument(
+        '--root', type=Path,
+        help='Evaluate all setup.py files in this workspace with the '
+             'environment of the daemon ahead of time')
+    args = parser.parse_args(argv)
+
+    try:
+        watcher = Inotify()
+    except OSError as e:
+        print(f'Failed to watch the file system: {e}', file=sys.stderr)
+        return 1
+    daemon = WatchDaemon(watcher)
+    if args.root is not None:
+        Thread(
+            target=_evaluate_workspace, daemon=True,
+            args=(daemon, find_setup_py_files(args.root))).start()
+    print(f"Listening on '{args.socket}'")
+    try:
+        serve(daemon, args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    statistics = daemon.get_statistics()
+    print(
+        f"Served {statistics['hits']} cached results, evaluated "
+        f"{statistics['evaluations']} times and invalidated "
+        f"{statistics['invalidations']} results of {statistics['packages']} "
+        'packages')
+    return 0
+
+
+def _evaluate_workspace(daemon, setup_pys):
+    env = dict(os.environ)
+    for setup_py in setup_pys:
+        try:
+            daemon.get_setup_information(os.path.abspath(str(setup_py)), env)
+        except Exception as e:  # noqa: B902
+            logger.warning(f"Failed to evaluate '{setup_py}': {e}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
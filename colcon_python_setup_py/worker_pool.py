@@ -0,0 +1,341 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import atexit
+import os
+from pathlib import Path
+import subprocess
+import sys
+from tempfile import TemporaryFile
+from threading import Condition
+from threading import Lock
+from threading import Timer
+import time
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py import fast_startup
+from colcon_python_setup_py import metrics
+from colcon_python_setup_py import profiling
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.evaluate_setup_py import decode_payload
+from colcon_python_setup_py.evaluate_setup_py import read_payload
+from colcon_python_setup_py.evaluate_setup_py import to_json
+from colcon_python_setup_py.evaluate_setup_py import write_message
+from colcon_python_setup_py.failure_cache import SetupPyError
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to evaluate setup.py files in long-lived workers"""
+WORKERS_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_WORKERS',
+    'Evaluate setup.py files in a pool of long-lived Python interpreters, '
+    'the value is the maximum number of interpreters')
+
+"""Environment variable to set the number of evaluations per worker"""
+WORKER_JOBS_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_WORKER_JOBS',
+    'Set the number of setup.py files a worker interpreter evaluates before '
+    'it is replaced (default: 100)')
+
+_DEFAULT_WORKER_JOBS = 100
+
+
+def get_evaluation_command(*args, env=None):
+    """
+    Get the command to evaluate setup.py files in a separate interpreter.
+
+    The script is executed without being imported as a module to not affect
+    the `sys.path` of the interpreter.
+    If the fast startup is enabled the interpreter skips the `site` module
+    and applies the startup snapshot of the environment instead.
+
+    :param args: The arguments passed to the script
+    :param env: The environment variables of the interpreter, or None to
+      always start it normally
+    :returns: The command
+    :rtype: list
+    """
+    code = get_script_code(str(Path(__file__).parent / 'evaluate_setup_py.py'))
+    if env is not None and fast_startup.is_fast_startup_enabled():
+        snapshot = fast_startup.get_startup_snapshot(env)
+        if snapshot is not None:
+            return [
+                sys.executable, '-S', '-c',
+                fast_startup.get_startup_code(snapshot) + code,
+            ] + list(args)
+    return [sys.executable, '-c', code] + list(args)
+
+
+def get_script_code(script):
+    """
+    Get the code executing a script as the main module.
+
+    :param str script: The path of the script
+    :returns: The code to pass to an interpreter
+    :rtype: str
+    """
+    return (
+        f'path = {script!r}\n'
+        "with open(path, 'rb') as f:\n"
+        "    code = compile(f.read(), path, 'exec')\n"
+        "exec(code, {'__name__': '__main__', '__file__': path})\n")
+
+
+def log_skipped_values(setup_py, skipped):
+    """
+    Log the values of a setup.py file which couldn't be transported.
+
+    :param Path setup_py: The path of the setup.py file
+    :param list skipped: The keys of the skipped values
+    """
+    if skipped:
+        logger.debug(
+            f"Skipped values of '{setup_py}' which can't be represented: "
+            + ', '.join(skipped))
+
+
+class _Worker:
+    """A long-lived interpreter evaluating setup.py files."""
+
+    def __init__(self, startup_key, env, max_jobs):
+        self.startup_key = startup_key
+        self.cmd = get_evaluation_command(
+            '--serve', str(max_jobs), env=env)
+        # the output of the setup.py files is returned in the responses,
+        # anything else the interpreter writes is only reported if it
+        # terminates unexpectedly
+        self.stderr = TemporaryFile()
+        try:
+            self.process = subprocess.Popen(
+                self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=self.stderr, env=env)
+        except BaseException:  # noqa: B902
+            self.stderr.close()
+            raise
+        self.timed_out = False
+
+    def evaluate(self, cwd, env, fields=None, profile=None, timeout=None):
+        start = time.monotonic()
+        timer = None
+        if timeout is not None:
+            # killing the worker unblocks reading the response
+            timer = Timer(timeout, self._kill)
+            timer.start()
+        try:
+            try:
+                write_message(
+                    self.process.stdin,
+                    to_json({
+                        'cwd': cwd, 'env': dict(env), 'fields': fields,
+                        'profile': profile}))
+            except OSError:
+                pass
+            try:
+                payload = read_payload(self.process.stdout)
+            except EOFError:
+                payload = None
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if payload is None and self.timed_out:
+            self.process.wait()
+            raise subprocess.TimeoutExpired(self.cmd, timeout)
+        if payload is None:
+            # the worker terminated unexpectedly
+            returncode = self.process.wait()
+            self.stderr.seek(0)
+            raise subprocess.CalledProcessError(
+                returncode or 1, self.cmd,
+                stderr=self.stderr.read().decode(errors='replace'))
+        received = time.monotonic()
+        response = decode_payload(payload)
+        metrics.add_evaluation(
+            response, len(payload), received - start,
+            time.monotonic() - received)
+        return response
+
+    def _kill(self):
+        self.timed_out = True
+        self.process.kill()
+
+    def terminate(self):
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.stderr.close()
+
+
+class WorkerPool:
+    """
+    A pool of long-lived interpreters evaluating setup.py files.
+
+    Each worker has setuptools already imported.
+    Workers are only reused for environments which don't differ in the
+    variables affecting the startup of the interpreter.
+    A worker is replaced after a number of evaluations or when an evaluated
+    setup.py file modified the state of the interpreter.
+    """
+
+    def __init__(self, max_workers, *, max_jobs=_DEFAULT_WORKER_JOBS):
+        """
+        Construct a pool.
+
+        :param int max_workers: The maximum number of interpreters
+        :param int max_jobs: The number of evaluations after which an
+          interpreter is replaced
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_jobs = max(1, max_jobs)
+        self._condition = Condition()
+        self._idle_workers = []
+        self._worker_count = 0
+
+    def evaluate(
+        self, setup_py, *, env, fields=None, profile=None, timeout=None
+    ):
+        """
+        Dry run the setup.py file in one of the workers.
+
+        :param Path setup_py: The path of the setup.py file
+        :param dict env: The environment variables
+        :param list fields: The fields to return, or None for all fields
+        :param dict profile: The parameters returned by
+          :func:`colcon_python_setup_py.profiling.get_profile_request`, or
+          None to not profile the evaluation
+        :param float timeout: The number of seconds after which the worker
+          is killed
+        :returns: The data describing the package, the sorted names of
+          the environment variables read by the setup.py file or None if
+          the whole environment might affect the data, and the paths of the
+          files and directories read within the package directory or None
+          if they are unknown
+        :rtype: tuple
+        :raises SetupPyError: if the setup.py file failed
+        :raises subprocess.CalledProcessError: if the worker terminated
+          unexpectedly
+        :raises subprocess.TimeoutExpired: if the evaluation timed out
+        """
+        startup_key = get_startup_environment(env)
+        worker = self._acquire(startup_key, env)
+        recycle = True
+        try:
+            response = worker.evaluate(
+                os.path.abspath(str(setup_py.parent)), env, fields=fields,
+                profile=profile, timeout=timeout)
+            recycle = response['recycle']
+        finally:
+            self._release(worker, recycle)
+        if 'error' in response:
+            # like the output of a separate interpreter the traceback
+            # follows anything printed before the failure
+            raise SetupPyError(
+                setup_py, 1, worker.cmd,
+                response['output'] + response['error'],
+                environment_names=response.get('environment_names'),
+                inputs=response.get('inputs'))
+        if response['output'].strip():
+            logger.debug(
+                f"Output of '{setup_py}':\n{response['output'].rstrip()}")
+        log_skipped_values(setup_py, response['skipped'])
+        profiling.log_profile(setup_py, response.get('profile'))
+        return (
+            response['data'], response['environment_names'],
+            response['inputs'])
+
+    def shutdown(self):
+        """Terminate all idle workers."""
+        with self._condition:
+            workers = self._idle_workers
+            self._idle_workers = []
+            self._worker_count -= len(workers)
+            self._condition.notify_all()
+        for worker in workers:
+            worker.terminate()
+
+    def _acquire(self, startup_key, env):
+        stale_worker = None
+        with self._condition:
+            while True:
+                for i, worker in enumerate(self._idle_workers):
+                    if worker.startup_key == startup_key:
+                        return self._idle_workers.pop(i)
+                if self._worker_count < self.max_workers:
+                    break
+                if self._idle_workers:
+                    # replace an idle worker for a different environment
+                    stale_worker = self._idle_workers.pop(0)
+                    self._worker_count -= 1
+                    break
+                with metrics.timed('queue'):
+                    self._condition.wait()
+            self._worker_count += 1
+        if stale_worker is not None:
+            stale_worker.terminate()
+        worker = None
+        try:
+            with metrics.timed('spawn'):
+                worker = _Worker(startup_key, env, self.max_jobs)
+        finally:
+            if worker is None:
+                with self._condition:
+                    self._worker_count -= 1
+                    self._condition.notify()
+        return worker
+
+    def _release(self, worker, recycle):
+        with self._condition:
+            if not recycle:
+                self._idle_workers.append(worker)
+            else:
+                self._worker_count -= 1
+            self._condition.notify()
+        if recycle:
+            worker.terminate()
+
+
+_worker_pool = None
+_worker_pool_lock = Lock()
+
+
+def get_worker_pool():
+    """
+    Get the worker pool if enabled by the environment variable.
+
+    :returns: The worker pool, or None if disabled
+    :rtype: WorkerPool
+    """
+    global _worker_pool
+    if _worker_pool is not None:
+        return _worker_pool
+    value = os.environ.get(WORKERS_ENVIRONMENT_VARIABLE.name)
+    if not value or value == '0':
+        return None
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = _create_worker_pool(value)
+    return _worker_pool
+
+
+def _create_worker_pool(value):
+    max_jobs = _DEFAULT_WORKER_JOBS
+    try:
+        max_workers = int(value)
+        max_jobs = int(os.environ.get(
+            WORKER_JOBS_ENVIRONMENT_VARIABLE.name, max_jobs))
+    except ValueError:
+        logger.warning(
+            'Ignoring invalid value of environment variable '
+            f"'{WORKERS_ENVIRONMENT_VARIABLE.name}' or "
+            f"'{WORKER_JOBS_ENVIRONMENT_VARIABLE.name}'")
+        return None
+    worker_pool = WorkerPool(max_workers, max_jobs=max_jobs)
+    atexit.register(worker_pool.shutdown)
+    return worker_pool
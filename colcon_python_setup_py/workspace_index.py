@@ -0,0 +1,395 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import argparse
+import atexit
+import os
+from pathlib import Path
+import subprocess
+import sys
+from threading import Lock
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.logging import colcon_logger
+from colcon_python_setup_py import persistent_cache
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.evaluate_setup_py import decode_payload
+from colcon_python_setup_py.evaluate_setup_py import encode_payload
+from colcon_python_setup_py.evaluate_setup_py import to_json
+from colcon_python_setup_py.input_files import get_content_fingerprint
+from colcon_python_setup_py.input_files import IMPLICIT_INPUT_FILES
+
+logger = colcon_logger.getChild(__name__)
+
+"""Environment variable to use the setup.py information of an index file"""
+INDEX_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_PYTHON_SETUP_PY_INDEX',
+    'Use the setup.py information from a workspace index file instead of '
+    'evaluating the matching setup.py files, the paths are relative to the '
+    'directory containing the index file')
+
+# bump whenever the layout of the index changes
+INDEX_FORMAT_VERSION = 3
+
+# the name of the index file if only a workspace directory is given
+DEFAULT_INDEX_FILENAME = 'python_setup_py_index'
+
+# the name of the file marking directories to be ignored by colcon
+_IGNORE_MARKER = 'COLCON_IGNORE'
+
+_workspace_index_lock = Lock()
+_workspace_index = None
+_workspace_index_path = None
+
+
+def get_interpreter_fingerprint():
+    """
+    Get the properties of the interpreter which affect an evaluation.
+
+    Unlike the key of the persistent cache it doesn't contain the path of
+    the interpreter and its build information since those might differ
+    between machines.
+
+    :returns: The Python version and the setuptools version
+    :rtype: tuple
+    """
+    _, _, _, setuptools_version = \
+        persistent_cache.get_interpreter_fingerprint()
+    return (
+        '.'.join(str(v) for v in sys.version_info[:3]), setuptools_version)
+
+
+class WorkspaceIndex:
+    """
+    The setup.py information of a workspace exported by another machine.
+
+    The paths of the setup.py files and the files they read are relative to
+    the workspace root.
+    Absolute paths of the exporting workspace in the data and in the values
+    of environment variables are replaced with the local workspace root.
+    An entry is only used if the content of the setup.py file and the files
+    it read, the read environment variables as well as the variables
+    affecting the startup of the interpreter are unchanged.
+
+    The index is thread-safe.
+    """
+
+    def __init__(self, content, root):
+        """
+        Construct a workspace index.
+
+        :param dict content: The content of an index file
+        :param Path root: The local workspace root
+        """
+        self.root = os.path.abspath(str(root))
+        self._exported_root = content['root']
+        self._entries = {}
+        if tuple(content['interpreter']) != get_interpreter_fingerprint():
+            logger.warning(
+                'Ignoring the workspace index since it has been exported '
+                f"with a different interpreter {content['interpreter']}")
+        else:
+            for entry in content['entries']:
+                self._entries[entry['setup_py']] = entry
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):  # noqa: D105
+        return len(self._entries)
+
+    def lookup(self, setup_py, env):
+        """
+        Get the information of a setup.py file.
+
+        :param Path setup_py: The path of the setup.py file
+        :param env: The environment variables
+        :returns: The data and the names of the environment variables read
+          by the setup.py file, or None if there is no matching entry
+        :rtype: tuple
+        """
+        result = self._lookup(setup_py, env)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def _lookup(self, setup_py, env):
+        relative_path = _get_relative_path(self.root, setup_py)
+        if relative_path is None:
+            return None
+        entry = self._entries.get(relative_path)
+        if entry is None:
+            return None
+        # other variables like the PYTHONPATH make other modules importable
+        if tuple(
+            self._relocate(entry['startup_environment'])
+        ) != get_startup_environment(env):
+            logger.debug(
+                f"Ignoring the index entry of '{setup_py}' since the "
+                'environment of the interpreter differs')
+            return None
+        for name, value in entry['environment']:
+            if env.get(name) != self._relocate(value):
+                logger.debug(
+                    f"Ignoring the index entry of '{setup_py}' since the "
+                    f"environment variable '{name}' differs")
+                return None
+        for fingerprint in entry['inputs']:
+            path = os.path.join(self.root, *fingerprint['path'].split('/'))
+            if dict(
+                get_content_fingerprint(path), path=fingerprint['path']
+            ) != fingerprint:
+                logger.debug(
+                    f"Ignoring the index entry of '{setup_py}' since "
+                    f"'{path}' changed")
+                return None
+        environment_names = tuple(name for name, _ in entry['environment'])
+        return self._relocate(entry['data']), environment_names
+
+    def _relocate(self, value):
+        return _relocate(value, self._exported_root, self.root)
+
+    def get_statistics(self):
+        """
+        Get the statistics of looking up setup.py files in the index.
+
+        :returns: A dictionary with the keys `hits`, `misses` and `size`
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries)}
+
+
+def load_index(index_path, *, root=None):
+    """
+    Load a workspace index file.
+
+    :param Path index_path: The path of the index file
+    :param Path root: The local workspace root, by default the directory
+      containing the index file
+    :returns: The index, or None if the file can't be read or is invalid
+    :rtype: WorkspaceIndex
+    """
+    index_path = Path(str(index_path))
+    if root is None:
+        root = index_path.parent
+    try:
+        content = decode_payload(index_path.read_bytes())
+        if content['version'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"unknown version '{content['version']}'")
+        return WorkspaceIndex(content, root)
+    except (OSError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Ignoring invalid workspace index '{index_path}': {e}")
+        return None
+
+
+def get_workspace_index():
+    """
+    Get the workspace index selected by the environment variable.
+
+    The hits and misses are reported when the process exits.
+
+    :returns: The index, or None if no valid index is selected
+    :rtype: WorkspaceIndex
+    """
+    global _workspace_index
+    global _workspace_index_path
+    value = os.environ.get(INDEX_ENVIRONMENT_VARIABLE.name) or None
+    if value == _workspace_index_path:
+        return _workspace_index
+    with _workspace_index_lock:
+        if value != _workspace_index_path:
+            workspace_index = None
+            if value is not None:
+                workspace_index = load_index(value)
+            if workspace_index is not None:
+                atexit.register(_report_statistics, value, workspace_index)
+            _workspace_index = workspace_index
+            _workspace_index_path = value
+    return _workspace_index
+
+
+def _report_statistics(index_path, workspace_index):
+    statistics = workspace_index.get_statistics()
+    if statistics['hits'] or statistics['misses']:
+        logger.info(
+            f"Workspace index '{index_path}': {statistics['hits']} hits, "
+            f"{statistics['misses']} misses")
+
+
+def create_entry(root, setup_py, env, data, environment_names, inputs):
+    """
+    Create the index entry of an evaluated setup.py file.
+
+    :param Path root: The workspace root
+    :param Path setup_py: The path of the setup.py file
+    :param env: The environment variables
+    :param dict data: The data describing the package
+    :param tuple environment_names: The names of the environment variables
+      read by the setup.py file
+    :param dict inputs: A dictionary with the lists of absolute paths of
+      the read `files` and listed `directories`
+    :returns: The entry, or None if the result can't be relocated
+    :rtype: dict
+    """
+    root = os.path.abspath(str(root))
+    relative_path = _get_relative_path(root, setup_py)
+    if relative_path is None or environment_names is None or inputs is None:
+        return None
+    package_path = os.path.dirname(os.path.abspath(str(setup_py)))
+    paths = {os.path.join(package_path, 'setup.py')}
+    paths.update(
+        os.path.join(package_path, name) for name in IMPLICIT_INPUT_FILES)
+    paths.update(inputs['files'])
+    paths.update(inputs['directories'])
+    fingerprints = []
+    for path in sorted(paths):
+        relative_input_path = _get_relative_path(root, path)
+        if relative_input_path is None:
+            return None
+        fingerprints.append(dict(
+            get_content_fingerprint(path), path=relative_input_path))
+    return {
+        'setup_py': relative_path,
+        'startup_environment': get_startup_environment(env),
+        'environment': [
+            (name, env.get(name)) for name in environment_names],
+        'inputs': fingerprints,
+        'data': data,
+    }
+
+
+def export_index(index_path, root, setup_pys, *, env=None):
+    """
+    Evaluate setup.py files and write their information to an index file.
+
+    Files whose result depends on the whole environment, whose read files
+    are unknown or which are outside the workspace root are skipped.
+
+    :param Path index_path: The path of the index file
+    :param Path root: The workspace root
+    :param setup_pys: The paths of the setup.py files
+    :param dict env: The environment variables to evaluate the files with
+    :returns: The number of exported entries
+    :rtype: int
+    """
+    from colcon_python_setup_py.package_identification.python_setup_py \
+        import _evaluate_setup_py
+
+    if env is None:
+        env = os.environ
+    entries = []
+    for setup_py in setup_pys:
+        try:
+            data, environment_names, inputs = _evaluate_setup_py(
+                Path(str(setup_py)), env=env)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Skipping '{setup_py}': {e}")
+            continue
+        entry = create_entry(
+            root, setup_py, env, data, environment_names, inputs)
+        if entry is None:
+            logger.warning(
+                f"Skipping '{setup_py}' since its information can't be "
+                'reused in another workspace')
+            continue
+        entries.append(entry)
+    content = encode_payload(to_json({
+        'version': INDEX_FORMAT_VERSION,
+        'root': os.path.abspath(str(root)),
+        'interpreter': get_interpreter_fingerprint(),
+        'entries': entries,
+    }))
+    index_path = Path(str(index_path))
+    temp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+    temp_path.write_bytes(content)
+    os.replace(str(temp_path), str(index_path))
+    return len(entries)
+
+
+def find_setup_py_files(root):
+    """
+    Find the setup.py files in a workspace.
+
+    Like the package discovery of colcon directories containing a
+    `COLCON_IGNORE` file as well as hidden directories are skipped and the
+    subdirectories of a package aren't crawled.
+
+    :param Path root: The workspace root
+    :returns: The sorted paths of the setup.py files
+    :rtype: list
+    """
+    setup_pys = []
+    for dirpath, dirnames, filenames in os.walk(str(root)):
+        if _IGNORE_MARKER in filenames:
+            dirnames[:] = []
+            continue
+        if 'setup.py' in filenames:
+            setup_pys.append(Path(dirpath) / 'setup.py')
+            dirnames[:] = []
+            continue
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+    return sorted(setup_pys)
+
+
+def _get_relative_path(root, path):
+    path = os.path.abspath(str(path))
+    if not path.startswith(os.path.join(root, '')):
+        return None
+    return Path(os.path.relpath(path, root)).as_posix()
+
+
+def _relocate(value, old_root, new_root):
+    if old_root == new_root:
+        return value
+    if isinstance(value, str):
+        if value == old_root:
+            return new_root
+        return value.replace(
+            os.path.join(old_root, ''), os.path.join(new_root, ''))
+    if isinstance(value, dict):
+        return {
+            k: _relocate(v, old_root, new_root) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return type(value)(_relocate(v, old_root, new_root) for v in value)
+    return value
+
+
+def main(argv=None):
+    """
+    Export the setup.py information of a workspace to an index file.
+
+    :param list argv: The command line arguments
+    :returns: The return code
+    """
+    parser = argparse.ArgumentParser(
+        prog=f'{sys.executable} -m {__name__}',
+        description='Export the setup.py information of a workspace to an '
+                    'index file which can be used by other machines')
+    parser.add_argument(
+        '--root', type=Path, default=Path.cwd(),
+        help='The workspace root (default: the current directory)')
+    parser.add_argument(
+        '--output', type=Path,
+        help='The path of the index file (default: '
+             f"'{DEFAULT_INDEX_FILENAME}' in the workspace root)")
+    parser.add_argument(
+        'setup_py', nargs='*', type=Path,
+        help='The setup.py files to export (default: all setup.py files '
+             'in the workspace)')
+    args = parser.parse_args(argv)
+
+    output = args.output or args.root / DEFAULT_INDEX_FILENAME
+    setup_pys = args.setup_py or find_setup_py_files(args.root)
+    count = export_index(output, args.root, setup_pys)
+    print(f"Exported {count} of {len(setup_pys)} setup.py files to '{output}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from colcon_python_setup_py import worker_pool
+import pytest
+
+
+@pytest.fixture(params=[None, '1'])
+def workers(request, monkeypatch):
+    # evaluate setup.py files in separate interpreters as well as in a pool
+    # of long-lived workers
+    if request.param:
+        monkeypatch.setenv(
+            worker_pool.WORKERS_ENVIRONMENT_VARIABLE.name, request.param)
+    monkeypatch.setattr(worker_pool, '_worker_pool', None)
+    yield request.param
+    # only shut down a pool which has been created by the test
+    pool = worker_pool._worker_pool
+    if pool is not None:
+        pool.shutdown()
+
+
+@pytest.fixture
+def create_package(tmp_path):
+    def create(content, *, name='pkg'):
+        setup_py = tmp_path / name / 'setup.py'
+        setup_py.parent.mkdir(parents=True)
+        setup_py.write_text(content)
+        return setup_py
+
+    return create
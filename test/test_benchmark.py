@@ -0,0 +1,52 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import importlib.util
+from pathlib import Path
+
+
+def _import_benchmark():
+    path = Path(__file__).parents[1] / 'benchmark' / 'run_benchmark.py'
+    spec = importlib.util.spec_from_file_location('run_benchmark', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark(tmp_path):
+    benchmark = _import_benchmark()
+
+    package_paths = benchmark.generate_workspace(
+        tmp_path / 'ws', 3, sorted(benchmark.STYLES.keys()))
+    assert [p.name for p in package_paths] == [
+        'pkg_environment_dependent_0', 'pkg_heavy_imports_1',
+        'pkg_literal_2']
+    assert all((p / 'setup.py').is_file() for p in package_paths)
+
+    baseline_path = tmp_path / 'baseline.json'
+    assert benchmark.main([
+        '--sizes', '2', '--styles', 'literal',
+        '--save-baseline', str(baseline_path)]) == 0
+    results = benchmark.run_benchmark([2], ['literal'])
+    assert set(results.keys()) == {
+        '2/cold/identify', '2/cold/augment',
+        '2/warm/identify', '2/warm/augment'}
+    assert results['2/warm/identify']['count'] == 2
+
+    baseline = {key: dict(r, throughput=r['throughput'] * 10)
+                for key, r in results.items()}
+    assert len(benchmark.compare(results, baseline, 0.25)) == 4
+    assert not benchmark.compare(results, results, 0.25)
+
+
+def test_measure_startup(tmp_path):
+    path = Path(__file__).parents[1] / 'benchmark' / 'measure_startup.py'
+    spec = importlib.util.spec_from_file_location('measure_startup', path)
+    measure_startup = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(measure_startup)
+
+    output_path = tmp_path / 'startup.json'
+    assert measure_startup.main([
+        '--path-entries', '3', '--pth-files', '3', '--repeat', '1',
+        '--output', str(output_path)]) == 0
+    assert output_path.is_file()
@@ -0,0 +1,73 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import io
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py.evaluate_setup_py import read_message
+from colcon_python_setup_py.evaluate_setup_py import setup_data_to_json
+from colcon_python_setup_py.evaluate_setup_py import to_json
+from colcon_python_setup_py.evaluate_setup_py import write_message
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _get_setup_information
+import pytest
+
+
+def _round_trip(value):
+    stream = io.BytesIO()
+    write_message(stream, to_json(value))
+    stream.seek(0)
+    return read_message(stream)
+
+
+def test_round_trip():
+    value = {
+        'data_files': [('share/pkg', ['package.xml'])],
+        'entry_points': {'console_scripts': ['cmd = pkg:main']},
+        'zip_safe': False,
+        'version': None,
+        'float': 1.5,
+        'set': {'a', 'b'},
+        'frozenset': frozenset([1]),
+        'bytes': b'\x00\xff',
+        'non-ascii': 'caf\xe9 \udcff',
+        'non-string keys': {1: 'one', ('a', 'b'): 'tuple'},
+        '$tuple': 'escaped',
+    }
+    result = _round_trip(value)
+    assert result == value
+    assert isinstance(result['data_files'][0], tuple)
+    assert isinstance(result['frozenset'], frozenset)
+
+
+def test_unsupported_values():
+    with pytest.raises(TypeError):
+        to_json({'obj': object()})
+
+    data, skipped = setup_data_to_json({
+        'name': 'pkg', 'obj': object(),
+        'metadata': {'name': 'pkg', 'obj': object()}})
+    assert data == {'name': 'pkg', 'metadata': {'name': 'pkg'}}
+    assert skipped == ['obj', 'metadata.obj']
+
+
+def test_read_message():
+    assert read_message(io.BytesIO()) is None
+    with pytest.raises(EOFError):
+        read_message(io.BytesIO(b'\x00'))
+    with pytest.raises(EOFError):
+        read_message(io.BytesIO(b'\x00\x00\x00\x05{}'))
+
+
+def test_output_of_setup_py():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(
+            'import sys\n'
+            'from setuptools import setup\n'
+            "print('stray output')\n"
+            "sys.stdout.buffer.write(b'\\x00\\x00\\x00')\n"
+            "setup(name='pkg-name')\n")
+        data = _get_setup_information(setup_py)
+        assert data['metadata']['name'] == 'pkg-name'
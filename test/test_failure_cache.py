@@ -0,0 +1,121 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import asyncio
+import os
+
+from colcon_python_setup_py.failure_cache import FailureCache
+from colcon_python_setup_py.failure_cache import SetupPyError
+from colcon_python_setup_py.package_identification import python_setup_py
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information_async
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import invalidate_setup_information
+import pytest
+
+BROKEN_SETUP_PY = """\
+import os
+from setuptools import setup
+
+with open('version.txt') as h:
+    version = h.read().strip()
+if os.environ.get('PKG_BROKEN') == '1':
+    print('about to fail')
+    raise RuntimeError('broken')
+setup(name='pkg-name', version=version)
+"""
+
+
+def test_error_message(tmp_path):
+    error = SetupPyError(
+        tmp_path / 'setup.py', 2, ['python'],
+        ''.join(f'line {i}\n' for i in range(100)))
+    message = str(error)
+    assert message.startswith(f"Failed to evaluate '{tmp_path / 'setup.py'}'")
+    assert 'exit code 2' in message
+    assert 'line 99' in message
+    assert 'line 0\n' not in message
+
+
+def test_failure_cache(tmp_path):
+    setup_py = tmp_path / 'setup.py'
+    setup_py.write_text('')
+    (tmp_path / 'version.txt').write_text('1.0')
+    env = {'PKG_BROKEN': '1', 'OTHER': 'value'}
+    error = SetupPyError(
+        setup_py, 1, ['python'], 'broken', environment_names=('PKG_BROKEN',),
+        inputs={'files': [str(tmp_path / 'version.txt')], 'directories': []})
+
+    cache = FailureCache()
+    assert cache.get(setup_py, env) is None
+    cache.put(setup_py, env, error)
+    assert len(cache) == 1
+    cached_error = cache.get(setup_py, dict(env, OTHER='other value'))
+    assert cached_error.cached
+    assert cached_error.stderr == 'broken'
+    assert 'not evaluated again' in str(cached_error)
+    assert cache.get(setup_py, dict(env, PKG_BROKEN='0')) is None
+
+    # changing an input drops the failure
+    (tmp_path / 'version.txt').write_text('2.0')
+    assert cache.get(setup_py, env) is None
+    assert len(cache) == 0
+
+    cache.put(setup_py, env, error)
+    assert cache.invalidate(setup_py) == 1
+    assert cache.get(setup_py, env) is None
+
+
+def test_repeated_failure(monkeypatch, create_package, workers):
+    evaluations = []
+    original_function = python_setup_py._get_uncached_setup_information
+
+    def _get_uncached_setup_information(setup_py, *, env, fields=None):
+        evaluations.append(setup_py)
+        return original_function(setup_py, env=env, fields=fields)
+
+    monkeypatch.setattr(
+        python_setup_py, '_get_uncached_setup_information',
+        _get_uncached_setup_information)
+    setup_py = create_package(BROKEN_SETUP_PY)
+    (setup_py.parent / 'version.txt').write_text('1.0')
+    env = dict(os.environ, PKG_BROKEN='1')
+
+    try:
+        with pytest.raises(SetupPyError) as e:
+            get_setup_information(setup_py, env=env)
+        assert str(setup_py) in str(e.value)
+        assert 'RuntimeError: broken' in e.value.stderr
+        if not workers:
+            assert 'about to fail' in e.value.stderr
+        assert not e.value.cached
+        assert len(evaluations) == 1
+
+        # the failure is raised again without evaluating the file
+        with pytest.raises(SetupPyError) as e:
+            get_setup_information(setup_py, env=dict(env, OTHER='value'))
+        assert e.value.cached
+        with pytest.raises(SetupPyError):
+            asyncio.run(get_setup_information_async(setup_py, env=env))
+        assert len(evaluations) == 1
+
+        # changing a read file evaluates the file again
+        (setup_py.parent / 'version.txt').write_text('2.0')
+        with pytest.raises(SetupPyError) as e:
+            get_setup_information(setup_py, env=env)
+        assert not e.value.cached
+        assert len(evaluations) == 2
+
+        # the failure only applies to the same relevant environment
+        data = get_setup_information(setup_py, env=dict(env, PKG_BROKEN='0'))
+        assert data['metadata']['version'] == '2.0'
+        assert len(evaluations) == 3
+
+        invalidate_setup_information(setup_py)
+        with pytest.raises(SetupPyError):
+            get_setup_information(setup_py, env=env)
+        assert len(evaluations) == 4
+    finally:
+        invalidate_setup_information(setup_py)
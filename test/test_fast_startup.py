@@ -0,0 +1,92 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+import subprocess
+import sys
+
+from colcon_python_setup_py import fast_startup
+from colcon_python_setup_py import worker_pool
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _run_setup_py
+
+SETUP_PY = """\
+import sys
+from setuptools import setup
+import overlay_module_0
+setup(
+    name='pkg-name',
+    version='1.0.0',
+    description=repr((
+        sys.path, sys.prefix, sys.exec_prefix,
+        getattr(sys, 'overlay_pth_count', None),
+        sorted(name for name in sys.modules if name.startswith('_distutils')),
+        callable(exit))),
+)
+"""
+
+
+def _create_overlay(path):
+    entries = []
+    for i in range(20):
+        entry = path / 'pythonpath' / f'entry_{i}'
+        (entry / f'overlay_module_{i}').mkdir(parents=True)
+        (entry / f'overlay_module_{i}' / '__init__.py').write_text('')
+        entries.append(str(entry))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(entries))
+    env['PYTHONUSERBASE'] = str(path / 'userbase')
+    code = 'import site; print(site.getusersitepackages())'
+    user_site = subprocess.check_output(
+        [sys.executable, '-c', code], env=env).decode().strip()
+    os.makedirs(user_site)
+    for i in range(5):
+        (path / 'pth' / f'entry_{i}').mkdir(parents=True)
+        with open(os.path.join(user_site, f'overlay_{i}.pth'), 'w') as h:
+            h.write(str(path / 'pth' / f'entry_{i}') + '\n')
+            h.write(
+                'import sys; sys.overlay_pth_count = '
+                "getattr(sys, 'overlay_pth_count', 0) + 1\n")
+    return env
+
+
+def test_same_as_normal_startup(
+    monkeypatch, tmp_path, create_package, workers
+):
+    monkeypatch.setattr(fast_startup, '_snapshots', {})
+    env = _create_overlay(tmp_path / 'overlay')
+    setup_py = create_package(SETUP_PY)
+
+    monkeypatch.delenv(
+        fast_startup.FAST_STARTUP_ENVIRONMENT_VARIABLE.name, raising=False)
+    assert '-S' not in worker_pool.get_evaluation_command(env=env)
+    expected = _run_setup_py(setup_py, env=env)
+
+    monkeypatch.setenv(
+        fast_startup.FAST_STARTUP_ENVIRONMENT_VARIABLE.name, '1')
+    assert '-S' in worker_pool.get_evaluation_command(env=env)
+    # the snapshot is created once per environment
+    snapshot = fast_startup.get_startup_snapshot(env)
+    assert snapshot is not None
+    assert fast_startup.get_startup_snapshot(dict(env, OTHER='value')) == \
+        snapshot
+    assert fast_startup.get_startup_snapshot(os.environ) != snapshot
+
+    if workers:
+        pool = worker_pool.WorkerPool(1)
+        try:
+            # workers don't record the variables read while importing
+            assert pool.evaluate(setup_py, env=env)[0] == expected[0]
+        finally:
+            pool.shutdown()
+    else:
+        assert _run_setup_py(setup_py, env=env) == expected
+
+
+def test_failed_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr(fast_startup, '_snapshots', {})
+    monkeypatch.setenv(
+        fast_startup.FAST_STARTUP_ENVIRONMENT_VARIABLE.name, '1')
+    # the interpreter fails to start
+    env = dict(os.environ, PYTHONHOME=str(tmp_path / 'missing'))
+    assert fast_startup.get_startup_snapshot(env) is None
+    assert '-S' not in worker_pool.get_evaluation_command(env=env)
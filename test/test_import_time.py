@@ -0,0 +1,81 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import configparser
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+# the modules which must only be imported when a file is evaluated
+HEAVY_MODULES = (
+    'ast', 'concurrent.futures', 'distutils', 'pkg_resources', 'runpy',
+    'setuptools')
+
+# the maximum time in seconds to import all entry points, importing them
+# takes a few milliseconds but shared machines might be much slower, the
+# heavy modules are checked deterministically by a separate test
+IMPORT_TIME_BUDGET = 0.2
+
+_MARKER = 'colcon_core.command imported'
+
+
+def _get_entry_point_modules():
+    config = configparser.ConfigParser()
+    config.read(str(Path(__file__).parents[1] / 'setup.cfg'))
+    modules = set()
+    for group in config['options.entry_points'].values():
+        for line in group.strip().splitlines():
+            modules.add(line.split('=', 1)[1].strip().split(':')[0])
+    return sorted(modules)
+
+
+def _run(code, tmp_path):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(Path(__file__).parents[1])] +
+        ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    # colcon always imports its command module as well as its own Python
+    # extensions before loading the extensions of this package
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime',
+            '-X', f'pycache_prefix={tmp_path}',
+            '-c',
+            'import colcon_core.command\n'
+            'import colcon_core.package_augmentation.python\n'
+            'import colcon_core.package_identification.python\n'
+            'import sys\n'
+            f'sys.stderr.write({_MARKER!r} + "\\n")\n' + code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+        check=True, universal_newlines=True)
+    return result.stdout, result.stderr
+
+
+def test_heavy_modules_not_imported(tmp_path):
+    modules = _get_entry_point_modules()
+    code = 'modules = set(sys.modules)\n'
+    code += ''.join(f'import {m}\n' for m in modules)
+    code += 'print("\\n".join(sorted(set(sys.modules) - modules)))\n'
+    stdout, _ = _run(code, tmp_path)
+    imported = set(stdout.splitlines())
+    for module in HEAVY_MODULES:
+        assert module not in imported
+
+
+def test_import_time_budget(tmp_path):
+    modules = _get_entry_point_modules()
+    code = ''.join(f'import {m}\n' for m in modules)
+    durations = []
+    # the first run compiles the modules
+    for _ in range(4):
+        _, stderr = _run(code, tmp_path)
+        lines = stderr.splitlines()
+        duration = 0
+        # only count the modules which colcon doesn't import anyway
+        for line in lines[lines.index(_MARKER) + 1:]:
+            if line.startswith('import time:') and 'self [us]' not in line:
+                duration += int(line[len('import time:'):].split('|')[0])
+        durations.append(duration / 1000000)
+    assert min(durations[1:]) < IMPORT_TIME_BUDGET
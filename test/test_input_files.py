@@ -0,0 +1,74 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py.input_files import are_inputs_unchanged
+from colcon_python_setup_py.input_files import get_input_fingerprints
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _evaluate_setup_py
+
+
+def test_recorded_inputs():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath).resolve()
+        (basepath / 'README').write_text('readme')
+        (basepath / 'helper.py').write_text("VERSION = '1.0'\n")
+        (basepath / 'data').mkdir()
+        setup_py = basepath / 'setup.py'
+        setup_py.write_text(
+            'import os\n'
+            'from setuptools import setup\n'
+            'from helper import VERSION\n'
+            "with open('README') as h:\n"
+            '    long_description = h.read()\n'
+            "with open(os.path.join('data', 'generated'), 'w') as h:\n"
+            "    h.write('output')\n"
+            "os.listdir('data')\n"
+            "setup(name='pkg', version=VERSION, packages=[],\n"
+            '      long_description=long_description)\n')
+
+        _, _, inputs = _evaluate_setup_py(setup_py, env=None)
+        assert str(basepath / 'README') in inputs['files']
+        assert str(basepath / 'helper.py') in inputs['files']
+        # files written by the setup.py file aren't inputs
+        assert str(basepath / 'data' / 'generated') not in inputs['files']
+        assert str(basepath / 'data') in inputs['directories']
+
+
+def test_fingerprints():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath)
+        readme = basepath / 'README'
+        readme.write_text('readme')
+        (basepath / 'data').mkdir()
+        fingerprints = get_input_fingerprints(basepath, {
+            'files': [str(readme)],
+            'directories': [str(basepath / 'data')]})
+        assert {f['path']: f['type'] for f in fingerprints} == {
+            str(readme): 'file',
+            str(basepath / 'setup.cfg'): 'missing',
+            str(basepath / 'pyproject.toml'): 'missing',
+            str(basepath / 'data'): 'directory',
+        }
+        assert are_inputs_unchanged(fingerprints)
+
+        # a different modification time with the same content
+        stat = readme.stat()
+        os.utime(str(readme), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10))
+        assert are_inputs_unchanged(fingerprints)
+
+        readme.write_text('README')
+        assert not are_inputs_unchanged(fingerprints)
+        readme.write_text('readme')
+
+        (basepath / 'data' / 'pkg.egg-info').mkdir()
+        assert are_inputs_unchanged(fingerprints)
+        (basepath / 'data' / 'file').write_text('')
+        assert not are_inputs_unchanged(fingerprints)
+        (basepath / 'data' / 'file').unlink()
+
+        (basepath / 'pyproject.toml').write_text('')
+        assert not are_inputs_unchanged(fingerprints)
@@ -0,0 +1,50 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py import metrics
+from colcon_python_setup_py import static_setup_py
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+
+
+def test_metrics(monkeypatch):
+    monkeypatch.setenv(
+        static_setup_py.STATIC_ENVIRONMENT_VARIABLE.name, '0')
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath)
+        setup_py = basepath / 'setup.py'
+        setup_py.write_text(
+            'from setuptools import setup\n'
+            "setup(name='pkg-name')\n")
+
+        metrics.reset()
+        _setup_information_cache.clear()
+        get_setup_information(setup_py)
+        # cached results aren't measured
+        get_setup_information(setup_py)
+
+        records = metrics.get_records()
+        assert len(records) == 1
+        record = records[0]
+        assert record['setup_py'] == str(setup_py)
+        assert record['cache'] is None
+        for name in metrics.DURATION_NAMES:
+            if name != 'queue':
+                assert record[name] >= 0.0
+        assert record['total'] >= record['run_setup']
+        assert record['payload_size'] > 0
+
+        log_path = basepath / 'log'
+        log_path.mkdir()
+        monkeypatch.setattr(metrics, 'get_log_path', lambda: log_path)
+        metrics.write_report()
+        report = json.loads((log_path / metrics.REPORT_FILENAME).read_text())
+        assert report['cache'] == {'miss': 1}
+        assert report['slowest'][0]['setup_py'] == str(setup_py)
+        metrics.reset()
@@ -0,0 +1,30 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from colcon_python_setup_py.package_augmentation.python_setup_py \
+    import _map_dependencies
+from colcon_python_setup_py.package_augmentation.python_setup_py \
+    import _parse_requirement
+
+
+def test_map_dependencies():
+    _parse_requirement.cache_clear()
+    options = {
+        'install_requires': ['runA>=1.0', 'runB'],
+        'tests_require': ['runA>=1.0'],
+    }
+    mapping = {('run', 'install_requires'), ('test', 'tests_require')}
+    dependencies = {}
+    _map_dependencies(options, mapping, dependencies)
+    assert dependencies['run'] == {'runA', 'runB'}
+    run_a = next(d for d in dependencies['run'] if d == 'runA')
+    assert run_a.metadata['version_gte'] == '1.0'
+    assert _parse_requirement.cache_info().hits == 1
+
+    # the descriptors of different packages aren't shared
+    other_dependencies = {}
+    _map_dependencies(options, mapping, other_dependencies)
+    other_run_a = next(d for d in other_dependencies['run'] if d == 'runA')
+    assert other_run_a is not run_a
+    other_run_a.metadata['version_gte'] = '2.0'
+    assert run_a.metadata['version_gte'] == '1.0'
@@ -2,14 +2,35 @@
 # Copyright 2024 Open Source Robotics Foundation, Inc.
 # Licensed under the Apache License, Version 2.0
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pathlib import Path
+import subprocess
 from tempfile import TemporaryDirectory
 
 from colcon_core.package_descriptor import PackageDescriptor
+from colcon_python_setup_py import governor
+from colcon_python_setup_py import worker_pool
 from colcon_python_setup_py.package_augmentation.python_setup_py \
     import PythonPackageAugmentation
+from colcon_python_setup_py.package_identification import python_setup_py
 from colcon_python_setup_py.package_identification.python_setup_py \
     import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information_async
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information_many
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information_statistics
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import invalidate_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import PACKAGE_FIELDS
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import PREFETCH_ENVIRONMENT_VARIABLE
 from colcon_python_setup_py.package_identification.python_setup_py \
     import PythonPackageIdentification
 import pytest
@@ -94,3 +115,386 @@ def test_identify():
         dep = next(x for x in desc.dependencies['run'] if x == 'runA')
         assert dep.metadata['version_gt'] == '1.2.3'
         assert desc.dependencies['test'] == {'test2', 'test3', 'test4'}
+
+
+def test_get_setup_information_many():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath)
+        paths = []
+        for name in ('pkg-a', 'pkg-b', 'pkg-c'):
+            (basepath / name).mkdir()
+            paths.append(basepath / name / 'setup.py')
+            paths[-1].write_text(
+                'from setuptools import setup\n'
+                f"setup(name='{name}')\n")
+        (basepath / 'pkg-c' / 'setup.py').write_text(
+            "raise RuntimeError('broken')\n")
+
+        _setup_information_cache.clear()
+        results = list(get_setup_information_many(
+            paths + [str(paths[0])], max_workers=2))
+        assert len(results) == 3
+        results = {setup_py: (data, e) for setup_py, data, e in results}
+        assert results[paths[0]][0]['metadata']['name'] == 'pkg-a'
+        assert results[paths[1]][0]['metadata']['name'] == 'pkg-b'
+        assert results[paths[2]][0] is None
+        assert isinstance(results[paths[2]][1], Exception)
+
+        # the results are cached
+        assert get_setup_information(paths[0]) is results[paths[0]][0]
+
+
+def test_get_setup_information_async(monkeypatch):
+    evaluations = []
+    run_setup_py_async = python_setup_py._run_setup_py_async
+
+    async def _run_setup_py_async(setup_py, **kwargs):
+        evaluations.append(setup_py)
+        return await run_setup_py_async(setup_py, **kwargs)
+
+    monkeypatch.setattr(
+        python_setup_py, '_run_setup_py_async', _run_setup_py_async)
+
+    async def _get_concurrently(setup_py):
+        ticks = 0
+        evaluating = asyncio.ensure_future(asyncio.gather(*(
+            get_setup_information_async(setup_py) for _ in range(3))))
+        # other coroutines keep running while the file is evaluated
+        while not evaluating.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return evaluating.result(), ticks
+
+    async def _cancel_one(setup_py):
+        first = asyncio.ensure_future(get_setup_information_async(setup_py))
+        second = asyncio.ensure_future(get_setup_information_async(setup_py))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(
+            'from setuptools import setup\n'
+            "setup(name='pkg-name', version=str(1.0))\n")
+
+        _setup_information_cache.clear()
+        results, ticks = asyncio.run(_get_concurrently(setup_py))
+        assert ticks > 1
+        assert evaluations == [setup_py]
+        assert results[0]['metadata']['version'] == '1.0'
+        assert results[0] is results[1] is results[2]
+        # the synchronous getter uses the same cache
+        assert get_setup_information(setup_py) is results[0]
+
+        _setup_information_cache.clear()
+        assert asyncio.run(_cancel_one(setup_py))['metadata']['name'] == \
+            'pkg-name'
+        assert len(evaluations) == 2
+
+        desc = PackageDescriptor(basepath)
+        desc.type = 'python'
+        PythonPackageAugmentation().augment_package(desc)
+        getter = desc.metadata['get_python_setup_options_async']
+        assert asyncio.run(getter(dict(os.environ, FOO='bar'))) is \
+            get_setup_information(setup_py)
+
+        setup_py.write_text("raise RuntimeError('broken')\n")
+        _setup_information_cache.clear()
+        with pytest.raises(subprocess.CalledProcessError):
+            asyncio.run(get_setup_information_async(setup_py))
+
+
+def test_get_setup_information_async_limited(
+    monkeypatch, create_package, workers
+):
+    monkeypatch.setenv(
+        governor.MAX_EVALUATIONS_ENVIRONMENT_VARIABLE.name, '1')
+    monkeypatch.setattr(governor, '_evaluation_semaphore', None)
+    # the static files need the default information to be evaluated
+    monkeypatch.setattr(
+        python_setup_py, '_default_setup_information_cache', [])
+
+    async def _get_many(setup_pys):
+        # more concurrent requests than threads of the default executor
+        asyncio.get_event_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=2))
+        return await asyncio.wait_for(asyncio.gather(*(
+            get_setup_information_async(setup_py)
+            for setup_py in setup_pys)), 60)
+
+    setup_pys = []
+    for i in range(12):
+        # the files which need to be dry run hold the semaphore while
+        # the files which are read statically need the default
+        # information
+        version = "'1.0'" if i >= 6 else 'str(1.0)'
+        setup_pys.append(create_package(
+            'from setuptools import setup\n'
+            f"setup(name='pkg-{i}', version={version})\n", name=f'pkg_{i}'))
+    assert not python_setup_py._read_static_setup_py(setup_pys[0])
+    assert python_setup_py._read_static_setup_py(setup_pys[-1])
+
+    _setup_information_cache.clear()
+    results = asyncio.run(_get_many(setup_pys))
+    assert [data['metadata']['name'] for data in results] == [
+        f'pkg-{i}' for i in range(12)]
+    assert {data['metadata']['version'] for data in results} == {'1.0'}
+
+
+def test_evaluation_semaphore():
+    semaphore = governor.EvaluationSemaphore(1)
+
+    async def _acquire_concurrently():
+        acquired = []
+
+        async def _acquire(i):
+            await semaphore.acquire_async()
+            acquired.append(i)
+            await asyncio.sleep(0.01)
+            semaphore.release()
+
+        waiting = asyncio.ensure_future(_acquire(0))
+        semaphore.release()
+        await asyncio.gather(waiting, *(_acquire(i) for i in range(1, 4)))
+        return acquired
+
+    assert semaphore.acquire(blocking=False)
+    assert not semaphore.acquire(blocking=False)
+    assert sorted(asyncio.run(_acquire_concurrently())) == [0, 1, 2, 3]
+
+    async def _cancel_waiting():
+        await semaphore.acquire_async()
+        first = asyncio.ensure_future(semaphore.acquire_async())
+        second = asyncio.ensure_future(semaphore.acquire_async())
+        await asyncio.sleep(0.01)
+        # the wakeup of a cancelled coroutine is passed on to the next one
+        semaphore.release()
+        first.cancel()
+        await asyncio.wait_for(second, 10)
+        semaphore.release()
+
+    asyncio.run(_cancel_waiting())
+    assert semaphore.acquire(blocking=False)
+    semaphore.release()
+    with pytest.raises(ValueError):
+        semaphore.release()
+
+
+def test_prefetch(monkeypatch):
+    monkeypatch.setenv(PREFETCH_ENVIRONMENT_VARIABLE.name, '1')
+    evaluated = []
+    original_function = python_setup_py._get_uncached_setup_information
+
+    def _get_uncached_setup_information(setup_py, *, env, fields=None):
+        evaluated.append(setup_py)
+        return original_function(setup_py, env=env, fields=fields)
+
+    monkeypatch.setattr(
+        python_setup_py, '_get_uncached_setup_information',
+        _get_uncached_setup_information)
+
+    extension = PythonPackageIdentification()
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath)
+        for name in ('pkg-a', 'pkg-b', 'ignored'):
+            (basepath / name).mkdir()
+            (basepath / name / 'setup.py').write_text(
+                'from setuptools import setup\n'
+                f"setup(name='{name}')\n")
+        (basepath / 'ignored' / 'COLCON_IGNORE').write_text('')
+
+        _setup_information_cache.clear()
+        desc = PackageDescriptor(basepath)
+        assert extension.identify(desc) is None
+        assert desc.type is None
+
+        for name in ('pkg-a', 'pkg-b'):
+            desc = PackageDescriptor(basepath / name)
+            assert extension.identify(desc) is None
+            assert desc.name == name
+
+    assert sorted(evaluated) == [
+        basepath / 'pkg-a' / 'setup.py', basepath / 'pkg-b' / 'setup.py']
+
+
+def test_environment_key(monkeypatch):
+    evaluated = []
+    original_function = python_setup_py._get_uncached_setup_information
+
+    def _get_uncached_setup_information(setup_py, *, env, fields=None):
+        evaluated.append(setup_py)
+        return original_function(setup_py, env=env, fields=fields)
+
+    monkeypatch.setattr(
+        python_setup_py, '_get_uncached_setup_information',
+        _get_uncached_setup_information)
+
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(
+            'import os\n'
+            'from setuptools import setup\n'
+            "setup(name=os.environ.get('PKG_NAME', 'pkg-name'))\n")
+
+        _setup_information_cache.clear()
+        env = {'PATH': '/usr/bin', 'PKG_NAME': 'pkg-a', 'UNRELATED': '1'}
+        data = get_setup_information(setup_py, env=env)
+        assert data['metadata']['name'] == 'pkg-a'
+        assert len(evaluated) == 1
+
+        # variables which haven't been read don't affect the result
+        assert get_setup_information(
+            setup_py, env=dict(env, UNRELATED='2')) is data
+        assert len(evaluated) == 1
+
+        data = get_setup_information(setup_py, env=dict(env, PKG_NAME='b'))
+        assert data['metadata']['name'] == 'b'
+        assert len(evaluated) == 2
+
+
+def test_invalidate_setup_information():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(
+            'from setuptools import setup\n'
+            "setup(name='pkg-a')\n")
+
+        _setup_information_cache.clear()
+        data = get_setup_information(setup_py)
+        assert data['metadata']['name'] == 'pkg-a'
+        assert get_setup_information(setup_py) is data
+        statistics = get_setup_information_statistics()
+        assert statistics['hits'] == 1
+        assert statistics['size'] == 1
+
+        setup_py.write_text(
+            'from setuptools import setup\n'
+            "setup(name='pkg-b')\n")
+        assert get_setup_information(setup_py) is data
+        assert invalidate_setup_information(str(setup_py)) == 1
+        data = get_setup_information(setup_py)
+        assert data['metadata']['name'] == 'pkg-b'
+
+        assert invalidate_setup_information() == 1
+        assert get_setup_information_statistics()['size'] == 0
+
+
+def test_timeout(monkeypatch, create_package, workers):
+    monkeypatch.setenv(governor.TIMEOUT_ENVIRONMENT_VARIABLE.name, '2')
+    setup_py = create_package(
+        'import time\n'
+        'from setuptools import setup\n'
+        'time.sleep(60)\n'
+        "setup(name='pkg-name')\n")
+
+    _setup_information_cache.clear()
+    with pytest.raises(RuntimeError, match='finish within'):
+        get_setup_information(setup_py)
+    with pytest.raises(RuntimeError, match='finish within'):
+        asyncio.run(get_setup_information_async(setup_py))
+
+    # prompting for input fails immediately
+    setup_py.write_text(
+        'from setuptools import setup\n'
+        "setup(name='pkg-name', version=input('version?'))\n")
+    _setup_information_cache.clear()
+    with pytest.raises(subprocess.CalledProcessError):
+        get_setup_information(setup_py)
+
+
+def test_max_evaluations(monkeypatch):
+    monkeypatch.setenv(
+        governor.MAX_EVALUATIONS_ENVIRONMENT_VARIABLE.name, '3')
+    assert governor.get_max_evaluations() == 3
+    monkeypatch.delenv(governor.MAX_EVALUATIONS_ENVIRONMENT_VARIABLE.name)
+    assert 1 <= governor.get_max_evaluations() <= (os.cpu_count() or 1)
+
+
+def test_available_memory(tmp_path):
+    meminfo = tmp_path / 'meminfo'
+    meminfo.write_text(
+        'MemTotal:       65536000 kB\n'
+        'MemFree:          204800 kB\n'
+        'MemAvailable:   51200000 kB\n'
+        'Cached:         50000000 kB\n')
+    # the page cache which can be reclaimed is considered available
+    assert governor._get_available_memory(str(meminfo)) == \
+        51200000 * 1024
+    meminfo.write_text('MemTotal:       65536000 kB\n')
+    assert governor._get_available_memory(str(meminfo)) is None
+    assert governor._get_available_memory(str(tmp_path / 'missing')) is None
+
+
+def test_fields(monkeypatch, create_package, workers):
+    setup_py = create_package(
+        'from setuptools import setup\n'
+        "name = 'pkg-name'\n"
+        'setup(name=name, version=str(1.0), packages=[name],\n'
+        "      install_requires=['runA'])\n")
+    # the file is dry run instead of being read statically
+    assert python_setup_py._get_static_setup_information(
+        setup_py, env=os.environ) is None
+
+    evaluations = []
+    evaluate_setup_py = python_setup_py._evaluate_setup_py
+
+    def _evaluate_setup_py(*args, **kwargs):
+        result = evaluate_setup_py(*args, **kwargs)
+        evaluations.append(result[0])
+        return result
+
+    monkeypatch.setattr(
+        python_setup_py, '_evaluate_setup_py', _evaluate_setup_py)
+    _setup_information_cache.clear()
+    fields = ('metadata.name', 'install_requires')
+    data = get_setup_information(setup_py, fields=fields)
+    assert data == {
+        'metadata': {'name': 'pkg-name'}, 'install_requires': ['runA']}
+    # the interpreter only returned the requested fields
+    assert evaluations == [data]
+    if workers:
+        assert worker_pool.get_worker_pool()._idle_workers
+    with pytest.raises(TypeError):
+        data['metadata']['name'] = 'other'
+
+    data = get_setup_information(setup_py)
+    assert data['packages'] == ['pkg-name']
+    assert get_setup_information(setup_py, fields=fields) == {
+        'metadata': {'name': 'pkg-name'}, 'install_requires': ['runA']}
+
+
+def test_package_fields(monkeypatch):
+    evaluated = []
+    original_function = python_setup_py._get_uncached_setup_information
+
+    def _get_uncached_setup_information(setup_py, *, env, fields=None):
+        evaluated.append(fields)
+        return original_function(setup_py, env=env, fields=fields)
+
+    monkeypatch.setattr(
+        python_setup_py, '_get_uncached_setup_information',
+        _get_uncached_setup_information)
+
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        (Path(basepath) / 'setup.py').write_text(
+            'from setuptools import setup\n'
+            "name = 'pkg-name'\n"
+            'setup(name=name, version=str(1.0), packages=[name],\n'
+            "      install_requires=['runA'])\n")
+
+        _setup_information_cache.clear()
+        desc = PackageDescriptor(basepath)
+        PythonPackageIdentification().identify(desc)
+        PythonPackageAugmentation().augment_package(desc)
+        assert desc.name == 'pkg-name'
+        assert desc.metadata['version'] == '1.0'
+        assert {d.name for d in desc.dependencies['run']} == {'runA'}
+        # the identification and the augmentation share one evaluation of
+        # the fields they use
+        assert evaluated == [frozenset(PACKAGE_FIELDS)]
+
+        # the getter provides all options
+        options = desc.metadata['get_python_setup_options'](os.environ)
+        assert options['packages'] == ['pkg-name']
+        assert evaluated == [frozenset(PACKAGE_FIELDS), None]
@@ -0,0 +1,206 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from concurrent.futures import wait
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py import persistent_cache
+from colcon_python_setup_py import static_setup_py
+from colcon_python_setup_py.package_identification import python_setup_py
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+
+
+def test_store_and_load():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        basepath = Path(basepath)
+        cache_path = basepath / 'cache'
+        setup_py = basepath / 'setup.py'
+        setup_py.write_text('setup()\n')
+
+        key = persistent_cache.compute_key(setup_py)
+        assert key == persistent_cache.compute_key(setup_py)
+        assert persistent_cache.load(cache_path, key, {}) is None
+
+        data = {'metadata': {'name': 'pkg-name'}, 'data_files': [('a', [])]}
+        persistent_cache.store(
+            cache_path, key, setup_py, {'FOO': 'foo', 'BAR': 'bar'}, data,
+            ('FOO', ))
+        assert persistent_cache.load(
+            cache_path, key, {'FOO': 'foo', 'BAR': 'other'}) == \
+            (data, ('FOO', ))
+        assert persistent_cache.load(cache_path, key, {'FOO': 'bar'}) is None
+        # variables affecting the interpreter are always relevant
+        assert persistent_cache.load(
+            cache_path, key, {'FOO': 'foo', 'PYTHONPATH': '/'}) is None
+
+        other_data = {'metadata': {'name': 'other-name'}}
+        persistent_cache.store(
+            cache_path, key, setup_py, {'FOO': 'bar'}, other_data, None)
+        assert persistent_cache.load(cache_path, key, {'FOO': 'bar'}) == \
+            (other_data, None)
+        assert persistent_cache.load(
+            cache_path, key, {'FOO': 'bar', 'BAR': 'bar'}) is None
+        assert persistent_cache.load(cache_path, key, {'FOO': 'foo'})[0] == \
+            data
+
+        # values which can't be represented as literals are kept as well
+        special_data = {
+            'metadata': {'name': 'pkg-name'}, 'packages': set(),
+            'provides': frozenset({'a'}), 'version': float('inf'),
+            'options': {1: b'\xff'}}
+        persistent_cache.store(
+            cache_path, key, setup_py, {'FOO': 'baz'}, special_data, ('FOO', ))
+        assert persistent_cache.load(cache_path, key, {'FOO': 'baz'}) == \
+            (special_data, ('FOO', ))
+        special_data['version'] = float('nan')
+        persistent_cache.store(
+            cache_path, key, setup_py, {'FOO': 'baz'}, special_data, ('FOO', ))
+        loaded_data, _ = persistent_cache.load(cache_path, key, {'FOO': 'baz'})
+        assert loaded_data['version'] != loaded_data['version']
+
+        setup_py.write_text('setup(name="other")\n')
+        assert persistent_cache.compute_key(setup_py) != key
+
+        entries = persistent_cache.get_entries(cache_path)
+        assert [entry['key'] for entry in entries] == [key]
+        assert persistent_cache.get_entry_setup_py(entries[0]['path']) == \
+            str(setup_py.resolve())
+
+        # corrupted entries are ignored
+        entries[0]['path'].write_text('{')
+        assert persistent_cache.load(cache_path, key, {'FOO': 'foo'}) is None
+
+        assert persistent_cache.clear(cache_path) == 1
+        assert not persistent_cache.get_entries(cache_path)
+
+
+def test_eviction(monkeypatch, tmp_path, create_package):
+    monkeypatch.setenv(
+        persistent_cache.CACHE_SIZE_ENVIRONMENT_VARIABLE.name, '0.001')
+    cache_path = tmp_path / 'cache'
+    for i in range(10):
+        setup_py = create_package(f'setup(name="pkg{i}")\n', name=f'pkg{i}')
+        key = persistent_cache.compute_key(setup_py)
+        persistent_cache.store(
+            cache_path, key, setup_py, {}, {'payload': 'x' * 200}, ())
+    entries = persistent_cache.get_entries(cache_path)
+    assert 0 < len(entries) < 10
+    assert sum(entry['size'] for entry in entries) <= 1048
+    # the most recently stored entry is kept
+    assert entries[-1]['key'] == key
+    # the references to the evicted entries are removed with them
+    latest_keys = {
+        path.read_text() for path in cache_path.glob('*.latest')}
+    assert latest_keys == {entry['key'] for entry in entries}
+
+
+def test_get_setup_information(monkeypatch, tmp_path, create_package):
+    # the persistent cache is only used when dry running setup.py files
+    monkeypatch.setenv(
+        static_setup_py.STATIC_ENVIRONMENT_VARIABLE.name, '0')
+    cache_path = tmp_path / 'cache'
+    monkeypatch.setenv(
+        persistent_cache.CACHE_ENVIRONMENT_VARIABLE.name, str(cache_path))
+    setup_py = create_package(
+        'from setuptools import setup\n'
+        "with open('version.txt') as h:\n"
+        '    version = h.read().strip()\n'
+        "setup(name='pkg-name', version=version)\n")
+    version_txt = setup_py.parent / 'version.txt'
+    version_txt.write_text('1.0\n')
+
+    _setup_information_cache.clear()
+    data = get_setup_information(setup_py)
+    assert data['metadata']['name'] == 'pkg-name'
+    assert len(persistent_cache.get_entries(cache_path)) == 1
+
+    evaluated = []
+    original_function = python_setup_py._evaluate_setup_py
+
+    def _evaluate_setup_py(setup_py, *, env, fields=None):
+        evaluated.append(setup_py)
+        return original_function(setup_py, env=env, fields=fields)
+
+    monkeypatch.setattr(
+        python_setup_py, '_evaluate_setup_py', _evaluate_setup_py)
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py) == data
+    assert not evaluated, 'The persistent cache should have been used'
+
+    # touching an input file without changing it keeps the entry valid
+    version_txt.write_text('1.0\n')
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py) == data
+    assert not evaluated
+
+    # changing an input file invalidates the entry
+    version_txt.write_text('2.0\n')
+    _setup_information_cache.clear()
+    data = get_setup_information(setup_py)
+    assert data['metadata']['version'] == '2.0'
+    assert len(evaluated) == 1
+
+    # creating a file considered by setuptools invalidates the entry
+    (setup_py.parent / 'setup.cfg').write_text(
+        '[metadata]\ndescription = desc\n')
+    _setup_information_cache.clear()
+    data = get_setup_information(setup_py)
+    assert data['metadata']['description'] == 'desc'
+    assert len(evaluated) == 2
+
+    assert persistent_cache.main(
+        ['--cache-path', str(cache_path), 'clear']) == 0
+    assert not persistent_cache.get_entries(cache_path)
+
+
+def test_stale(monkeypatch, tmp_path, create_package):
+    monkeypatch.setenv(
+        static_setup_py.STATIC_ENVIRONMENT_VARIABLE.name, '0')
+    monkeypatch.setenv(persistent_cache.STALE_ENVIRONMENT_VARIABLE.name, '1')
+    cache_path = tmp_path / 'cache'
+    monkeypatch.setenv(
+        persistent_cache.CACHE_ENVIRONMENT_VARIABLE.name, str(cache_path))
+    setup_py = create_package(
+        'from setuptools import setup\n'
+        "setup(name='pkg-name', version='1.0')\n")
+
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '1.0'
+
+    # the outdated result is returned while re-evaluating the file
+    setup_py.write_text(
+        'from setuptools import setup\n'
+        "setup(name='pkg-name', version='2.0')\n")
+    assert persistent_cache.load(
+        cache_path, persistent_cache.compute_key(setup_py),
+        os.environ) is None
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '1.0'
+    wait(list(python_setup_py._background_futures))
+    assert get_setup_information(setup_py)['metadata']['version'] == '2.0'
+
+    # the fresh result has been stored persistently
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '2.0'
+    assert persistent_cache.load_latest(cache_path, setup_py, os.environ)
+
+    # the outdated result doesn't replace the fresh one if the refresh
+    # finishes first
+    monkeypatch.setattr(
+        python_setup_py, '_submit_background_task',
+        lambda function, *args: function(*args))
+    setup_py.write_text(
+        'from setuptools import setup\n'
+        "setup(name='pkg-name', version='3.0')\n")
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '2.0'
+    assert get_setup_information(setup_py)['metadata']['version'] == '3.0'
+
+    persistent_cache.clear(cache_path, setup_py=setup_py)
+    assert persistent_cache.load_latest(
+        cache_path, setup_py, os.environ) is None
@@ -0,0 +1,59 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from pathlib import Path
+import pstats
+
+from colcon_python_setup_py import profiling
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+
+
+def test_get_profile_threshold(monkeypatch):
+    monkeypatch.delenv(
+        profiling.PROFILE_ENVIRONMENT_VARIABLE.name, raising=False)
+    assert profiling.get_profile_threshold() is None
+    monkeypatch.setenv(profiling.PROFILE_ENVIRONMENT_VARIABLE.name, '2.5')
+    assert profiling.get_profile_threshold() == 2.5
+    monkeypatch.setenv(profiling.PROFILE_ENVIRONMENT_VARIABLE.name, 'slow')
+    assert profiling.get_profile_threshold() is None
+
+
+def test_profile(monkeypatch, tmp_path, create_package, workers):
+    profile_path = tmp_path / 'profiles'
+    monkeypatch.setattr(
+        profiling, 'get_profile_directory', lambda: profile_path)
+    setup_py = create_package(
+        'import time\n'
+        'from setuptools import setup\n'
+        'def compute_version():\n'
+        '    time.sleep(0.1)\n'
+        "    return '1.0'\n"
+        "setup(name='pkg-name', version=compute_version())\n")
+
+    # evaluations faster than the threshold aren't written
+    monkeypatch.setenv(profiling.PROFILE_ENVIRONMENT_VARIABLE.name, '60')
+    _setup_information_cache.clear()
+    get_setup_information(setup_py)
+    assert not list(profile_path.iterdir())
+
+    monkeypatch.setenv(profiling.PROFILE_ENVIRONMENT_VARIABLE.name, '0')
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '1.0'
+    profiles = list(profile_path.iterdir())
+    assert len(profiles) == 1
+    assert profiles[0].name.startswith('pkg-')
+    assert profiles[0].suffix == '.prof'
+    functions = {
+        function for _, _, function in pstats.Stats(
+            str(profiles[0])).stats.keys()}
+    assert 'compute_version' in functions
+    profiling.log_profile(setup_py, str(profiles[0]))
+
+
+def test_no_log_directory(monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_ENVIRONMENT_VARIABLE.name, '0')
+    monkeypatch.setattr(profiling, 'get_profile_directory', lambda: None)
+    assert profiling.get_profile_request(Path('pkg/setup.py')) is None
@@ -0,0 +1,113 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import copy
+from pathlib import Path
+import pickle
+
+from colcon_python_setup_py.environment_key import get_startup_environment
+from colcon_python_setup_py.setup_information_cache import freeze
+from colcon_python_setup_py.setup_information_cache \
+    import SetupInformationCache
+import pytest
+
+
+def _get(cache, setup_py, env, fields=None):
+    return cache.get(
+        setup_py, env, startup_environment=get_startup_environment(env),
+        fields=fields)
+
+
+def test_setup_information_cache():
+    cache = SetupInformationCache(max_size=3)
+    env = {'FOO': 'foo', 'BAR': 'bar'}
+    assert _get(cache, 'a/setup.py', env) is None
+
+    data_a = cache.put(
+        Path('a/setup.py'), env, ('FOO', ), {'metadata': {'name': 'a'}})
+    assert data_a == {'metadata': {'name': 'a'}}
+    assert _get(cache, 'a/setup.py', dict(env, BAR='other')) is data_a
+    assert _get(cache, 'a/setup.py', dict(env, FOO='other')) is None
+
+    data_a2 = {'metadata': {'name': 'a2'}}
+    cache.put('a/setup.py', dict(env, FOO='other'), ('FOO', ), data_a2)
+    data_b = cache.put('b/setup.py', env, None, {'metadata': {'name': 'b'}})
+    assert _get(cache, 'b/setup.py', env) is data_b
+    assert _get(cache, 'b/setup.py', dict(env, BAR='other')) is None
+    assert len(cache) == 3
+
+    # the parts of equal environment keys are shared
+    keys = [
+        key for results in cache._entries.values() for key, _, _ in results]
+    assert keys[0][0] is keys[2][0]
+
+    # the least recently used file is evicted
+    cache.put('c/setup.py', env, (), {'metadata': {'name': 'c'}})
+    assert _get(cache, 'a/setup.py', env) is None
+    assert _get(cache, 'b/setup.py', env) is data_b
+    assert len(cache) == 2
+
+    assert cache.get_statistics() == {
+        'hits': 3, 'misses': 4, 'evictions': 2, 'size': 2, 'max_size': 3}
+
+    assert cache.invalidate(Path('b/setup.py')) == 1
+    assert _get(cache, 'b/setup.py', env) is None
+    assert cache.invalidate('b/setup.py') == 0
+
+    cache.clear()
+    assert len(cache) == 0
+    assert not cache._interned
+    assert cache.get_statistics()['hits'] == 0
+
+
+def test_fields():
+    cache = SetupInformationCache()
+    env = {}
+    data = {'metadata': {'name': 'a', 'version': '1.0'}, 'packages': ['a']}
+    name_only = cache.put(
+        'a/setup.py', env, (), {'metadata': {'name': 'a'}},
+        fields=frozenset(['metadata.name']))
+    assert _get(cache, 'a/setup.py', env, frozenset(['metadata.name'])) is \
+        name_only
+    # a result with fewer fields doesn't satisfy other requests
+    assert _get(cache, 'a/setup.py', env) is None
+    assert _get(cache, 'a/setup.py', env, frozenset(['packages'])) is None
+
+    # a complete result replaces the partial result
+    full = cache.put('a/setup.py', env, (), data)
+    assert len(cache) == 1
+    assert _get(cache, 'a/setup.py', env) is full
+    projection = _get(
+        cache, 'a/setup.py', env, frozenset(['metadata.version', 'packages']))
+    assert projection == {'metadata': {'version': '1.0'}, 'packages': ['a']}
+    # the values are shared with the complete result
+    assert projection['packages'] is full['packages']
+
+
+def test_freeze():
+    data = freeze({
+        'metadata': {'name': 'pkg'},
+        'data_files': [('share', ['package.xml'])],
+        'extras_require': {'test': ['pytest']},
+        'set': {'a'},
+    })
+    assert isinstance(data, dict)
+    assert isinstance(data['data_files'], list)
+    assert isinstance(data['data_files'][0], tuple)
+    assert isinstance(data['set'], frozenset)
+    with pytest.raises(TypeError):
+        data['metadata']['name'] = 'other'
+    with pytest.raises(TypeError):
+        data['extras_require']['test'].append('other')
+    with pytest.raises(TypeError):
+        data.update({})
+
+    # copies are mutable
+    copied = dict(data)
+    copied['name'] = 'other'
+    assert copy.deepcopy(data) == data
+    assert pickle.loads(pickle.dumps(data)) == data
+
+    # short strings are shared between results
+    other = freeze({'metadata': {'name': ''.join(['p', 'k', 'g'])}})
+    assert other['metadata']['name'] is data['metadata']['name']
@@ -0,0 +1,181 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _get_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _get_static_setup_information
+from colcon_python_setup_py.shim_setup_py \
+    import get_declarative_configuration
+from colcon_python_setup_py.shim_setup_py \
+    import has_pyproject_configuration
+import pytest
+
+SHIM_SETUP_PY = """\
+from setuptools import setup
+
+setup()
+"""
+
+SETUP_CFG = """\
+[metadata]
+name = pkg-name
+version = attr: pkg.__version__
+home_page = http://example.com
+description = file: DESCRIPTION
+long_description = file: README.rst, CHANGES.rst
+keywords = colcon, python
+classifiers =
+    Programming Language :: Python
+project_urls =
+    GitHub = http://example.com/pkg
+license = Apache License, Version 2.0
+
+[options]
+install_requires =
+  setuptools
+  runA>1.2.3
+packages = find:
+zip_safe = true
+python_requires = >=3.6
+
+[options.packages.find]
+exclude =
+    test
+
+[options.extras_require]
+test =
+  pytest
+
+[options.package_data]
+* = *.txt
+
+[options.data_files]
+share/pkg_name = package.xml
+
+[options.entry_points]
+console_scripts = cmd = pkg.module:main
+
+[flake8]
+max-line-length = 99
+"""
+
+
+def _create_package(path, setup_cfg=SETUP_CFG):
+    (path / 'setup.py').write_text(SHIM_SETUP_PY)
+    (path / 'setup.cfg').write_text(setup_cfg)
+    (path / 'DESCRIPTION').write_text('The description.\n')
+    (path / 'README.rst').write_text('The readme.\n')
+    (path / 'CHANGES.rst').write_text('The changes.\n')
+    for package in ('pkg', 'pkg/sub', 'test'):
+        (path / package).mkdir()
+        (path / package / '__init__.py').write_text('')
+    (path / 'pkg' / '__init__.py').write_text(
+        '"""The package."""\n'
+        "__version__ = '1.2.3'\n")
+
+
+@pytest.mark.parametrize('setup_cfg', [
+    SETUP_CFG,
+    # packages are optional without an attribute directive
+    '[metadata]\nname = pkg-name\nversion = file: VERSION\n',
+    '[metadata]\nname = pkg-name\n\n'
+    '[options]\npy_modules = module\n\n'
+    '[options.exclude_package_data]\npkg = *.c, *.h\n',
+])
+def test_shim_setup_py(setup_cfg):
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        path = Path(basepath)
+        _create_package(path, setup_cfg)
+        (path / 'VERSION').write_text('2.0\n')
+
+        env = dict(os.environ)
+        result = _get_static_setup_information(path / 'setup.py', env=env)
+        assert result is not None
+        assert result[0] == _get_setup_information(path / 'setup.py', env=env)
+
+
+def test_declarative_configuration():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        path = Path(basepath)
+        _create_package(path)
+        arguments, command_options = get_declarative_configuration(path)
+        assert arguments['version'] == '1.2.3'
+        assert arguments['url'] == 'http://example.com'
+        assert arguments['long_description'] == \
+            'The readme.\n\nThe changes.\n'
+        assert sorted(arguments['packages']) == ['pkg', 'pkg.sub']
+        assert arguments['package_data'] == {'': ['*.txt']}
+        assert arguments['entry_points'] == {
+            'console_scripts': ['cmd = pkg.module:main']}
+        assert command_options['flake8'] == {
+            'max_line_length': ('setup.cfg', '99')}
+
+
+@pytest.mark.parametrize('setup_cfg', [
+    # the attribute isn't a literal
+    '[metadata]\nversion = attr: pkg.VERSION\n\n[options]\npackages = pkg\n',
+    # the packages would be discovered by setuptools
+    '[metadata]\nversion = attr: pkg.__version__\n',
+    # files outside of the package
+    '[metadata]\nlong_description = file: ../README.rst\n',
+    # missing files
+    '[metadata]\nlong_description = file: MISSING.rst\n',
+    # unsupported options
+    '[options]\ncmdclass =\n    build = pkg.build:Build\n',
+    '[options]\npackages = find_namespace:\n',
+    '[options.packages.find]\nwhere = src\n\n[options]\npackages = find:\n',
+    # options whose handling differs between setuptools versions
+    '[metadata]\nhome-page = http://example.com\n',
+    '[options]\ninstall_requires = runA # comment\n',
+    '[options.data_files]\nshare/pkg = *.xml\n',
+    '[global]\nverbose = 0\n',
+    '[DEFAULT]\nname = pkg\n',
+    '[metadata]\nname = pkg-%(name)s\n',
+])
+def test_unsupported_configuration(setup_cfg):
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        path = Path(basepath) / 'pkg-name'
+        path.mkdir()
+        _create_package(path, setup_cfg)
+        (path / 'pkg' / '__init__.py').write_text(
+            "VERSION = '.'.join(['1', '2'])\n"
+            "__version__ = '1.2.3'\n")
+        (Path(basepath) / 'README.rst').write_text('')
+        assert get_declarative_configuration(path) is None
+
+
+def test_setup_arguments_and_configuration():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        path = Path(basepath)
+        _create_package(path)
+        # the arguments would be merged with the declarative configuration
+        (path / 'setup.py').write_text(
+            'from setuptools import setup\n'
+            "setup(name='other-name')\n")
+        assert _get_static_setup_information(
+            path / 'setup.py', env=dict(os.environ)) is None
+
+
+def test_pyproject_configuration():
+    pytest.importorskip('tomllib')
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        path = Path(basepath)
+        assert not has_pyproject_configuration(path)
+        pyproject_toml = path / 'pyproject.toml'
+        pyproject_toml.write_text(
+            '[build-system]\n'
+            "requires = ['setuptools']\n")
+        assert not has_pyproject_configuration(path)
+        pyproject_toml.write_text(
+            '[project]\n'
+            "name = 'pkg-name'\n")
+        assert has_pyproject_configuration(path)
+        pyproject_toml.write_text('[tool.setuptools]\n')
+        assert has_pyproject_configuration(path)
+        pyproject_toml.write_text('[')
+        assert has_pyproject_configuration(path)
@@ -0,0 +1,148 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+
+from colcon_python_setup_py.package_identification import python_setup_py
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _get_default_setup_information
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _get_setup_information
+from colcon_python_setup_py.static_setup_py \
+    import create_setup_information
+from colcon_python_setup_py.static_setup_py \
+    import get_static_setup_arguments
+import pytest
+
+LITERAL_SETUP_PY = """\
+'''The docstring.'''
+import os
+from setuptools import setup
+
+package_name = 'pkg-name'
+common = {
+    'zip_safe': True,
+}
+
+if __name__ == '__main__':
+    setup(
+        name=package_name,
+        version='1.2.3',
+        packages=[package_name],
+        data_files=[
+            ('share/' + package_name, ['package.xml']),
+        ],
+        install_requires=['setuptools', 'runA>1.2.3'],
+        extras_require={
+            'test': ['pytest'],
+        },
+        python_requires='>=3.6',
+        maintainer='Foo Bar',
+        maintainer_email='foobar@example.com',
+        classifiers=['Programming Language :: Python'],
+        entry_points={
+            'console_scripts': ['cmd = pkg.module:main'],
+        },
+        **common
+    )
+"""
+
+
+def test_literal_setup_py():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(LITERAL_SETUP_PY)
+
+        arguments = get_static_setup_arguments(setup_py)
+        assert arguments['name'] == 'pkg-name'
+        assert arguments['data_files'] == [
+            ('share/pkg-name', ['package.xml'])]
+        assert arguments['zip_safe'] is True
+
+        env = dict(os.environ)
+        default_data, _ = _get_default_setup_information(env)
+        data = create_setup_information(arguments, default_data)
+        assert data is not None
+        assert data == _get_setup_information(setup_py, env=env)
+
+
+def test_default_setup_information(monkeypatch):
+    monkeypatch.setattr(
+        python_setup_py, '_default_setup_information_cache', [])
+    evaluations = []
+    evaluating = Event()
+    proceed = Event()
+    evaluate_setup_py = python_setup_py._evaluate_setup_py
+
+    def _evaluate_setup_py(setup_py, **kwargs):
+        evaluations.append(setup_py)
+        evaluating.set()
+        assert proceed.wait(60)
+        return evaluate_setup_py(setup_py, **kwargs)
+
+    monkeypatch.setattr(
+        python_setup_py, '_evaluate_setup_py', _evaluate_setup_py)
+
+    env = dict(os.environ)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(_get_default_setup_information, env)
+            for _ in range(3)]
+        assert evaluating.wait(60)
+        # the lock isn't held while evaluating
+        assert python_setup_py._default_setup_information_lock.acquire(
+            blocking=False)
+        python_setup_py._default_setup_information_lock.release()
+        proceed.set()
+        results = [future.result() for future in futures]
+
+    # concurrent requests in the same environment wait for one evaluation
+    assert len(evaluations) == 1
+    assert results[0] is results[1] is results[2]
+    assert _get_default_setup_information(env) is results[0]
+    assert not python_setup_py._pending_default_setup_information
+
+
+@pytest.mark.parametrize('content', [
+    # not a literal
+    "setup(name='pkg'.upper())",
+    # unknown name
+    'setup(name=NAME)',
+    # other imports might have side effects
+    'import pkg\nsetup()',
+    # statements other than assignments
+    "for i in range(2):\n    pass\nsetup(name='pkg')",
+    # positional arguments
+    "setup('pkg')",
+    # multiple calls
+    "setup(name='pkg')\nsetup(name='pkg')",
+    # other functions
+    "from setuptools import find_packages\nsetup(name='pkg')",
+])
+def test_unsupported_setup_py(content):
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        setup_py = Path(basepath) / 'setup.py'
+        setup_py.write_text(f'from setuptools import setup\n{content}\n')
+        assert get_static_setup_arguments(setup_py) is None
+
+
+@pytest.mark.parametrize('arguments', [
+    # arguments which are being normalized by setuptools
+    {'install_requires': ['runA > 1.2.3']},
+    {'install_requires': ['runA; sys_platform == "win32"']},
+    {'extras_require': {':sys_platform == "win32"': ['runA']}},
+    {'version': '1.0-dev'},
+    # arguments handled by setuptools extensions
+    {'use_scm_version': True},
+])
+def test_unsupported_arguments(arguments):
+    default_data = {'metadata': {'name': None, 'version': None}}
+    for name in (
+        'install_requires', 'extras_require', 'use_scm_version'
+    ):
+        default_data[name] = None
+    assert create_setup_information(arguments, default_data) is None
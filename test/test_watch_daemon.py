@@ -0,0 +1,160 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+import socket
+import subprocess
+from threading import current_thread
+from threading import main_thread
+from threading import Thread
+import time
+
+from colcon_python_setup_py import persistent_cache
+from colcon_python_setup_py import watch_daemon
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+import pytest
+
+
+@pytest.fixture
+def daemon(monkeypatch, tmp_path):
+    try:
+        watcher = watch_daemon.Inotify()
+    except OSError as e:
+        pytest.skip(f'inotify is not available: {e}')
+    daemon = watch_daemon.WatchDaemon(watcher)
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = watch_daemon.create_server(daemon, socket_path)
+    Thread(target=server.serve_forever, daemon=True).start()
+    watch_thread = Thread(target=daemon.watch_forever, daemon=True)
+    watch_thread.start()
+    monkeypatch.setenv(
+        watch_daemon.DAEMON_ENVIRONMENT_VARIABLE.name, socket_path)
+    monkeypatch.setattr(watch_daemon, '_unavailable_socket_path', None)
+    yield daemon
+    server.shutdown()
+    server.server_close()
+    watcher.close()
+    # the thread waiting for events stops
+    watch_thread.join(timeout=10)
+    assert not watch_thread.is_alive()
+
+
+def test_close():
+    try:
+        watcher = watch_daemon.Inotify()
+    except OSError as e:
+        pytest.skip(f'inotify is not available: {e}')
+    errors = []
+
+    def _read_events():
+        try:
+            watcher.read_events()
+        except OSError as e:
+            errors.append(e)
+
+    thread = Thread(target=_read_events)
+    thread.start()
+    time.sleep(0.1)
+    watcher.close()
+    # the file descriptors are closed after the waiting thread stopped
+    # using them
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    with pytest.raises(OSError):
+        os.fstat(watcher.fd)
+    with pytest.raises(OSError):
+        watcher.read_events()
+    assert not watcher.add_watch(os.getcwd())
+    watcher.close()
+
+
+def _wait_for_invalidation(daemon, count):
+    deadline = time.monotonic() + 10
+    while daemon.get_statistics()['invalidations'] < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_watch_daemon(daemon, create_package):
+    setup_py = create_package(
+        'from setuptools import setup\n'
+        "version = open('VERSION').read().strip()\n"
+        "setup(name='pkg-name', version=version)\n")
+    (setup_py.parent / 'VERSION').write_text('1.0\n')
+    (setup_py.parent / 'README.rst').write_text('')
+
+    for _ in range(2):
+        _setup_information_cache.clear()
+        data = get_setup_information(setup_py)
+        assert data['metadata']['version'] == '1.0'
+    statistics = daemon.get_statistics()
+    assert statistics['evaluations'] == 1
+    assert statistics['hits'] == 1
+
+    # files which haven't been read don't invalidate the result
+    (setup_py.parent / 'README.rst').write_text('changed')
+    (setup_py.parent / 'VERSION').write_text('2.0\n')
+    _wait_for_invalidation(daemon, 1)
+    assert daemon.get_statistics()['invalidations'] == 1
+
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['version'] == '2.0'
+    assert daemon.get_statistics()['evaluations'] == 2
+
+    # errors are reported by the local evaluation
+    setup_py.write_text("raise RuntimeError('broken')\n")
+    _wait_for_invalidation(daemon, 2)
+    _setup_information_cache.clear()
+    with pytest.raises(subprocess.CalledProcessError):
+        get_setup_information(setup_py)
+
+
+def test_no_daemon(monkeypatch, tmp_path, create_package):
+    monkeypatch.setenv(
+        watch_daemon.DAEMON_ENVIRONMENT_VARIABLE.name,
+        str(tmp_path / 'missing.sock'))
+    monkeypatch.setattr(watch_daemon, '_unavailable_socket_path', None)
+    setup_py = create_package(
+        'import os\n'
+        'from setuptools import setup\n'
+        "setup(name=os.path.basename('pkg-name'))\n")
+    _setup_information_cache.clear()
+    assert get_setup_information(setup_py)['metadata']['name'] == 'pkg-name'
+    assert watch_daemon._unavailable_socket_path == \
+        os.environ[watch_daemon.DAEMON_ENVIRONMENT_VARIABLE.name]
+
+
+def test_different_interpreter(daemon, monkeypatch, create_package):
+    fingerprint = persistent_cache.get_interpreter_fingerprint()
+    # the daemon answers requests in other threads
+    monkeypatch.setattr(
+        persistent_cache, 'get_interpreter_fingerprint',
+        lambda: fingerprint if current_thread() is not main_thread()
+        else fingerprint + ('other', ))
+    setup_py = create_package(
+        'import os\n'
+        'from setuptools import setup\n'
+        "setup(name=os.path.basename('pkg-name'))\n")
+    assert watch_daemon.query(setup_py, os.environ) is None
+    assert daemon.get_statistics()['evaluations'] == 0
+    assert watch_daemon._unavailable_socket_path == \
+        os.environ[watch_daemon.DAEMON_ENVIRONMENT_VARIABLE.name]
+
+
+def test_unresponsive_daemon(monkeypatch, tmp_path, create_package):
+    socket_path = str(tmp_path / 'daemon.sock')
+    monkeypatch.setenv(
+        watch_daemon.DAEMON_ENVIRONMENT_VARIABLE.name, socket_path)
+    monkeypatch.setattr(watch_daemon, '_unavailable_socket_path', None)
+    monkeypatch.setattr(watch_daemon, '_RESPONSE_TIMEOUT', 0.1)
+    setup_py = create_package('')
+    # the connection is accepted but never answered
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+        sock.listen()
+        assert watch_daemon.query(setup_py, os.environ) is None
+    assert watch_daemon._unavailable_socket_path == socket_path
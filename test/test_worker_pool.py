@@ -0,0 +1,114 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+import subprocess
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py.worker_pool import WorkerPool
+import pytest
+
+
+def _create_package(basepath, name, content=''):
+    path = Path(basepath) / name
+    path.mkdir()
+    (path / 'setup.py').write_text(
+        'from setuptools import setup\n'
+        f'{content}\n'
+        f'setup(name={name!r})\n')
+    return path / 'setup.py'
+
+
+def test_worker_pool():
+    pool = WorkerPool(1, max_jobs=3)
+    env = dict(os.environ)
+    try:
+        with TemporaryDirectory(prefix='test_colcon_') as basepath:
+            setup_py_a = _create_package(
+                basepath, 'pkg-a', "print('output of pkg-a')")
+            setup_py_b = _create_package(
+                basepath, 'pkg-b',
+                'import os\n'
+                "assert os.environ['PKG_VALUE'] == 'b'")
+            setup_py_c = _create_package(
+                basepath, 'pkg-c', "raise RuntimeError('broken')")
+
+            data, _, _ = pool.evaluate(setup_py_a, env=env)
+            assert data['metadata']['name'] == 'pkg-a'
+            worker = pool._idle_workers[0]
+
+            data, environment_names, _ = pool.evaluate(
+                setup_py_b, env=dict(env, PKG_VALUE='b'))
+            assert data['metadata']['name'] == 'pkg-b'
+            assert 'PKG_VALUE' in environment_names
+            assert pool._idle_workers == [worker]
+
+            # the environment of a previous request doesn't leak
+            with pytest.raises(subprocess.CalledProcessError) as e:
+                pool.evaluate(setup_py_b, env=env)
+            assert "KeyError: 'PKG_VALUE'" in e.value.stderr
+            # the worker is replaced after the maximum number of jobs
+            assert not pool._idle_workers
+            assert pool._worker_count == 0
+
+            with pytest.raises(subprocess.CalledProcessError) as e:
+                pool.evaluate(setup_py_c, env=env)
+            assert 'broken' in e.value.stderr
+    finally:
+        pool.shutdown()
+
+
+def test_worker_recycled_after_modified_state():
+    pool = WorkerPool(1)
+    env = dict(os.environ)
+    try:
+        with TemporaryDirectory(prefix='test_colcon_') as basepath:
+            setup_py = _create_package(
+                basepath, 'pkg-a',
+                'import setuptools\n'
+                'setuptools.find_packages = None')
+            data, _, _ = pool.evaluate(setup_py, env=env)
+            assert data['metadata']['name'] == 'pkg-a'
+            assert not pool._idle_workers
+
+            setup_py = _create_package(basepath, 'pkg-b')
+            data, _, _ = pool.evaluate(setup_py, env=env)
+            assert data['metadata']['name'] == 'pkg-b'
+            assert len(pool._idle_workers) == 1
+    finally:
+        pool.shutdown()
+
+
+def test_output_captured(capfd):
+    pool = WorkerPool(1)
+    env = dict(os.environ)
+    try:
+        with TemporaryDirectory(prefix='test_colcon_') as basepath:
+            setup_py = _create_package(
+                basepath, 'pkg-a',
+                'import sys\n'
+                "print('output of pkg-a')\n"
+                "print('error of pkg-a', file=sys.stderr)")
+            data, _, _ = pool.evaluate(setup_py, env=env)
+            assert data['metadata']['name'] == 'pkg-a'
+            response = pool._idle_workers[0].evaluate(
+                str(setup_py.parent), env)
+            assert 'output of pkg-a' in response['output']
+            assert 'error of pkg-a' in response['output']
+
+            setup_py = _create_package(
+                basepath, 'pkg-b',
+                "print('about to fail')\n"
+                "raise RuntimeError('broken')")
+            with pytest.raises(subprocess.CalledProcessError) as e:
+                pool.evaluate(setup_py, env=env)
+            # the output before the failure is part of the error
+            assert e.value.stderr.index('about to fail') < \
+                e.value.stderr.index('RuntimeError: broken')
+    finally:
+        pool.shutdown()
+    # nothing is written to the console of the calling process
+    out, err = capfd.readouterr()
+    assert 'pkg-a' not in out + err
+    assert 'broken' not in out + err
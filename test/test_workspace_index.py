@@ -0,0 +1,125 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+
+from colcon_python_setup_py import workspace_index
+from colcon_python_setup_py.package_identification import python_setup_py
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import _setup_information_cache
+from colcon_python_setup_py.package_identification.python_setup_py \
+    import get_setup_information
+
+
+def _create_workspace(root):
+    pkg_path = root / 'src' / 'pkg'
+    pkg_path.mkdir(parents=True)
+    (pkg_path / 'setup.py').write_text(
+        'import os\n'
+        'from setuptools import setup\n'
+        "version = open('VERSION').read().strip()\n"
+        "setup(name='pkg-name', version=version,\n"
+        "      url=os.environ.get('PKG_URL'),\n"
+        '      data_files=[(os.path.abspath("share"), [])])\n')
+    (pkg_path / 'VERSION').write_text('1.0\n')
+    ignored_path = root / 'build' / 'pkg'
+    ignored_path.mkdir(parents=True)
+    (ignored_path.parent / 'COLCON_IGNORE').write_text('')
+    (ignored_path / 'setup.py').write_text('')
+
+
+def _get_pythonpath(path):
+    # the path in front of the module search path of the current process
+    pythonpath = os.environ.get('PYTHONPATH')
+    return os.pathsep.join([str(path)] + ([pythonpath] if pythonpath else []))
+
+
+def test_export_and_lookup():
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        exported_root = Path(basepath) / 'exported'
+        _create_workspace(exported_root)
+        setup_pys = workspace_index.find_setup_py_files(exported_root)
+        assert setup_pys == [exported_root / 'src' / 'pkg' / 'setup.py']
+
+        index_path = exported_root / workspace_index.DEFAULT_INDEX_FILENAME
+        env = dict(
+            os.environ, PKG_URL='http://example.com',
+            PYTHONPATH=_get_pythonpath(exported_root / 'install'))
+        assert workspace_index.export_index(
+            index_path, exported_root, setup_pys, env=env) == 1
+
+        # the index is used in a workspace at another location
+        root = Path(basepath) / 'relocated'
+        shutil.copytree(str(exported_root), str(root))
+        index = workspace_index.load_index(
+            root / workspace_index.DEFAULT_INDEX_FILENAME)
+        setup_py = root / 'src' / 'pkg' / 'setup.py'
+        env['PYTHONPATH'] = _get_pythonpath(root / 'install')
+        data, environment_names = index.lookup(setup_py, env)
+        assert data['metadata']['version'] == '1.0'
+        assert data['data_files'] == [
+            (os.path.abspath(str(root / 'src' / 'pkg' / 'share')), [])]
+        assert 'PKG_URL' in environment_names
+
+        assert index.lookup(
+            setup_py, dict(env, PKG_URL='http://example.org')) is None
+        assert index.lookup(root / 'other' / 'setup.py', env) is None
+        # other modules are importable
+        assert index.lookup(setup_py, dict(
+            env, PYTHONPATH=_get_pythonpath(root / 'other'))) is None
+        (setup_py.parent / 'VERSION').write_text('2.0\n')
+        assert index.lookup(setup_py, env) is None
+        assert index.get_statistics() == {'hits': 1, 'misses': 4, 'size': 1}
+
+        # corrupted files are ignored
+        index_path.write_text('{')
+        assert workspace_index.load_index(index_path) is None
+
+
+def test_special_values(monkeypatch):
+    evaluate_setup_py = python_setup_py._evaluate_setup_py
+
+    def _evaluate_setup_py(setup_py, *, env, fields=None):
+        data, environment_names, inputs = evaluate_setup_py(
+            setup_py, env=env, fields=fields)
+        # values which can't be represented as literals
+        data = dict(data, provides=set(), zip_safe=float('inf'))
+        return data, environment_names, inputs
+
+    monkeypatch.setattr(
+        python_setup_py, '_evaluate_setup_py', _evaluate_setup_py)
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        root = Path(basepath)
+        _create_workspace(root)
+        index_path = root / workspace_index.DEFAULT_INDEX_FILENAME
+        assert workspace_index.export_index(
+            index_path, root, workspace_index.find_setup_py_files(root),
+            env=os.environ) == 1
+        index = workspace_index.load_index(index_path)
+        data, _ = index.lookup(root / 'src' / 'pkg' / 'setup.py', os.environ)
+        assert data['provides'] == set()
+        assert data['zip_safe'] == float('inf')
+
+
+def test_get_setup_information(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as basepath:
+        root = Path(basepath)
+        _create_workspace(root)
+        assert workspace_index.main(['--root', str(root)]) == 0
+        monkeypatch.setenv(
+            workspace_index.INDEX_ENVIRONMENT_VARIABLE.name,
+            str(root / workspace_index.DEFAULT_INDEX_FILENAME))
+        monkeypatch.delenv('PKG_URL', raising=False)
+
+        def _evaluate_setup_py(setup_py, *, env, fields=None):
+            assert False, 'the index entry should have been used'
+
+        monkeypatch.setattr(
+            python_setup_py, '_evaluate_setup_py', _evaluate_setup_py)
+        _setup_information_cache.clear()
+        data = get_setup_information(root / 'src' / 'pkg' / 'setup.py')
+        assert data['metadata']['name'] == 'pkg-name'
+        assert workspace_index.get_workspace_index().hits == 1